@@ -0,0 +1,132 @@
+"""
+Semantic answer cache for RAG question answering.
+
+An answer is reused when a new question retrieves exactly the same set of
+chunks and its (search) embedding is within `similarity_threshold`
+(cosine) of a cached question. Entries expire after `ttl_seconds`, the
+cache is bounded to `max_entries`, and entries citing a source or chunk
+are dropped as soon as that source is re-ingested or deleted from the
+`VectorStore`.
+
+Settings live under `rag.answer_cache` in `config/models.yaml`.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set
+import threading
+import time
+
+import numpy as np
+
+from app.core.config import CONFIG_DIR, load_yaml_config
+from app.storage.vector_store import add_change_listener
+
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+DEFAULT_TTL_SECONDS = 600.0
+DEFAULT_MAX_ENTRIES = 256
+
+
+def load_answer_cache_config() -> Dict[str, Any]:
+    rag = load_yaml_config(CONFIG_DIR / "models.yaml").get("rag", {}) or {}
+    return rag.get("answer_cache", {}) or {}
+
+
+@dataclass
+class _Entry:
+    embedding: np.ndarray
+    chunk_ids: FrozenSet[str]
+    sources: Set[str]
+    result: Dict[str, Any]
+    created: float
+
+
+class AnswerCache:
+    """Thread-safe, TTL- and size-bounded semantic cache of RAG answers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._next_key = 0
+        self._stats = {"hits": 0, "misses": 0, "invalidated": 0, "expired": 0}
+
+    @staticmethod
+    def _settings() -> Dict[str, Any]:
+        cfg = load_answer_cache_config()
+        return {
+            "enabled": bool(cfg.get("enabled", True)),
+            "threshold": float(cfg.get("similarity_threshold", DEFAULT_SIMILARITY_THRESHOLD)),
+            "ttl": float(cfg.get("ttl_seconds", DEFAULT_TTL_SECONDS)),
+            "max_entries": int(cfg.get("max_entries", DEFAULT_MAX_ENTRIES)),
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._settings()["enabled"])
+
+    def lookup(self, embedding: np.ndarray, chunk_ids: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """Return a cached result for a similar question over the same chunks."""
+        settings = self._settings()
+        key_ids = frozenset(str(i) for i in chunk_ids if i is not None)
+        now = time.monotonic()
+        with self._lock:
+            best_key, best_score = None, settings["threshold"]
+            for key, entry in list(self._entries.items()):
+                if now - entry.created > settings["ttl"]:
+                    del self._entries[key]
+                    self._stats["expired"] += 1
+                    continue
+                if entry.chunk_ids != key_ids:
+                    continue
+                score = float(np.dot(entry.embedding, embedding))
+                if score >= best_score:
+                    best_key, best_score = key, score
+            if best_key is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self._stats["hits"] += 1
+            return self._entries[best_key].result
+
+    def store(self, embedding: np.ndarray, citations: List[Dict[str, Any]], result: Dict[str, Any]) -> None:
+        """Cache `result` for a question embedding and its retrieved chunks."""
+        settings = self._settings()
+        if settings["max_entries"] <= 0:
+            return
+        sources = {
+            str((c.get("metadata") or {}).get("source"))
+            for c in citations
+            if (c.get("metadata") or {}).get("source") is not None
+        }
+        entry = _Entry(
+            embedding=np.asarray(embedding, dtype="float32"),
+            chunk_ids=frozenset(str(c.get("id")) for c in citations if c.get("id") is not None),
+            sources=sources,
+            result=result,
+            created=time.monotonic(),
+        )
+        with self._lock:
+            self._entries[self._next_key] = entry
+            self._next_key += 1
+            while len(self._entries) > settings["max_entries"]:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, sources: Set[str], chunk_ids: Set[str]) -> None:
+        """Drop entries citing any of the given sources or chunks."""
+        if not sources and not chunk_ids:
+            return
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry.sources & sources or entry.chunk_ids & chunk_ids:
+                    del self._entries[key]
+                    self._stats["invalidated"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        return stats
+
+
+answer_cache = AnswerCache()
+add_change_listener(answer_cache.invalidate)
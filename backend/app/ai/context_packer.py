@@ -0,0 +1,184 @@
+"""
+Token-budgeted context packing for RAG prompts.
+
+Retrieved chunks are packed into the prompt in rank order until a token
+budget is used up. The budget is derived from `config/models.yaml`
+(`llm.context_window` minus `llm.max_tokens` and the prompt itself).
+Exact duplicate chunks are dropped, and chunks from the same source with
+consecutive `chunk_index` are merged into one snippet. The whole sentences
+the chunker repeats at the start of each chunk are removed when merging;
+neighbours that don't overlap (e.g. across a page boundary) are joined
+with a newline.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.preprocessing.tokens import estimate_tokens
+
+
+DEFAULT_CONTEXT_WINDOW = 8192
+# Tokens kept free for chat template/formatting the estimate doesn't see
+SAFETY_MARGIN_TOKENS = 64
+# Don't bother adding a truncated snippet smaller than this
+MIN_SNIPPET_TOKENS = 48
+# Longest chunk overlap searched for when merging neighbours
+MAX_OVERLAP_CHARS = 400
+# Shorter common prefix/suffix matches are coincidences, not chunk overlap
+MIN_OVERLAP_CHARS = 16
+_SENTENCE_END = ".!?"
+TRUNCATION_MARKER = " ..."
+
+
+def context_budget(cfg: Dict[str, Any], prompt_overhead_tokens: int) -> int:
+    """
+    Tokens available for retrieved context.
+
+    Args:
+        cfg: The `llm` section of models.yaml
+        prompt_overhead_tokens: Tokens used by the prompt without any context
+    """
+    window = int(cfg.get("context_window", DEFAULT_CONTEXT_WINDOW))
+    reserved = int(cfg.get("max_tokens", 2048)) + prompt_overhead_tokens + SAFETY_MARGIN_TOKENS
+    return max(0, window - reserved)
+
+
+def _overlap_size(previous: str, current: str) -> int:
+    """
+    Length of the chunker overlap at the start of `current`, or 0.
+
+    The chunker carries whole sentences over, so a real overlap starts at a
+    word boundary in `previous`, ends a sentence in `current` and is at
+    least MIN_OVERLAP_CHARS long. Anything else (say "...1200 USD" followed
+    by "Due by Friday.") is a coincidental match and is kept.
+    """
+    limit = min(len(previous), len(current), MAX_OVERLAP_CHARS)
+    for size in range(limit, MIN_OVERLAP_CHARS - 1, -1):
+        overlap = current[:size]
+        if not previous.endswith(overlap):
+            continue
+        starts_word = size == len(previous) or previous[-size - 1].isspace()
+        ends_sentence = overlap.rstrip()[-1:] in _SENTENCE_END and (
+            size == len(current) or current[size].isspace()
+        )
+        if starts_word and ends_sentence:
+            return size
+    return 0
+
+
+def _join_chunks(previous: str, current: str) -> str:
+    """Append `current` to `previous`, dropping the chunker overlap if there is one."""
+    size = _overlap_size(previous, current)
+    if size:
+        return previous + current[size:]
+    return previous + "\n" + current
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut `text` (on a word boundary) so it fits in `max_tokens`."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    max_tokens -= estimate_tokens(TRUNCATION_MARKER)
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    cut = text[:low]
+    space = cut.rfind(" ")
+    if space > low // 2:
+        cut = cut[:space]
+    return cut.rstrip() + TRUNCATION_MARKER
+
+
+def _merge_adjacent(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge chunks from the same source with consecutive chunk indexes.
+
+    A merged group takes the rank of its best-ranked member.
+    """
+    groups: List[List[Dict[str, Any]]] = []
+    by_position: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+
+    for item in results:
+        meta = item.get("metadata") or {}
+        source, index = meta.get("source"), meta.get("chunk_index")
+        group: Optional[List[Dict[str, Any]]] = None
+        if source is not None and isinstance(index, int):
+            group = by_position.get((source, index - 1)) or by_position.get((source, index + 1))
+        if group is None:
+            group = []
+            groups.append(group)
+        group.append(item)
+        if source is not None and isinstance(index, int):
+            by_position[(source, index)] = group
+
+    merged: List[Dict[str, Any]] = []
+    for group in groups:
+        if len(group) == 1:
+            merged.append(group[0])
+            continue
+        group = sorted(group, key=lambda r: (r.get("metadata") or {}).get("chunk_index", 0))
+        text = group[0].get("text", "")
+        for item in group[1:]:
+            text = _join_chunks(text, item.get("text", ""))
+        first = group[0]
+        merged.append(
+            {
+                **first,
+                "text": text,
+                "chunk_ids": [r.get("id") for r in group],
+                # chunk_index stays an int (the first chunk); the rest are listed
+                "metadata": {
+                    **(first.get("metadata") or {}),
+                    "chunk_indexes": [(r.get("metadata") or {}).get("chunk_index") for r in group],
+                },
+            }
+        )
+    return merged
+
+
+def pack_context(results: List[Dict[str, Any]], budget_tokens: int) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Select and merge retrieved chunks to fill `budget_tokens`.
+
+    Args:
+        results: Retrieved chunks in rank order (`text`, `metadata`, `id`)
+        budget_tokens: Tokens available for context
+
+    Returns:
+        (packed snippets in rank order, stats with `context_tokens`,
+        `budget_tokens`, `chunks_retrieved`, `snippets_used`, `chunks_dropped`)
+    """
+    seen_texts = set()
+    unique: List[Dict[str, Any]] = []
+    for item in results:
+        key = " ".join(item.get("text", "").split())
+        if key and key not in seen_texts:
+            seen_texts.add(key)
+            unique.append(item)
+
+    packed: List[Dict[str, Any]] = []
+    used = 0
+    for item in _merge_adjacent(unique):
+        tokens = estimate_tokens(item.get("text", ""))
+        remaining = budget_tokens - used
+        if tokens <= remaining:
+            packed.append(item)
+            used += tokens
+            continue
+        if remaining >= MIN_SNIPPET_TOKENS:
+            text = _truncate_to_tokens(item.get("text", ""), remaining)
+            packed.append({**item, "text": text, "truncated": True})
+            used += estimate_tokens(text)
+        break
+
+    used_chunks = sum(len(p.get("chunk_ids") or [None]) for p in packed)
+    stats = {
+        "context_tokens": used,
+        "budget_tokens": budget_tokens,
+        "chunks_retrieved": len(results),
+        "snippets_used": len(packed),
+        "chunks_dropped": max(0, len(results) - used_chunks),
+    }
+    return packed, stats
@@ -0,0 +1,255 @@
+"""
+Content-addressed embedding cache.
+
+Embeddings are keyed on a hash of the model name plus the exact chunk text,
+so re-ingesting the same files (or the same boilerplate chunks) never runs
+the model twice. Hot entries live in an in-memory LRU; everything is also
+spilled to a small SQLite store under `settings.vector_db_path` so the cache
+survives restarts. The disk store is LRU-bounded too (`cache_disk_max_entries`
+in the `embeddings` section of `config/models.yaml`).
+"""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+import hashlib
+import sqlite3
+import threading
+
+import numpy as np
+
+from app.core.config import settings, load_yaml_config, CONFIG_DIR
+
+
+DEFAULT_MAX_ENTRIES = 20000
+# ~150 MB of 384-dim float32 vectors
+DEFAULT_DISK_MAX_ENTRIES = 100000
+CACHE_FILENAME = "embedding_cache.sqlite3"
+
+
+def cache_key(model_name: str, text: str) -> str:
+    """Return the content address for `text` embedded with `model_name`."""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU of embeddings with a persistent SQLite spill store.
+
+    Disk rows carry a `last_used` tick from a logical clock; when the store
+    grows past `disk_max_entries` the least recently used rows are deleted.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        disk_max_entries: int = DEFAULT_DISK_MAX_ENTRIES,
+    ):
+        if db_path is None:
+            base_path = Path(settings.vector_db_path)
+            base_path.mkdir(parents=True, exist_ok=True)
+            db_path = base_path / CACHE_FILENAME
+
+        self.max_entries = max(0, int(max_entries))
+        self.disk_max_entries = max(1, int(disk_max_entries))
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "disk_evictions": 0,
+        }
+        # Keys served from memory since the last write; their disk rows are
+        # touched in batch on the next put_many instead of on every lookup
+        self._touched: Set[str] = set()
+
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " dim INTEGER NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(embeddings)")}
+        if "last_used" not in columns:
+            # Stores created before the disk bound existed
+            self._conn.execute(
+                "ALTER TABLE embeddings ADD COLUMN last_used INTEGER NOT NULL DEFAULT 0"
+            )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+        # Counted once; kept up to date by put_many and eviction
+        self._disk_entries, clock = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(MAX(last_used), 0) FROM embeddings"
+        ).fetchone()
+        self._clock = int(clock)
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        """Insert into the in-memory LRU. Must be called with `_lock` held."""
+        if self.max_entries == 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up embeddings for `keys`.
+
+        Returns:
+            Dict of key -> embedding for every key found (memory or disk)
+        """
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            pending = []
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self._touched.add(key)
+                    found[key] = vector
+                    self._stats["memory_hits"] += 1
+                else:
+                    pending.append(key)
+
+            # SQLite caps bound parameters, so look up in slices
+            unique_pending = list(dict.fromkeys(pending))
+            disk_found = []
+            for start in range(0, len(unique_pending), 500):
+                batch = unique_pending[start : start + 500]
+                placeholders = ",".join("?" for _ in batch)
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype="float32")
+                    found[key] = vector
+                    disk_found.append(key)
+                    self._remember(key, vector)
+            if disk_found:
+                self._touch(disk_found)
+                self._conn.commit()
+
+            for key in pending:
+                if key in found:
+                    self._stats["disk_hits"] += 1
+                else:
+                    self._stats["misses"] += 1
+        return found
+
+    def _touch(self, keys: List[str]) -> None:
+        """Mark disk rows as just used. Must be called with `_lock` held."""
+        self._clock += 1
+        for start in range(0, len(keys), 500):
+            batch = keys[start : start + 500]
+            placeholders = ",".join("?" for _ in batch)
+            self._conn.execute(
+                f"UPDATE embeddings SET last_used = ? WHERE key IN ({placeholders})",
+                [self._clock, *batch],
+            )
+
+    def _evict(self) -> None:
+        """Delete least recently used disk rows over the bound. Must be called with `_lock` held."""
+        excess = self._disk_entries - self.disk_max_entries
+        if excess <= 0:
+            return
+        deleted = self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN ("
+            " SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+            (excess,),
+        ).rowcount
+        self._disk_entries -= deleted
+        self._stats["disk_evictions"] += deleted
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        """Store embeddings in memory and on disk, evicting old disk rows if over the bound."""
+        if not items:
+            return
+        rows = []
+        with self._lock:
+            if self._touched:
+                self._touch(list(self._touched))
+                self._touched.clear()
+            self._clock += 1
+            for key, vector in items.items():
+                vector = np.ascontiguousarray(vector, dtype="float32")
+                self._remember(key, vector)
+                rows.append((key, int(vector.shape[0]), vector.tobytes(), self._clock))
+            # Keys are content addresses, so an existing row already holds
+            # the same vector; only its last_used tick needs refreshing
+            inserted = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, dim, vector, last_used) VALUES (?, ?, ?, ?)",
+                rows,
+            ).rowcount
+            if inserted < len(rows):
+                self._touch([row[0] for row in rows])
+            self._disk_entries += inserted
+            self._evict()
+            self._conn.commit()
+            self._stats["writes"] += inserted
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters plus current sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["max_entries"] = self.max_entries
+            stats["disk_entries"] = self._disk_entries
+            stats["disk_max_entries"] = self.disk_max_entries
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (
+            (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        )
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._conn.close()
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or lazily create the process-wide embedding cache."""
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            cfg = load_yaml_config(CONFIG_DIR / "models.yaml").get("embeddings", {}) or {}
+            _cache = EmbeddingCache(
+                max_entries=int(cfg.get("cache_max_entries", DEFAULT_MAX_ENTRIES)),
+                disk_max_entries=int(cfg.get("cache_disk_max_entries", DEFAULT_DISK_MAX_ENTRIES)),
+            )
+        return _cache
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Return stats for the embedding cache (empty if it was never used)."""
+    with _cache_lock:
+        cache = _cache
+    return cache.stats() if cache is not None else {}
+
+
+def close_embedding_cache() -> None:
+    """Close the process-wide embedding cache."""
+    global _cache
+
+    with _cache_lock:
+        cache = _cache
+        _cache = None
+    if cache is not None:
+        cache.close()
@@ -4,8 +4,19 @@ Embedding model wrapper using sentence-transformers.
 This module provides a thin abstraction over a local sentence-transformers
 model so the rest of the codebase can generate embeddings without caring
 about model details.
+
+The model, device and quantization mode come from the `embeddings` section
+of `config/models.yaml`. The model is preloaded in a background thread on
+FastAPI startup (`preload_embedding_model`), so the first request doesn't
+pay the load time. With `quantization: int8` the model's linear layers are
+dynamically quantized for faster CPU inference.
+
+Embeddings are served through a content-addressed cache (see
+`app.ai.embedding_cache`), so only texts never seen before hit the model.
 """
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+import time
 
 import numpy as np
 
@@ -16,21 +27,71 @@ try:
 except Exception:  # pragma: no cover - optional dependency
     SentenceTransformer = None  # type: ignore
 
+from app.core.config import CONFIG_DIR, load_yaml_config
+from app.ai.embedding_cache import cache_key, get_embedding_cache
+from app.preprocessing.tokens import estimate_tokens
+
+# Defaults – overridden by config/models.yaml embeddings.*
+MODEL_NAME = "all-MiniLM-L6-v2"
+DEFAULT_DEVICE = "cpu"
+QUANTIZATION_MODES = ("none", "int8")
+# Encode batches are sized so that (longest text in batch) x (batch size)
+# stays around this many tokens: many short texts, few long ones
+DEFAULT_BATCH_TOKENS = 8192
+MIN_BATCH_SIZE = 4
+MAX_BATCH_SIZE = 128
+
+# (settings key, model), swapped as one reference so readers never see a mix
+_loaded: Optional[Tuple[Tuple[str, str, str], "SentenceTransformer"]] = None
+_model_lock = threading.Lock()
+_status: Dict[str, Any] = {"loaded": False, "load_seconds": None, "error": None}
+
+
+def load_embedding_config() -> Dict[str, Any]:
+    return load_yaml_config(CONFIG_DIR / "models.yaml").get("embeddings", {}) or {}
+
+
+def _engine_settings() -> Tuple[str, str, str]:
+    """(model, device, quantization) from config; int8 only applies on CPU."""
+    cfg = load_embedding_config()
+    model_name = str(cfg.get("model", MODEL_NAME))
+    device = str(cfg.get("device", DEFAULT_DEVICE))
+    quantization = str(cfg.get("quantization", "none")).lower()
+    if quantization not in QUANTIZATION_MODES:
+        raise RuntimeError(
+            f"Unknown embeddings.quantization '{quantization}' "
+            f"(expected one of: {', '.join(QUANTIZATION_MODES)})"
+        )
+    if device != "cpu":
+        quantization = "none"
+    return model_name, device, quantization
+
+
+def _cache_model_id(model_name: str, quantization: str) -> str:
+    """Model identity used in cache keys (quantized vectors differ slightly)."""
+    return model_name if quantization == "none" else f"{model_name}@{quantization}"
+
 
-_model: Optional["SentenceTransformer"] = None
+def _quantize(model: "SentenceTransformer") -> "SentenceTransformer":
+    """Dynamically quantize the model's linear layers to int8."""
+    import torch  # installed with sentence-transformers
+
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
 
 
 def _get_model() -> "SentenceTransformer":
     """
-    Get or lazily load the global embedding model instance.
+    Get or load the global embedding model instance.
 
-    The concrete model name is aligned with `config/models.yaml` which
-    defaults to `all-MiniLM-L6-v2`.
+    The model is reloaded if `embeddings.model`, `device` or `quantization`
+    change in `config/models.yaml`.
     """
-    global _model
+    global _loaded
 
-    if _model is not None:
-        return _model
+    key = _engine_settings()
+    loaded = _loaded
+    if loaded is not None and loaded[0] == key:
+        return loaded[1]
 
     if SentenceTransformer is None:
         raise RuntimeError(
@@ -39,16 +100,91 @@ def _get_model() -> "SentenceTransformer":
             "  pip install -r backend/requirements-ai.txt"
         )
 
-    # Default model – should match config/models.yaml embeddings.model
-    model_name = "all-MiniLM-L6-v2"
-    _model = SentenceTransformer(model_name)
-    return _model
+    with _model_lock:
+        if _loaded is not None and _loaded[0] == key:
+            return _loaded[1]
+        model_name, device, quantization = key
+        start = time.perf_counter()
+        model = SentenceTransformer(model_name, device=device)
+        if quantization == "int8":
+            model = _quantize(model)
+        _loaded = (key, model)
+        _status.update(
+            loaded=True, load_seconds=round(time.perf_counter() - start, 3), error=None
+        )
+        return model
+
+
+def preload_embedding_model() -> threading.Thread:
+    """
+    Load the embedding model in a background thread (called on FastAPI startup).
+
+    Failures (e.g. sentence-transformers not installed) are recorded in
+    `get_embedding_engine_stats()`; requests then raise the usual error.
+    """
+
+    def _load() -> None:
+        try:
+            _get_model()
+        except Exception as exc:
+            _status["error"] = str(exc)
+
+    thread = threading.Thread(target=_load, name="embedding-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def _batches(texts: List[str], batch_tokens: int) -> List[List[int]]:
+    """
+    Group text indexes into encode batches sized by text length.
+
+    Texts are sorted by length so each batch pads to similar lengths.
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    batches: List[List[int]] = []
+    current: List[int] = []
+    longest = 0
+    for i in order:
+        tokens = max(1, estimate_tokens(texts[i]))
+        size_if_added = len(current) + 1
+        if current and (
+            max(longest, tokens) * size_if_added > batch_tokens or size_if_added > MAX_BATCH_SIZE
+        ) and len(current) >= MIN_BATCH_SIZE:
+            batches.append(current)
+            current, longest = [], 0
+        current.append(i)
+        longest = max(longest, tokens)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _encode(texts: List[str]) -> np.ndarray:
+    """Run the model over `texts` in length-adaptive batches."""
+    model = _get_model()
+    batch_tokens = int(load_embedding_config().get("batch_tokens", DEFAULT_BATCH_TOKENS))
+    out: Optional[np.ndarray] = None
+    for batch in _batches(texts, batch_tokens):
+        # sentence-transformers already returns a numpy array
+        encoded = model.encode(
+            [texts[i] for i in batch],
+            batch_size=len(batch),
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        ).astype("float32")
+        if out is None:
+            out = np.empty((len(texts), encoded.shape[1]), dtype="float32")
+        out[batch] = encoded
+    return out
 
 
 def embed_texts(texts: List[str]) -> np.ndarray:
     """
     Generate embeddings for a list of texts.
 
+    Cached embeddings are reused; only cache misses are sent to the model
+    and results are returned in the original order.
+
     Args:
         texts: List of text strings
 
@@ -58,8 +194,31 @@ def embed_texts(texts: List[str]) -> np.ndarray:
     if not texts:
         return np.zeros((0, 0), dtype="float32")
 
-    model = _get_model()
-    # sentence-transformers already returns a numpy array
-    embeddings = model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
-    return embeddings.astype("float32")
-
+    model_name, _, quantization = _engine_settings()
+    model_id = _cache_model_id(model_name, quantization)
+    cache = get_embedding_cache()
+    keys = [cache_key(model_id, t) for t in texts]
+    found = cache.get_many(keys)
+
+    # Deduplicate misses so repeated chunks within one call are encoded once
+    missing: dict = {}
+    for key, text in zip(keys, texts):
+        if key not in found and key not in missing:
+            missing[key] = text
+
+    if missing:
+        encoded = _encode(list(missing.values()))
+        fresh = dict(zip(missing.keys(), encoded))
+        cache.put_many(fresh)
+        found.update(fresh)
+
+    return np.stack([found[key] for key in keys]).astype("float32", copy=False)
+
+
+def get_embedding_engine_stats() -> Dict[str, Any]:
+    """Return the configured engine and whether/how fast the model loaded."""
+    try:
+        model_name, device, quantization = _engine_settings()
+    except RuntimeError as exc:
+        return {**_status, "error": str(exc)}
+    return {"model": model_name, "device": device, "quantization": quantization, **_status}
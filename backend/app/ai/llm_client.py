@@ -3,30 +3,45 @@ Local LLM client (Ollama).
 
 All calls are made against a local Ollama server (default http://localhost:11434)
 as configured in `config/models.yaml`. No cloud calls are performed.
+
+Requests go through the pooled async transport in `app.ai.ollama_transport`.
 """
 from typing import Optional, AsyncGenerator, Dict, Any, List
 
-import yaml
-from pathlib import Path
-
-from fastapi.concurrency import run_in_threadpool
+import asyncio
+import time
 
+from app.core.config import CONFIG_DIR, load_yaml_config
+from app.ai.ollama_transport import get_transport
 from app.security.network_guard import check_network_allowed
 
-try:
-    import ollama  # type: ignore
-except Exception:  # pragma: no cover - optional dependency
-    ollama = None
-
 
 def load_model_config() -> dict:
-    """Load model configuration from models.yaml."""
-    config_path = Path(__file__).parent.parent.parent.parent / "config" / "models.yaml"
-    if config_path.exists():
-        with open(config_path, "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f) or {}
-            return config.get("llm", {})
-    return {}
+    """
+    Load the `llm` section of models.yaml.
+
+    Served from the shared config cache, so the file is only re-parsed
+    after it changes on disk.
+    """
+    return load_yaml_config(CONFIG_DIR / "models.yaml").get("llm", {}) or {}
+
+
+_limiter: Optional[asyncio.Semaphore] = None
+
+
+def get_llm_limiter() -> asyncio.Semaphore:
+    """
+    Shared limiter for concurrent LLM pipeline stages.
+
+    Sized by `llm.max_concurrency` so parallel stages across requests don't
+    overload the local Ollama server.
+    """
+    global _limiter
+
+    if _limiter is None:
+        cfg = load_model_config()
+        _limiter = asyncio.Semaphore(max(1, int(cfg.get("max_concurrency", 2))))
+    return _limiter
 
 
 def _build_messages(prompt: str, system_prompt: Optional[str]) -> List[Dict[str, Any]]:
@@ -37,85 +52,155 @@ def _build_messages(prompt: str, system_prompt: Optional[str]) -> List[Dict[str,
     return messages
 
 
-async def generate(prompt: str, system_prompt: Optional[str] = None) -> str:
-    """
-    Generate text using local LLM (Ollama).
-
-    This runs in a threadpool so it does not block the FastAPI event loop.
-    """
-    if ollama is None:
-        raise RuntimeError(
-            "ollama Python package is not installed. "
-            "Install optional AI dependencies with:\n"
-            "  pip install -r backend/requirements-ai.txt\n"
-            "Also ensure the Ollama daemon is running locally."
-        )
-
-    cfg = load_model_config()
+def _request_settings(cfg: dict) -> Dict[str, Any]:
     base_url = cfg.get("base_url", "http://localhost:11434")
-    model_name = cfg.get("model", "llama3:8b")
-    temperature = float(cfg.get("temperature", 0.7))
-    max_tokens = int(cfg.get("max_tokens", 2048))
-
     if not check_network_allowed(base_url):
         raise RuntimeError(
             f"External network call blocked for base_url={base_url}. "
             "Ollama must run locally (e.g., http://localhost:11434)."
         )
+    return {
+        "model": cfg.get("model", "llama3:8b"),
+        "options": {
+            "temperature": float(cfg.get("temperature", 0.7)),
+            "num_predict": int(cfg.get("max_tokens", 2048)),
+        },
+    }
+
+
+async def generate(
+    prompt: str, system_prompt: Optional[str] = None, timeout: Optional[float] = None
+) -> str:
+    """
+    Generate text using local LLM (Ollama).
 
-    messages = _build_messages(prompt, system_prompt)
-
-    def _call() -> str:
-        response = ollama.chat(
-            model=model_name,
-            messages=messages,
-            options={"temperature": temperature, "num_predict": max_tokens},
-        )
-        return response["message"]["content"]
+    Uses the pooled async transport, so it does not block the FastAPI event
+    loop or occupy a threadpool worker.
 
-    return await run_in_threadpool(_call)
+    Args:
+        prompt: User prompt
+        system_prompt: Optional system prompt
+        timeout: Total seconds for the request (defaults to `llm.request_timeout`)
+    """
+    cfg = load_model_config()
+    request = _request_settings(cfg)
+    transport = get_transport(cfg)
+    return await transport.chat(
+        model=request["model"],
+        messages=_build_messages(prompt, system_prompt),
+        options=request["options"],
+        timeout=timeout,
+    )
+
+
+# Fragments buffered between the Ollama reader and the consumer. When the
+# consumer (e.g. a slow SSE client) falls behind, the reader stops pulling
+# from the socket, which pushes back on Ollama through TCP flow control.
+STREAM_QUEUE_SIZE = 32
+
+_stream_stats: Dict[str, float] = {
+    "streams": 0,
+    "completed": 0,
+    "disconnected": 0,
+    "failed": 0,
+    "last_ttft_ms": 0.0,
+    "avg_ttft_ms": 0.0,
+    "last_tokens_per_second": 0.0,
+    "avg_tokens_per_second": 0.0,
+}
+
+
+def _record_stream(outcome: str, metrics: Dict[str, float]) -> None:
+    _stream_stats["streams"] += 1
+    _stream_stats[outcome] += 1
+    if outcome != "completed":
+        return
+    done = _stream_stats["completed"]
+    for key, stat in (("ttft_ms", "ttft_ms"), ("tokens_per_second", "tokens_per_second")):
+        value = metrics.get(key) or 0.0
+        _stream_stats[f"last_{stat}"] = round(value, 2)
+        previous = _stream_stats[f"avg_{stat}"]
+        _stream_stats[f"avg_{stat}"] = round(previous + (value - previous) / done, 2)
+
+
+def get_streaming_stats() -> Dict[str, float]:
+    """Return time-to-first-token and throughput stats for streamed generations."""
+    return dict(_stream_stats)
 
 
 async def generate_streaming(
-    prompt: str, system_prompt: Optional[str] = None
+    prompt: str,
+    system_prompt: Optional[str] = None,
+    timeout: Optional[float] = None,
+    metrics: Optional[Dict[str, float]] = None,
 ) -> AsyncGenerator[str, None]:
     """
     Generate text with a streaming response from Ollama.
-    """
-    if ollama is None:
-        raise RuntimeError(
-            "ollama Python package is not installed. "
-            "Install optional AI dependencies with:\n"
-            "  pip install -r backend/requirements-ai.txt\n"
-            "Also ensure the Ollama daemon is running locally."
-        )
 
+    Tokens are read off the connection by a background task into a bounded
+    queue, so the event loop is never blocked and a slow consumer applies
+    backpressure. Closing the generator (e.g. on client disconnect) cancels
+    the upstream request.
+
+    Args:
+        prompt: User prompt
+        system_prompt: Optional system prompt
+        timeout: Total seconds for the request (defaults to `llm.request_timeout`)
+        metrics: Optional dict filled with `ttft_ms`, `tokens`, `duration_ms`
+            and `tokens_per_second` when the stream ends
+    """
     cfg = load_model_config()
-    base_url = cfg.get("base_url", "http://localhost:11434")
-    model_name = cfg.get("model", "llama3:8b")
-    temperature = float(cfg.get("temperature", 0.7))
-    max_tokens = int(cfg.get("max_tokens", 2048))
-
-    if not check_network_allowed(base_url):
-        raise RuntimeError(
-            f"External network call blocked for base_url={base_url}. "
-            "Ollama must run locally (e.g., http://localhost:11434)."
-        )
-
-    messages = _build_messages(prompt, system_prompt)
-
-    def _iter():
-        return ollama.chat(
-            model=model_name,
-            messages=messages,
-            options={"temperature": temperature, "num_predict": max_tokens},
-            stream=True,
-        )
-
-    # Run generator in a thread and yield chunks asynchronously
-    iterator = await run_in_threadpool(_iter)
-    for chunk in iterator:
-        content = chunk.get("message", {}).get("content")
-        if content:
-            yield content
-
+    request = _request_settings(cfg)
+    transport = get_transport(cfg)
+
+    queue: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+    end_of_stream = object()
+
+    async def _produce() -> None:
+        try:
+            async for content in transport.stream_chat(
+                model=request["model"],
+                messages=_build_messages(prompt, system_prompt),
+                options=request["options"],
+                timeout=timeout,
+            ):
+                await queue.put(content)
+        except Exception as exc:
+            await queue.put(exc)
+        else:
+            await queue.put(end_of_stream)
+
+    stats: Dict[str, float] = metrics if metrics is not None else {}
+    started = time.perf_counter()
+    first_token_at: Optional[float] = None
+    tokens = 0
+    outcome = "disconnected"
+    producer = asyncio.create_task(_produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is end_of_stream:
+                outcome = "completed"
+                break
+            if isinstance(item, Exception):
+                outcome = "failed"
+                raise item
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            tokens += 1
+            yield item
+    finally:
+        if not producer.done():
+            producer.cancel()
+            try:
+                await producer
+            except (asyncio.CancelledError, Exception):
+                pass
+
+        finished = time.perf_counter()
+        generating = finished - (first_token_at or finished)
+        stats["ttft_ms"] = round(((first_token_at or finished) - started) * 1000, 1)
+        stats["tokens"] = tokens
+        stats["duration_ms"] = round((finished - started) * 1000, 1)
+        stats["tokens_per_second"] = round(tokens / generating, 2) if generating > 0 else 0.0
+        _record_stream(outcome, stats)
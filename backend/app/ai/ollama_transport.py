@@ -0,0 +1,228 @@
+"""
+Native asyncio HTTP transport for the local Ollama server.
+
+Talks to Ollama's `/api/chat` endpoint directly with a persistent
+keep-alive connection pool, so LLM calls no longer occupy a threadpool
+worker each. A global semaphore caps how many requests are in flight at
+once. Every request has a total deadline (connect to last byte, counted
+once it holds a connection slot); httpx's own per-phase timeouts only
+bound each individual connect/read.
+"""
+from typing import Any, AsyncGenerator, Dict, List, Optional, Set, Tuple
+import asyncio
+import json
+import logging
+
+try:
+    import httpx  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+
+class OllamaTransport:
+    """Pooled async client for a single Ollama base URL."""
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = 4,
+        request_timeout: float = 300.0,
+        connect_timeout: float = 5.0,
+    ):
+        if httpx is None:
+            raise RuntimeError(
+                "httpx is not installed. "
+                "Install optional AI dependencies with:\n"
+                "  pip install -r backend/requirements-ai.txt\n"
+                "Also ensure the Ollama daemon is running locally."
+            )
+
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = max(1, int(pool_size))
+        self.request_timeout = float(request_timeout)
+        self.connect_timeout = float(connect_timeout)
+        self._semaphore = asyncio.Semaphore(self.pool_size)
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+                keepalive_expiry=60.0,
+            ),
+            timeout=httpx.Timeout(self.request_timeout, connect=self.connect_timeout),
+        )
+
+    @property
+    def settings_key(self) -> Tuple[str, int, float, float]:
+        return (self.base_url, self.pool_size, self.request_timeout, self.connect_timeout)
+
+    def _deadline(self, timeout: Optional[float]) -> float:
+        """Total seconds allowed for one request."""
+        return self.request_timeout if timeout is None else float(timeout)
+
+    def _timed_out(self, seconds: float) -> RuntimeError:
+        return RuntimeError(f"Ollama request to {self.base_url} timed out after {seconds:g}s")
+
+    def _error(self, exc: Exception) -> RuntimeError:
+        if isinstance(exc, httpx.TimeoutException):
+            return RuntimeError(f"Ollama request to {self.base_url} timed out")
+        if isinstance(exc, httpx.HTTPStatusError):
+            return RuntimeError(
+                f"Ollama returned HTTP {exc.response.status_code}: {exc.response.text}"
+            )
+        return RuntimeError(
+            f"Could not reach Ollama at {self.base_url}: {exc}. "
+            "Ensure the Ollama daemon is running locally."
+        )
+
+    async def chat(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        options: Dict[str, Any],
+        timeout: Optional[float] = None,
+    ) -> str:
+        """
+        Run a non-streaming chat request and return the message content.
+
+        Args:
+            timeout: Total seconds for the request (defaults to `request_timeout`)
+        """
+        payload = {"model": model, "messages": messages, "options": options, "stream": False}
+        deadline = self._deadline(timeout)
+        async with self._semaphore:
+            try:
+                response = await asyncio.wait_for(
+                    self._client.post("/api/chat", json=payload), timeout=deadline
+                )
+                response.raise_for_status()
+            except asyncio.TimeoutError as exc:
+                raise self._timed_out(deadline) from exc
+            except httpx.HTTPError as exc:
+                raise self._error(exc) from exc
+        data = response.json()
+        if data.get("error"):
+            raise RuntimeError(f"Ollama error: {data['error']}")
+        return data.get("message", {}).get("content", "")
+
+    async def stream_chat(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        options: Dict[str, Any],
+        timeout: Optional[float] = None,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Run a streaming chat request, yielding content fragments as they arrive.
+
+        The connection slot is held until the stream finishes or the
+        generator is closed.
+
+        Args:
+            timeout: Total seconds for the whole stream (defaults to
+                `request_timeout`); time the consumer spends between
+                fragments counts too
+        """
+        payload = {"model": model, "messages": messages, "options": options, "stream": True}
+        deadline = self._deadline(timeout)
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            expires = loop.time() + deadline
+
+            async def _within_deadline(awaitable: Any) -> Any:
+                try:
+                    return await asyncio.wait_for(awaitable, timeout=max(0.0, expires - loop.time()))
+                except asyncio.TimeoutError as exc:
+                    raise self._timed_out(deadline) from exc
+
+            request = self._client.build_request("POST", "/api/chat", json=payload)
+            try:
+                # Connecting and waiting for the headers count against the deadline too
+                response = await _within_deadline(self._client.send(request, stream=True))
+                try:
+                    if response.is_error:
+                        await _within_deadline(response.aread())
+                        response.raise_for_status()
+                    lines = response.aiter_lines()
+                    while True:
+                        try:
+                            line = await _within_deadline(lines.__anext__())
+                        except StopAsyncIteration:
+                            break
+                        if not line.strip():
+                            continue
+                        chunk = json.loads(line)
+                        if chunk.get("error"):
+                            raise RuntimeError(f"Ollama error: {chunk['error']}")
+                        content = chunk.get("message", {}).get("content")
+                        if content:
+                            yield content
+                        if chunk.get("done"):
+                            break
+                finally:
+                    await response.aclose()
+            except httpx.HTTPError as exc:
+                raise self._error(exc) from exc
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def aclose_when_idle(self) -> None:
+        """Close once every in-flight request has released its slot."""
+        for _ in range(self.pool_size):
+            await self._semaphore.acquire()
+        await self.aclose()
+
+
+_transport: Optional[OllamaTransport] = None
+# Background closes of replaced transports; referenced here so the loop
+# doesn't garbage-collect them before they finish
+_closing: Set["asyncio.Task[None]"] = set()
+
+
+def _closed(task: "asyncio.Task[None]") -> None:
+    _closing.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Closing a replaced Ollama transport failed: %r", task.exception())
+
+
+def get_transport(cfg: Dict[str, Any]) -> OllamaTransport:
+    """
+    Get the shared transport for the given `llm` config section.
+
+    A new transport is created if the base URL or pool settings changed
+    (models.yaml is hot-reloaded); the old one is closed in the background
+    once its in-flight requests finish.
+    """
+    global _transport
+
+    base_url = str(cfg.get("base_url", "http://localhost:11434")).rstrip("/")
+    key = (
+        base_url,
+        max(1, int(cfg.get("connection_pool_size", 4))),
+        float(cfg.get("request_timeout", 300)),
+        float(cfg.get("connect_timeout", 5)),
+    )
+    if _transport is not None and _transport.settings_key == key:
+        return _transport
+
+    old = _transport
+    _transport = OllamaTransport(
+        base_url=key[0], pool_size=key[1], request_timeout=key[2], connect_timeout=key[3]
+    )
+    if old is not None:
+        task = asyncio.get_running_loop().create_task(old.aclose_when_idle())
+        _closing.add(task)
+        task.add_done_callback(_closed)
+    return _transport
+
+
+async def close_transport() -> None:
+    """Close the shared transport (called on FastAPI shutdown)."""
+    global _transport
+
+    transport, _transport = _transport, None
+    if transport is not None:
+        await transport.aclose()
@@ -0,0 +1,150 @@
+"""
+Off-event-loop execution for research queries.
+
+Query embedding and Chroma/BM25 lookups are blocking, so they run on a
+small dedicated thread pool instead of the event loop (or the shared
+FastAPI threadpool). Queries that arrive within `query_batch_window_ms` of
+each other are micro-batched into a single `embed_texts` call, and each
+caller gets its own vector back.
+
+Settings live under `embeddings` in `config/models.yaml`.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import threading
+import weakref
+
+import numpy as np
+
+from app.ai.embeddings import embed_texts, load_embedding_config
+
+
+DEFAULT_WORKERS = 2
+DEFAULT_BATCH_WINDOW_MS = 3.0
+DEFAULT_MAX_BATCH = 32
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            workers = int(load_embedding_config().get("query_workers", DEFAULT_WORKERS))
+            _executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="query")
+        return _executor
+
+
+async def run_query(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking query step on the dedicated query executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), partial(fn, *args, **kwargs))
+
+
+class QueryBatcher:
+    """Collects query texts for a few milliseconds and embeds them together."""
+
+    def __init__(self, window_ms: float, max_batch: int):
+        self.window = max(0.0, window_ms) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._pending: List[Tuple[str, "asyncio.Future[np.ndarray]"]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # In-flight encode tasks, referenced so they aren't garbage-collected
+        self._runs: Set["asyncio.Task[None]"] = set()
+        self._stats = {"queries": 0, "batches": 0, "largest_batch": 0}
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed one query, sharing the model call with concurrent queries."""
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[np.ndarray]" = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._runs.add(task)
+            task.add_done_callback(self._runs.discard)
+
+    async def _run(self, batch: List[Tuple[str, "asyncio.Future[np.ndarray]"]]) -> None:
+        self._stats["queries"] += len(batch)
+        self._stats["batches"] += 1
+        self._stats["largest_batch"] = max(self._stats["largest_batch"], len(batch))
+        try:
+            vectors = await run_query(embed_texts, [text for text, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            # A caller may have been cancelled (client went away) meanwhile
+            if not future.done():
+                future.set_result(vector)
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._stats)
+        stats["mean_batch"] = round(stats["queries"] / stats["batches"], 2) if stats["batches"] else 0.0
+        return stats
+
+
+# One batcher per event loop (futures and timers are loop-bound), dropped
+# with its loop; keyed on the loop itself, as a closed loop's id() can be
+# reused by a new one
+_batchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, QueryBatcher]" = weakref.WeakKeyDictionary()
+
+
+def _get_batcher() -> QueryBatcher:
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(loop)
+    if batcher is None:
+        cfg = load_embedding_config()
+        batcher = _batchers[loop] = QueryBatcher(
+            window_ms=float(cfg.get("query_batch_window_ms", DEFAULT_BATCH_WINDOW_MS)),
+            max_batch=int(cfg.get("query_max_batch", DEFAULT_MAX_BATCH)),
+        )
+    return batcher
+
+
+async def embed_query(text: str) -> np.ndarray:
+    """Embed a single query off the event loop, micro-batched with concurrent queries."""
+    return await _get_batcher().embed(text)
+
+
+def get_query_stats() -> Dict[str, Any]:
+    """Return micro-batching counters (summed over live event loops)."""
+    totals: Dict[str, Any] = {"queries": 0, "batches": 0, "largest_batch": 0}
+    for loop, batcher in list(_batchers.items()):
+        # A closed loop may not have been collected yet
+        if loop.is_closed():
+            _batchers.pop(loop, None)
+            continue
+        stats = batcher.stats()
+        totals["queries"] += stats["queries"]
+        totals["batches"] += stats["batches"]
+        totals["largest_batch"] = max(totals["largest_batch"], stats["largest_batch"])
+    totals["mean_batch"] = round(totals["queries"] / totals["batches"], 2) if totals["batches"] else 0.0
+    return totals
+
+
+def shutdown_query_executor() -> None:
+    """Stop the query executor (called on FastAPI shutdown)."""
+    global _executor
+
+    with _executor_lock:
+        executor, _executor = _executor, None
+    _batchers.clear()
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
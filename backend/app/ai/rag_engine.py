@@ -4,72 +4,167 @@ RAG (Retrieval-Augmented Generation) engine.
 Provides:
 - `search_documents` for semantic search over local documents.
 - `answer_question` for question answering with citations using local LLM.
+- `stream_answer` for the same, streamed as citation and token events.
+
+Retrieved chunks are packed into the prompt up to a token budget derived
+from the model's context window (see `app.ai.context_packer`), and answers
+are served from the semantic answer cache when the same (or a
+near-identical) question retrieves the same chunks.
 """
-from typing import List, Dict, Any
+from typing import AsyncGenerator, List, Dict, Any, Optional, Tuple
+
+import asyncio
 
-from app.ai.llm_client import generate
+import numpy as np
+
+from app.core.config import CONFIG_DIR, load_yaml_config
+from app.ai.answer_cache import answer_cache
+from app.ai.context_packer import context_budget, pack_context
+from app.ai.query_executor import embed_query, run_query
+from app.ai.llm_client import generate, generate_streaming, load_model_config
+from app.ai.reranker import load_rerank_config, rerank
+from app.preprocessing.tokens import estimate_tokens
 from app.storage.vector_store import VectorStore
 
 
-async def search_documents(query: str, limit: int = 5) -> List[Dict[str, Any]]:
+def _load_rag_config(section: str) -> Dict[str, Any]:
+    rag = load_yaml_config(CONFIG_DIR / "models.yaml").get("rag", {}) or {}
+    return rag.get(section, {}) or {}
+
+
+def _load_hybrid_config() -> Dict[str, Any]:
+    return _load_rag_config("hybrid")
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: List[Tuple[str, List[Dict[str, Any]]]], limit: int, k: int = 60
+) -> List[Dict[str, Any]]:
     """
-    Perform semantic search over documents.
+    Fuse ranked result lists with reciprocal-rank fusion.
+
+    Each chunk scores sum(1 / (k + rank)) over the lists it appears in.
+    Retrievers' `score`s aren't comparable (a Chroma distance is lower-is-
+    better, BM25 higher-is-better), so a fused result drops `score`, gains
+    `rrf_score`, and keeps each retriever's own score under that list's
+    field name.
 
     Args:
-        query: Search query
+        ranked_lists: (score field, results in rank order) per retriever,
+            e.g. `("dense_distance", dense), ("bm25_score", lexical)`
         limit: Maximum number of results
+        k: RRF constant
 
     Returns:
-        List of relevant document chunks with metadata
+        Results ordered by `rrf_score`, highest first
     """
-    store = VectorStore()
-    results = store.search(query=query, limit=limit)
-    return results
+    fused: Dict[str, Dict[str, Any]] = {}
+    for score_field, results in ranked_lists:
+        for rank, item in enumerate(results, start=1):
+            key = item.get("id") or item.get("text", "")
+            entry = fused.get(key)
+            if entry is None:
+                entry = {name: value for name, value in item.items() if name != "score"}
+                entry["rrf_score"] = 0.0
+                fused[key] = entry
+            entry["rrf_score"] += 1.0 / (k + rank)
+            if item.get("score") is not None:
+                entry[score_field] = item["score"]
+    ordered = sorted(fused.values(), key=lambda r: r["rrf_score"], reverse=True)
+    return ordered[:limit]
 
 
-async def answer_question(query: str, context_limit: int = 5) -> Dict[str, Any]:
+async def search_documents(
+    query: str,
+    limit: int = 5,
+    where: Optional[Dict[str, Any]] = None,
+    query_embedding: Optional[np.ndarray] = None,
+) -> List[Dict[str, Any]]:
     """
-    Answer a question using RAG.
+    Perform hybrid semantic + keyword search over documents.
+
+    Dense (Chroma) and BM25 results are fused with reciprocal-rank fusion,
+    so exact identifiers found only lexically still surface. When
+    `rag.rerank.enabled` is set, more candidates are fetched and rescored
+    with a local cross-encoder. Embedding and lookups run on the query
+    executor, never on the event loop.
 
     Args:
-        query: User question
-        context_limit: Number of document chunks to use as context
+        query: Search query
+        limit: Maximum number of results
+        where: Metadata filter, e.g. `{"source": "report.pdf"}`
+            (see `app.storage.filters`)
+        query_embedding: Embedding of `query`, if the caller already has it
 
     Returns:
-        Dict with `answer` and `citations` (list of chunks/metadata)
+        List of relevant document chunks with metadata. Hybrid results
+        carry `rrf_score` plus `dense_distance` and/or `bm25_score` from
+        the retrievers that found them; dense-only results carry `score`
+        (the Chroma distance)
+
+    Raises:
+        ValueError: If the filter is malformed
     """
-    # 1. Retrieve relevant document chunks
-    search_results = await search_documents(query, limit=context_limit)
+    store = await run_query(VectorStore)
+    query_emb = query_embedding if query_embedding is not None else await embed_query(query)
+    cfg = _load_hybrid_config()
+    rerank_cfg = load_rerank_config()
+    reranking = bool(rerank_cfg.get("enabled", False))
+    fetch = max(limit, int(rerank_cfg.get("candidates", 30))) if reranking else limit
 
-    if not search_results:
-        # Fallback: let LLM answer without context, but make it clear
-        answer_text = await generate(
-            prompt=(
-                "User question:\n"
-                f"{query}\n\n"
-                "No relevant documents were found in the local knowledge base. "
-                "Answer as best as you can, but mention that you couldn't find "
-                "supporting local documents."
-            )
+    if not cfg.get("enabled", True):
+        results = await run_query(store.search, query, fetch, where, query_emb)
+    else:
+        candidates = max(fetch, int(cfg.get("candidates", 20)))
+        dense, lexical = await asyncio.gather(
+            run_query(store.search, query, candidates, where, query_emb),
+            run_query(store.lexical_search, query, candidates, where),
         )
-        return {"answer": answer_text, "citations": []}
+        results = reciprocal_rank_fusion(
+            [("dense_distance", dense), ("bm25_score", lexical)],
+            limit=fetch,
+            k=int(cfg.get("rrf_k", 60)),
+        )
+
+    if reranking and len(results) > 1:
+        return await run_query(rerank, query, results, limit)
+    return results[:limit]
+
+
+def _no_context_prompt(query: str) -> str:
+    return (
+        "User question:\n"
+        f"{query}\n\n"
+        "No relevant documents were found in the local knowledge base. "
+        "Answer as best as you can, but mention that you couldn't find "
+        "supporting local documents."
+    )
 
-    # 2. Build context from top documents
+
+def _location(meta: Dict[str, Any]) -> str:
+    """Page/slide/sheet location of a chunk for its citation header."""
+    parts = []
+    for key in ("page", "slide"):
+        if meta.get(key) is not None:
+            parts.append(f"{key}={meta[key]}")
+    if meta.get("sheet") is not None:
+        parts.append(f"sheet={meta['sheet']}")
+        if meta.get("row_start") is not None:
+            parts.append(f"rows={meta['row_start']}-{meta.get('row_end')}")
+    return "".join(f", {part}" for part in parts)
+
+
+def _build_prompt(query: str, search_results: List[Dict[str, Any]]) -> str:
+    """Build the answer prompt from retrieved chunks, numbered for citations."""
     context_snippets = []
     for idx, item in enumerate(search_results, start=1):
         meta = item.get("metadata", {}) or {}
         source = meta.get("source", "unknown")
-        page = meta.get("page")
-        header = f"[{idx}] source={source}"
-        if page is not None:
-            header += f", page={page}"
-        header += ":\n"
+        header = f"[{idx}] source={source}{_location(meta)}:\n"
         context_snippets.append(header + item.get("text", ""))
 
     context = "\n\n".join(context_snippets)
 
-    # 3. Ask LLM with context
-    prompt = (
+    return (
         "You are a local research assistant. Answer the user's question using "
         "ONLY the provided context from local documents. If the context is "
         "insufficient, say so explicitly.\n\n"
@@ -80,10 +175,111 @@ async def answer_question(query: str, context_limit: int = 5) -> Dict[str, Any]:
         "Answer (be concise, and refer to citations like [1], [2] where relevant):"
     )
 
+
+def _pack_prompt(query: str, search_results: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Pack retrieved chunks into the prompt within the model's token budget.
+
+    Returns:
+        (prompt, packed snippets used as citations, token usage)
+    """
+    if not search_results:
+        prompt = _no_context_prompt(query)
+        return prompt, [], {"prompt_tokens": estimate_tokens(prompt), "context_tokens": 0}
+
+    overhead = estimate_tokens(_build_prompt(query, []))
+    packed, usage = pack_context(search_results, context_budget(load_model_config(), overhead))
+    prompt = _build_prompt(query, packed)
+    return prompt, packed, {"prompt_tokens": estimate_tokens(prompt), **usage}
+
+
+async def _retrieve(query: str, context_limit: int) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+    """
+    Retrieve at least `context_limit` chunks, more if the packer can use them.
+
+    Returns:
+        (results, query embedding); the embedding is also the answer cache key
+    """
+    candidates = int(_load_rag_config("packing").get("candidates", context_limit))
+    query_emb = await embed_query(query)
+    results = await search_documents(
+        query, limit=max(context_limit, candidates), query_embedding=query_emb
+    )
+    return results, query_emb
+
+
+async def answer_question(query: str, context_limit: int = 5) -> Dict[str, Any]:
+    """
+    Answer a question using RAG.
+
+    Args:
+        query: User question
+        context_limit: Minimum number of document chunks retrieved as context
+            candidates (`rag.packing.candidates` may retrieve more)
+
+    Returns:
+        Dict with `answer`, `citations` (the packed context snippets) and
+        `usage` (prompt token counts)
+    """
+    # 1. Retrieve relevant document chunks
+    search_results, query_emb = await _retrieve(query, context_limit)
+
+    # 2. Reuse a cached answer for a similar question over the same chunks
+    caching = answer_cache.enabled
+    if caching:
+        cached = answer_cache.lookup(query_emb, [r.get("id") for r in search_results])
+        if cached is not None:
+            return {**cached, "cached": True}
+
+    # 3. Pack the top chunks into the token budget and ask the LLM
+    # (without context, the LLM answers but says nothing was found)
+    prompt, citations, usage = _pack_prompt(query, search_results)
     answer_text = await generate(prompt=prompt)
 
-    return {
+    result = {
         "answer": answer_text,
-        "citations": search_results,
+        "citations": citations,
+        "usage": usage,
     }
+    if caching:
+        answer_cache.store(query_emb, search_results, result)
+    return result
+
 
+async def stream_answer(query: str, context_limit: int = 5) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    Answer a question using RAG, streaming the result.
+
+    Yields event dicts with `event` and `data`:
+    - `citations`: the packed context snippets, sent as soon as retrieval finishes
+    - `token`: answer text fragments as the LLM produces them
+    - `done`: streaming metrics (time to first token, tokens/sec, ...) and
+      prompt token `usage`
+    """
+    search_results, query_emb = await _retrieve(query, context_limit)
+
+    caching = answer_cache.enabled
+    if caching:
+        cached = answer_cache.lookup(query_emb, [r.get("id") for r in search_results])
+        if cached is not None:
+            yield {"event": "citations", "data": cached["citations"]}
+            yield {"event": "token", "data": cached["answer"]}
+            yield {"event": "done", "data": {"cached": True, "usage": cached.get("usage")}}
+            return
+
+    prompt, citations, usage = _pack_prompt(query, search_results)
+    yield {"event": "citations", "data": citations}
+
+    metrics: Dict[str, Any] = {}
+    tokens: List[str] = []
+    async for token in generate_streaming(prompt=prompt, metrics=metrics):
+        tokens.append(token)
+        yield {"event": "token", "data": token}
+
+    if caching:
+        answer_cache.store(
+            query_emb,
+            search_results,
+            {"answer": "".join(tokens), "citations": citations, "usage": usage},
+        )
+    yield {"event": "done", "data": {**metrics, "usage": usage}}
@@ -0,0 +1,150 @@
+"""
+Local cross-encoder reranking of retrieved chunks.
+
+Vector distance alone ranks our documents noisily, so `search_documents`
+can over-fetch candidates and rescore (query, chunk) pairs with a small
+sentence-transformers cross-encoder on CPU. Pairs are scored in batches and
+cached; once `latency_budget_ms` is spent, the candidates not yet scored
+keep their retrieval order behind the rescored ones.
+
+Settings live under `rag.rerank` in `config/models.yaml`.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import threading
+import time
+
+try:
+    from sentence_transformers import CrossEncoder  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    CrossEncoder = None  # type: ignore
+
+from app.core.config import CONFIG_DIR, load_yaml_config
+
+
+DEFAULT_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+DEFAULT_BATCH_SIZE = 16
+DEFAULT_LATENCY_BUDGET_MS = 300.0
+DEFAULT_CACHE_ENTRIES = 4096
+
+_models: Dict[Tuple[str, str], "CrossEncoder"] = {}
+_model_lock = threading.Lock()
+
+
+def load_rerank_config() -> Dict[str, Any]:
+    rag = load_yaml_config(CONFIG_DIR / "models.yaml").get("rag", {}) or {}
+    return rag.get("rerank", {}) or {}
+
+
+def _get_model(name: str, device: str) -> "CrossEncoder":
+    """Get or lazily load a cross-encoder model."""
+    if CrossEncoder is None:
+        raise RuntimeError(
+            "sentence-transformers is not installed. "
+            "Install optional AI dependencies with:\n"
+            "  pip install -r backend/requirements-ai.txt"
+        )
+    with _model_lock:
+        model = _models.get((name, device))
+        if model is None:
+            model = _models[(name, device)] = CrossEncoder(name, device=device)
+        return model
+
+
+class _ScoreCache:
+    """Thread-safe LRU of cross-encoder scores keyed by (model, query, chunk) hash."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[float]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: float) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_cache = _ScoreCache(DEFAULT_CACHE_ENTRIES)
+_stats = {"reranked": 0, "budget_exhausted": 0, "last_latency_ms": 0.0}
+
+
+def _score_key(model_name: str, query: str, text: str) -> str:
+    return hashlib.sha256(f"{model_name}\x00{query}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def rerank(query: str, results: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """
+    Rescore retrieved chunks with the cross-encoder and return the top `limit`.
+
+    Blocking (CPU-bound); call from a worker thread.
+
+    Args:
+        query: Search query
+        results: Candidates in retrieval order
+        limit: Number of results to return
+
+    Returns:
+        Candidates ordered by `rerank_score`; candidates the latency budget
+        didn't cover follow in their original order without a score
+    """
+    cfg = load_rerank_config()
+    model_name = str(cfg.get("model", DEFAULT_MODEL))
+    batch_size = max(1, int(cfg.get("batch_size", DEFAULT_BATCH_SIZE)))
+    budget = float(cfg.get("latency_budget_ms", DEFAULT_LATENCY_BUDGET_MS)) / 1000.0
+    _cache.max_entries = int(cfg.get("cache_max_entries", DEFAULT_CACHE_ENTRIES))
+
+    # Loading the model is a one-off cost and isn't charged to the budget
+    model = _get_model(model_name, str(cfg.get("device", "cpu")))
+    start = time.perf_counter()
+
+    keys = [_score_key(model_name, query, r.get("text", "")) for r in results]
+    scores: List[Optional[float]] = [_cache.get(key) for key in keys]
+    pending = [i for i, score in enumerate(scores) if score is None]
+
+    # Candidates are scored in retrieval order, so the best-ranked ones are
+    # always covered first when the budget runs out
+    for offset in range(0, len(pending), batch_size):
+        if time.perf_counter() - start >= budget:
+            _stats["budget_exhausted"] += 1
+            break
+        batch = pending[offset : offset + batch_size]
+        predicted = model.predict(
+            [(query, results[i].get("text", "")) for i in batch],
+            batch_size=batch_size,
+            show_progress_bar=False,
+        )
+        for i, score in zip(batch, predicted):
+            scores[i] = float(score)
+            _cache.put(keys[i], scores[i])
+
+    scored = sorted(
+        ({**r, "rerank_score": s} for r, s in zip(results, scores) if s is not None),
+        key=lambda r: r["rerank_score"],
+        reverse=True,
+    )
+    unscored = [r for r, s in zip(results, scores) if s is None]
+
+    _stats["reranked"] += 1
+    _stats["last_latency_ms"] = round((time.perf_counter() - start) * 1000.0, 2)
+    return (scored + unscored)[:limit]
+
+
+def get_rerank_stats() -> Dict[str, Any]:
+    """Return reranking counters and score cache hit/miss counts."""
+    return {**_stats, "cache_hits": _cache.hits, "cache_misses": _cache.misses}
@@ -0,0 +1,210 @@
+"""
+Hierarchical meeting summarization.
+
+Long transcripts don't fit in one prompt, so they are split into
+speaker-aware segments, the segments are summarized in parallel (under the
+shared LLM limiter), and the partial summaries are reduced into one.
+
+Segment boundaries are content-defined (they depend on the speaker turns
+themselves, not on absolute offsets) and segment summaries are cached by
+content hash, so editing one part of a transcript only recomputes the
+segments that actually changed.
+"""
+from collections import OrderedDict
+from typing import List, Optional
+import asyncio
+import hashlib
+import re
+import threading
+
+from app.ai.llm_client import generate, get_llm_limiter, load_model_config
+
+
+DEFAULT_SEGMENT_CHARS = 6000
+CACHE_MAX_ENTRIES = 1024
+
+# "Alice: ...", "[00:12:03] Bob: ...", "SPEAKER 1: ..."
+_SPEAKER_TURN_RE = re.compile(r"^\s*(\[[\d:.]+\]\s*)?[A-Za-z][\w .'-]{0,40}:\s")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+SEGMENT_PROMPT = (
+    "Summarize this part of a meeting transcript in concise bullet points. "
+    "Keep decisions, owners and deadlines.\n\n"
+    "Transcript part:\n{text}\n"
+)
+REDUCE_PROMPT = (
+    "The following are summaries of consecutive parts of one meeting. "
+    "Combine them into a single concise bullet-point summary of the whole "
+    "meeting, merging duplicates and keeping decisions, owners and deadlines.\n\n"
+    "Partial summaries:\n{text}\n"
+)
+SINGLE_PROMPT = (
+    "Summarize the following meeting transcript in concise bullet points.\n\n"
+    "Transcript:\n{text}\n"
+)
+
+
+class _SummaryCache:
+    """Small thread-safe LRU of summaries keyed by content hash."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_cache = _SummaryCache(CACHE_MAX_ENTRIES)
+
+
+def _split_long_turn(turn: str, max_chars: int) -> List[str]:
+    """Split a single oversized turn on sentence boundaries (hard cut as last resort)."""
+    pieces: List[str] = []
+    current = ""
+    for sentence in _SENTENCE_END_RE.split(turn):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _speaker_turns(transcript: str) -> List[str]:
+    """Group transcript lines into speaker turns."""
+    turns: List[str] = []
+    current: List[str] = []
+    for line in transcript.splitlines():
+        if _SPEAKER_TURN_RE.match(line) and current:
+            turns.append("\n".join(current))
+            current = []
+        if line.strip() or current:
+            current.append(line)
+    if current:
+        turns.append("\n".join(current))
+    return turns
+
+
+def split_transcript(transcript: str, max_chars: int = DEFAULT_SEGMENT_CHARS) -> List[str]:
+    """
+    Split a transcript into speaker-aware segments of at most `max_chars`.
+
+    Segments never split a speaker turn unless the turn alone is too long.
+    Once a segment is past half of `max_chars`, it is cut after any turn
+    whose hash hits a fixed pattern, so boundaries depend only on nearby
+    content and stay put when other parts of the transcript are edited.
+    """
+    min_chars = max_chars // 2
+    segments: List[str] = []
+    current: List[str] = []
+    size = 0
+
+    for turn in _speaker_turns(transcript):
+        parts = _split_long_turn(turn, max_chars) if len(turn) > max_chars else [turn]
+        for part in parts:
+            if current and size + len(part) + 1 > max_chars:
+                segments.append("\n".join(current))
+                current, size = [], 0
+            current.append(part)
+            size += len(part) + 1
+            digest = hashlib.sha1(part.encode("utf-8")).digest()
+            if size >= min_chars and digest[0] % 4 == 0:
+                segments.append("\n".join(current))
+                current, size = [], 0
+
+    if current:
+        segments.append("\n".join(current))
+    return segments
+
+
+async def _cached_generate(template: str, text: str, model_name: str) -> str:
+    key = hashlib.sha256(f"{model_name}\x00{template}\x00{text}".encode("utf-8")).hexdigest()
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    async with get_llm_limiter():
+        result = await generate(prompt=template.format(text=text))
+    _cache.put(key, result)
+    return result
+
+
+async def summarize_transcript(transcript: str, max_chars: Optional[int] = None) -> str:
+    """
+    Summarize a meeting transcript of any length.
+
+    Short transcripts use a single prompt. Longer ones are summarized per
+    segment in parallel, then the segment summaries are reduced (repeatedly,
+    if they are still too long for one prompt).
+
+    Args:
+        transcript: Full transcript text
+        max_chars: Segment size (defaults to `llm.summary_segment_chars`)
+
+    Returns:
+        Bullet-point summary
+    """
+    cfg = load_model_config()
+    model_name = str(cfg.get("model", "llama3:8b"))
+    if max_chars is None:
+        max_chars = int(cfg.get("summary_segment_chars", DEFAULT_SEGMENT_CHARS))
+
+    if len(transcript) <= max_chars:
+        return await _cached_generate(SINGLE_PROMPT, transcript, model_name)
+
+    segments = split_transcript(transcript, max_chars)
+    summaries = await asyncio.gather(
+        *(_cached_generate(SEGMENT_PROMPT, segment, model_name) for segment in segments)
+    )
+
+    # Reduce until everything fits into one prompt
+    while True:
+        combined = "\n\n".join(f"Part {i}:\n{s}" for i, s in enumerate(summaries, start=1))
+        if len(combined) <= max_chars or len(summaries) == 1:
+            return await _cached_generate(REDUCE_PROMPT, combined, model_name)
+        groups: List[List[str]] = [[]]
+        group_size = 0
+        for summary in summaries:
+            if groups[-1] and group_size + len(summary) > max_chars:
+                groups.append([])
+                group_size = 0
+            groups[-1].append(summary)
+            group_size += len(summary)
+        if len(groups) == len(summaries):
+            # Each summary alone is too long to pair; reduce them pairwise
+            groups = [summaries[i : i + 2] for i in range(0, len(summaries), 2)]
+        summaries = await asyncio.gather(
+            *(
+                _cached_generate(REDUCE_PROMPT, "\n\n".join(group), model_name)
+                for group in groups
+            )
+        )
+
+
+def get_summary_cache_stats() -> dict:
+    """Return hit/miss counters for the segment summary cache."""
+    return {"hits": _cache.hits, "misses": _cache.misses}
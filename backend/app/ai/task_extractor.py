@@ -0,0 +1,190 @@
+"""
+Map-reduce task extraction over whole documents.
+
+Chunks produced by `chunk_text` are grouped into prompt-sized windows. Each
+window is sent to the local LLM concurrently (bounded by
+`llm.extraction_concurrency` per document and by the shared LLM limiter
+overall), windows that are near-duplicates of one already sent are skipped,
+and the per-window JSON results are merged and deduplicated into a single
+task list.
+"""
+from typing import Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import re
+
+from app.ai.llm_client import generate, get_llm_limiter, load_model_config
+
+
+DEFAULT_WINDOW_CHARS = 3000
+DEFAULT_CONCURRENCY = 2
+# Windows whose word shingles overlap at least this much with an already
+# selected window are skipped (repeated boilerplate, copied sections, ...)
+NEAR_DUPLICATE_THRESHOLD = 0.9
+SHINGLE_SIZE = 5
+
+_TASK_FIELDS = ("description", "due_date", "priority")
+
+
+def safe_extract_json_array(text: str) -> list[dict]:
+    """
+    Try to parse a JSON array from a model response.
+    Accepts the whole response being JSON, or JSON embedded inside markdown.
+    """
+    text = text.strip()
+    # fast path
+    try:
+        data = json.loads(text)
+        if isinstance(data, list):
+            return [x for x in data if isinstance(x, dict)]
+    except Exception:
+        pass
+
+    # heuristic: locate first '[' and last ']'
+    start = text.find("[")
+    end = text.rfind("]")
+    if start != -1 and end != -1 and end > start:
+        snippet = text[start : end + 1]
+        try:
+            data = json.loads(snippet)
+            if isinstance(data, list):
+                return [x for x in data if isinstance(x, dict)]
+        except Exception:
+            return []
+    return []
+
+
+def build_windows(chunks: List[str], window_chars: int = DEFAULT_WINDOW_CHARS) -> List[str]:
+    """Group consecutive chunks into windows of at most `window_chars` characters."""
+    windows: List[str] = []
+    current: List[str] = []
+    size = 0
+    for chunk in chunks:
+        if current and size + len(chunk) > window_chars:
+            windows.append("\n".join(current))
+            current, size = [], 0
+        current.append(chunk)
+        size += len(chunk)
+    if current:
+        windows.append("\n".join(current))
+    return windows
+
+
+def _shingles(text: str) -> set:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)}
+    return {" ".join(words[i : i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def select_distinct_windows(windows: List[str]) -> List[str]:
+    """Drop exact and near-duplicate windows, keeping document order."""
+    selected: List[str] = []
+    seen_hashes: set = set()
+    selected_shingles: List[set] = []
+    for window in windows:
+        normalized = " ".join(window.lower().split())
+        if not normalized:
+            continue
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        if digest in seen_hashes:
+            continue
+        shingles = _shingles(normalized)
+        duplicate = False
+        for other in selected_shingles:
+            union = len(shingles | other)
+            if union and len(shingles & other) / union >= NEAR_DUPLICATE_THRESHOLD:
+                duplicate = True
+                break
+        if duplicate:
+            continue
+        seen_hashes.add(digest)
+        selected_shingles.append(shingles)
+        selected.append(window)
+    return selected
+
+
+def _normalize_title(title: str) -> str:
+    return " ".join(re.findall(r"\w+", title.lower()))
+
+
+def merge_tasks(task_lists: List[List[dict]], max_tasks: int = 25) -> List[dict]:
+    """
+    Merge per-window task lists, deduplicating on normalized title.
+
+    Later duplicates only fill in fields the first occurrence left empty.
+    """
+    merged: Dict[str, dict] = {}
+    for tasks in task_lists:
+        for t in tasks:
+            title = str(t.get("title", "")).strip()
+            key = _normalize_title(title)
+            if not key:
+                continue
+            existing = merged.get(key)
+            if existing is None:
+                if len(merged) >= max_tasks:
+                    continue
+                merged[key] = {"title": title, **{f: (t.get(f) or None) for f in _TASK_FIELDS}}
+                continue
+            for f in _TASK_FIELDS:
+                if not existing.get(f) and t.get(f):
+                    existing[f] = t.get(f)
+    return list(merged.values())
+
+
+def _extraction_prompt(window: str, label: str) -> str:
+    return (
+        "Extract actionable tasks from the following content.\n"
+        "Return ONLY a JSON array of objects with keys:\n"
+        '  - "title" (string, required)\n'
+        '  - "description" (string, optional)\n'
+        '  - "due_date" (string, optional, ISO format if mentioned)\n'
+        '  - "priority" (string, optional: "high", "medium", "low")\n'
+        "Return [] if there are no tasks.\n\n"
+        f"{label}:\n{window}\n"
+    )
+
+
+async def extract_tasks(
+    chunks: List[str],
+    label: str = "Document content",
+    max_tasks: int = 25,
+    concurrency: Optional[int] = None,
+) -> List[dict]:
+    """
+    Extract tasks from every chunk of a document.
+
+    Args:
+        chunks: Document chunks (as produced by `chunk_text`)
+        label: How the content is introduced in the prompt
+        max_tasks: Maximum tasks returned after merging
+        concurrency: Parallel LLM calls (defaults to `llm.extraction_concurrency`)
+
+    Returns:
+        Deduplicated list of task dicts with `title`, `description`,
+        `due_date` and `priority`
+    """
+    cfg = load_model_config()
+    window_chars = int(cfg.get("extraction_window_chars", DEFAULT_WINDOW_CHARS))
+    if concurrency is None:
+        concurrency = int(cfg.get("extraction_concurrency", DEFAULT_CONCURRENCY))
+
+    windows = select_distinct_windows(build_windows(chunks, window_chars))
+    if not windows:
+        return []
+
+    limiter = asyncio.Semaphore(max(1, concurrency))
+
+    async def _map(window: str) -> List[dict]:
+        async with limiter, get_llm_limiter():
+            try:
+                resp = await generate(prompt=_extraction_prompt(window, label))
+            except Exception:
+                # One failed window should not lose the tasks from the others
+                return []
+        return safe_extract_json_array(resp)
+
+    results = await asyncio.gather(*(_map(w) for w in windows))
+    return merge_tasks(list(results), max_tasks=max_tasks)
@@ -2,26 +2,35 @@
 File ingestion endpoints.
 Handles uploading and processing documents.
 """
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Request
 from fastapi.concurrency import run_in_threadpool
-from typing import List
+from fastapi.responses import StreamingResponse
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
+from collections import deque
 from pathlib import Path
-import uuid
+import asyncio
+import hashlib
 import re
 from datetime import datetime
 
 from app.core.config import settings
-from app.connectors.file_reader import read_file
-from app.preprocessing.chunking import chunk_text
+from app.connectors.parse_executor import parse_segments
+from app.preprocessing.chunking import Chunk, StreamingChunker, chunk_id_factory, iter_chunks
 from app.storage.vector_store import VectorStore
-from app.ai.llm_client import generate
-from app.models import TaskModel
-from app.storage.db import get_db
+from app.ai.task_extractor import extract_tasks, merge_tasks
+from app.storage.task_store import bulk_insert_tasks
+from app.storage.db import get_db, SessionLocal
+from app.ingestion.jobs import FileProgress, job_manager
 from sqlalchemy.orm import Session
 
 router = APIRouter()
 
+# Chunks embedded and written to Chroma per round-trip (also the progress granularity)
+EMBED_BATCH_SIZE = 64
+# Batches of new chunks being scanned for tasks while ingestion continues
+EXTRACT_BATCHES_IN_FLIGHT = 2
+
 
 def _sanitize_filename(filename: str) -> str:
     """Sanitize filename to prevent path traversal and handle special characters."""
@@ -35,115 +44,225 @@ def _sanitize_filename(filename: str) -> str:
     return filename
 
 
-def _safe_extract_json_array(text: str) -> list[dict]:
+def _file_digest(path: Path) -> str:
+    """SHA-256 of a file's bytes (the identity of a document revision)."""
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _SourceIndexer:
     """
-    Try to parse a JSON array from a model response.
-    Accepts the whole response being JSON, or JSON embedded inside markdown.
+    Streams one document's chunks into the vector store.
+
+    Chunk ids are derived from content, so only chunks that are new in this
+    revision are embedded (in batches, as they arrive). `finish` deletes
+    chunks that disappeared (if `delete_missing`) and stamps every chunk
+    with its final metadata, including the total `chunk_count`. Chunks are
+    numbered (`chunk_index`) from `first_index`.
     """
-    import json
 
-    text = text.strip()
-    # fast path
+    def __init__(
+        self,
+        store: VectorStore,
+        source: str,
+        metadata: Dict[str, Any],
+        existing: Dict[str, Dict],
+        progress: Optional[FileProgress] = None,
+        delete_missing: bool = True,
+        first_index: int = 0,
+    ):
+        self.store = store
+        self.source = source
+        self.metadata = metadata
+        self.existing = existing
+        self.progress = progress
+        self.delete_missing = delete_missing
+        self.first_index = first_index
+        self.count = 0
+        self.embedded = 0
+        self._next_id = chunk_id_factory(source)
+        self._pending: List[Tuple[str, Dict[str, Any], str]] = []  # (text, metadata, id)
+        self._stamps: List[Tuple[str, Dict[str, Any]]] = []  # (id, metadata) of every chunk
+
+    async def add(self, chunks: List[Chunk]) -> List[str]:
+        """Queue chunks; returns the texts of any newly embedded batch."""
+        for chunk in chunks:
+            chunk_id = self._next_id(chunk.text)
+            metadata = {
+                **self.metadata,
+                **chunk.metadata,
+                "source": self.source,
+                "chunk_index": self.first_index + self.count,
+            }
+            self.count += 1
+            self._stamps.append((chunk_id, metadata))
+            if chunk_id not in self.existing:
+                self._pending.append((chunk.text, metadata, chunk_id))
+        if len(self._pending) >= EMBED_BATCH_SIZE:
+            return await self._flush()
+        self._report()
+        return []
+
+    async def _flush(self) -> List[str]:
+        batch, self._pending = self._pending, []
+        if batch:
+            texts = [text for text, _, _ in batch]
+            await run_in_threadpool(
+                self.store.add_documents, texts, [m for _, m, _ in batch], [i for _, _, i in batch]
+            )
+            self.embedded += len(batch)
+            self._report()
+            return texts
+        return []
+
+    def _report(self) -> None:
+        if self.progress is not None:
+            self.progress.update(
+                status="embedding",
+                chunks_total=self.count,
+                chunks_embedded=self.embedded,
+                chunks_unchanged=self.count - self.embedded - len(self._pending),
+            )
+
+    async def finish(self) -> List[str]:
+        """Embed the last batch, delete removed chunks and stamp final metadata."""
+        texts = await self._flush()
+
+        seen = {chunk_id for chunk_id, _ in self._stamps}
+        removed = sorted(set(self.existing) - seen) if self.delete_missing else []
+        if removed:
+            await run_in_threadpool(self.store.delete_documents, removed)
+
+        # Stamped last: until then chunks don't carry this revision's final
+        # metadata, so an interrupted run is never mistaken for a complete one
+        final = {"chunk_count": self.count} if self.delete_missing else {}
+        stamps = [
+            (chunk_id, {**metadata, **final})
+            for chunk_id, metadata in self._stamps
+            if self.existing.get(chunk_id) != {**metadata, **final}
+        ]
+        for start in range(0, len(stamps), EMBED_BATCH_SIZE * 16):
+            batch = stamps[start : start + EMBED_BATCH_SIZE * 16]
+            await run_in_threadpool(
+                self.store.update_metadatas, [m for _, m in batch], [i for i, _ in batch]
+            )
+
+        if self.progress is not None:
+            self.progress.update(chunks_deleted=len(removed))
+        self._report()
+        return texts
+
+
+async def _scan_for_tasks(texts: List[str], label: str) -> List[dict]:
+    """Extract tasks from newly embedded chunks; failures only lose these tasks."""
     try:
-        data = json.loads(text)
-        if isinstance(data, list):
-            return [x for x in data if isinstance(x, dict)]
+        return await extract_tasks(texts, label=label)
     except Exception:
-        pass
+        return []
 
-    # heuristic: locate first '[' and last ']'
-    start = text.find("[")
-    end = text.rfind("]")
-    if start != -1 and end != -1 and end > start:
-        snippet = text[start : end + 1]
-        try:
-            data = json.loads(snippet)
-            if isinstance(data, list):
-                return [x for x in data if isinstance(x, dict)]
-        except Exception:
-            return []
-    return []
 
-
-async def _process_and_index_file(file_path: Path, original_name: str, db: Session):
+async def _process_and_index_file(
+    file_path: Path, original_name: str, db: Session, progress: Optional[FileProgress] = None
+):
     """
     Read a file, chunk it, embed it, store chunks in the vector DB,
     and extract tasks automatically.
-    """
-    text = await run_in_threadpool(read_file, file_path)
-    if not text:
-        return 0, []
 
-    chunks = chunk_text(text)
-    store = VectorStore()
+    The file is streamed: parsed segments (pages, slides, sheet rows) are
+    chunked, embedded and scanned for tasks batch by batch, and each chunk
+    keeps its page/slide/sheet location in its metadata.
 
-    metadatas = []
-    ids = []
-    for idx, chunk in enumerate(chunks):
-        chunk_id = f"{uuid.uuid4()}-{idx}"
-        ids.append(chunk_id)
-        metadatas.append(
-            {
-                "source": original_name,
-                "vault_path": str(file_path),
-                "chunk_index": idx,
-            }
-        )
+    Re-ingesting a file is incremental: an unchanged file (same content
+    hash) is not even parsed, and for a new revision only changed chunks
+    are embedded and scanned for tasks while removed chunks are deleted.
 
-    await run_in_threadpool(store.add_documents, chunks, metadatas, ids)
+    If `progress` is given, bytes parsed, chunks embedded and tasks extracted
+    are reported on it as each stage advances.
+    """
+    store = VectorStore()
+    digest = await run_in_threadpool(_file_digest, file_path)
+    existing = await run_in_threadpool(store.get_source_metadatas, original_name)
+    if existing and all(
+        meta.get("content_hash") == digest and meta.get("chunk_count") == len(existing)
+        for meta in existing.values()
+    ):
+        if progress is not None:
+            progress.update(bytes_parsed=progress.bytes_total, chunks_unchanged=len(existing))
+        return len(existing), []
+
+    indexer = _SourceIndexer(
+        store,
+        original_name,
+        {"vault_path": str(file_path), "content_hash": digest},
+        existing,
+        progress,
+    )
+    chunker = StreamingChunker()
+    # Task extraction of earlier batches overlaps with embedding of later
+    # ones, with a bounded number of batches outstanding
+    scans: Deque["asyncio.Task[List[dict]]"] = deque()
+    task_lists: List[List[dict]] = []
+
+    async def _scan(texts: List[str]) -> None:
+        if not texts:
+            return
+        if len(scans) >= EXTRACT_BATCHES_IN_FLIGHT:
+            task_lists.append(await scans.popleft())
+        scans.append(asyncio.create_task(_scan_for_tasks(texts, "Document content")))
 
-    # Extract tasks from document using LLM
-    extracted_tasks = []
     try:
-        task_resp = await generate(
-            prompt=(
-                "Extract actionable tasks from the following document content.\n"
-                "Return ONLY a JSON array of objects with keys:\n"
-                '  - "title" (string, required)\n'
-                '  - "description" (string, optional)\n'
-                '  - "due_date" (string, optional, ISO format if mentioned)\n'
-                '  - "priority" (string, optional: "high", "medium", "low")\n\n'
-                f"Document content (first 3000 chars):\n{text[:3000]}\n"
-            )
-        )
-        tasks_json = _safe_extract_json_array(task_resp)
+        async for segment in parse_segments(file_path):
+            chunks = await run_in_threadpool(chunker.feed, segment)
+            await _scan(await indexer.add(chunks))
+        if progress is not None:
+            progress.update(bytes_parsed=progress.bytes_total)
+        await _scan(await indexer.add(chunker.finish()))
+        await _scan(await indexer.finish())
+
+        # Map-reduce over every new chunk, not just the start of the document;
+        # unchanged chunks were already scanned when first ingested
+        if progress is not None:
+            progress.update(status="extracting")
+        while scans:
+            task_lists.append(await scans.popleft())
+    finally:
+        for scan in scans:
+            scan.cancel()
 
-        for t in tasks_json[:25]:  # Limit to 25 tasks per document
-            title = str(t.get("title", "")).strip()
-            if not title:
-                continue
-            model = TaskModel(
-                title=title,
-                description=(t.get("description") or None),
-                due_date=(t.get("due_date") or None),
-                priority=(t.get("priority") or None),
-                status="detected",
-            )
-            db.add(model)
-            db.commit()
-            db.refresh(model)
-            extracted_tasks.append(
-                {
-                    "id": model.id,
-                    "title": model.title,
-                    "description": model.description,
-                    "due_date": model.due_date,
-                    "priority": model.priority,
-                    "status": model.status,
-                }
-            )
+    extracted_tasks = []
+    try:
+        # One transaction for all detected tasks
+        extracted_tasks = bulk_insert_tasks(db, merge_tasks(task_lists))
+        if progress is not None:
+            progress.update(tasks_extracted=len(extracted_tasks))
     except Exception as exc:
         # If task extraction fails, still return success for indexing
         pass
 
-    return len(chunks), extracted_tasks
+    return indexer.count, extracted_tasks
+
+
+async def _process_job_file(file_path: Path, original_name: str, progress: FileProgress):
+    """Job worker entry point: process one stored file with its own DB session."""
+    db = SessionLocal()
+    try:
+        return await _process_and_index_file(file_path, original_name, db, progress)
+    finally:
+        db.close()
 
 
 @router.post("/files")
-async def upload_files(files: List[UploadFile] = File(...), db: Session = Depends(get_db)):
+async def upload_files(files: List[UploadFile] = File(...)):
     """
-    Upload and ingest files (PDF, DOCX, XLSX, TXT, PPTX).
-    Files are processed locally, indexed into vector DB, and tasks are automatically extracted.
+    Upload files (PDF, DOCX, XLSX, TXT, PPTX) and queue them for ingestion.
+
+    Files are saved to the local vault (replacing earlier revisions with the
+    same name) and a background job is started that indexes them into the
+    vector DB and extracts tasks. Returns the job id
+    immediately; follow progress via `/jobs/{job_id}` or `/jobs/{job_id}/events`.
     """
     if not files:
         raise HTTPException(status_code=400, detail="No files uploaded")
@@ -162,89 +281,66 @@ async def upload_files(files: List[UploadFile] = File(...), db: Session = Depend
     vault_root = Path(settings.vault_path)
     vault_root.mkdir(parents=True, exist_ok=True)
 
-    results = []
-    all_extracted_tasks = []
+    progress_list: List[FileProgress] = []
 
     for f in files:
         original_filename = f.filename or "unnamed_file"
+        progress = FileProgress(filename=original_filename)
+        progress_list.append(progress)
         try:
             # Sanitize filename and handle duplicates
             safe_filename = _sanitize_filename(original_filename)
             target_path = vault_root / safe_filename
             
-            # Handle duplicate filenames by appending timestamp
-            if target_path.exists():
-                stem = target_path.stem
-                suffix = target_path.suffix
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                safe_filename = f"{stem}_{timestamp}{suffix}"
-                target_path = vault_root / safe_filename
-            
-            # Save file to vault
-            try:
-                content = await f.read()
-                if not content:
-                    results.append(
-                        {
-                            "filename": original_filename,
-                            "status": "error",
-                            "error": "File is empty",
-                        }
-                    )
-                    continue
-                target_path.write_bytes(content)
-            except Exception as exc:
-                results.append(
-                    {
-                        "filename": original_filename,
-                        "status": "error",
-                        "error": f"Failed to save file: {str(exc)}",
-                    }
-                )
-                continue
-
-            # Process and index file
-            try:
-                chunk_count, extracted_tasks = await _process_and_index_file(target_path, original_filename, db)
-                all_extracted_tasks.extend(extracted_tasks)
-                
-                results.append(
-                    {
-                        "filename": original_filename,
-                        "status": "ingested",
-                        "chunks_indexed": chunk_count,
-                        "tasks_extracted": len(extracted_tasks),
-                    }
-                )
-            except Exception as exc:
-                # If processing fails, we still keep the raw file but report error
-                error_msg = str(exc)
-                # Make error message more user-friendly
-                if "not installed" in error_msg.lower():
-                    error_msg = "Required library not installed. Please install backend dependencies."
-                elif "not found" in error_msg.lower():
-                    error_msg = "File processing library not found. Please check backend setup."
-                
-                results.append(
-                    {
-                        "filename": original_filename,
-                        "status": "error",
-                        "error": error_msg,
-                    }
-                )
+            # Save file to vault; a new revision replaces the previous one
+            # (its index is then updated incrementally)
+            content = await f.read()
+            if not content:
+                progress.status = "error"
+                progress.error = "File is empty"
                 continue
+            if not target_path.exists() or target_path.read_bytes() != content:
+                target_path.write_bytes(content)
+            progress.vault_path = str(target_path)
+            progress.bytes_total = len(content)
         except Exception as exc:
-            # Catch-all for any unexpected errors
-            results.append(
-                {
-                    "filename": original_filename,
-                    "status": "error",
-                    "error": f"Unexpected error: {str(exc)}",
-                }
-            )
+            progress.status = "error"
+            progress.error = f"Failed to save file: {str(exc)}"
             continue
 
-    return {"results": results, "detected_tasks": all_extracted_tasks}
+    job = job_manager.submit(progress_list, _process_job_file)
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}")
+async def get_ingest_job(job_id: str):
+    """Poll per-file progress of an ingestion job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_ingest_job(job_id: str, request: Request):
+    """Stream ingestion progress as Server-Sent Events until the job finishes."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        job_manager.events(job, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_ingest_job(job_id: str):
+    """Cancel an ingestion job; files not yet finished are marked cancelled."""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
 
 
 @router.post("/text")
@@ -257,65 +353,32 @@ async def ingest_text(text: str, source: str = "manual", db: Session = Depends(g
     if not text.strip():
         raise HTTPException(status_code=400, detail="Text is empty")
 
-    chunks = chunk_text(text)
     store = VectorStore()
 
-    metadatas = []
-    ids = []
-    for idx, chunk in enumerate(chunks):
-        chunk_id = f"manual-{uuid.uuid4()}-{idx}"
-        ids.append(chunk_id)
-        metadatas.append(
-            {
-                "source": source,
-                "chunk_index": idx,
-            }
-        )
-
-    await run_in_threadpool(store.add_documents, chunks, metadatas, ids)
+    # Manual text adds to the source instead of replacing it; chunks already
+    # stored under the same source are not embedded again. Numbering goes on
+    # after the stored chunks, one index apart, so the context packer never
+    # merges chunks of different submissions as neighbours
+    existing = await run_in_threadpool(store.get_source_metadatas, source)
+    indexes = [m.get("chunk_index") for m in existing.values() if isinstance(m.get("chunk_index"), int)]
+    indexer = _SourceIndexer(
+        store, source, {}, existing, delete_missing=False, first_index=max(indexes, default=-2) + 2
+    )
+    new_texts = await indexer.add(list(iter_chunks([text])))
+    new_texts += await indexer.finish()
 
     # Extract tasks from text
     extracted_tasks = []
     try:
-        task_resp = await generate(
-            prompt=(
-                "Extract actionable tasks from the following text.\n"
-                "Return ONLY a JSON array of objects with keys:\n"
-                '  - "title" (string, required)\n'
-                '  - "description" (string, optional)\n'
-                '  - "due_date" (string, optional)\n'
-                '  - "priority" (string, optional)\n\n'
-                f"Text:\n{text[:3000]}\n"
-            )
-        )
-        tasks_json = _safe_extract_json_array(task_resp)
-
-        for t in tasks_json[:25]:
-            title = str(t.get("title", "")).strip()
-            if not title:
-                continue
-            model = TaskModel(
-                title=title,
-                description=(t.get("description") or None),
-                due_date=(t.get("due_date") or None),
-                priority=(t.get("priority") or None),
-                status="detected",
-            )
-            db.add(model)
-            db.commit()
-            db.refresh(model)
-            extracted_tasks.append(
-                {
-                    "id": model.id,
-                    "title": model.title,
-                    "description": model.description,
-                    "due_date": model.due_date,
-                    "priority": model.priority,
-                    "status": model.status,
-                }
-            )
+        tasks_json = await extract_tasks(new_texts, label="Text")
+        extracted_tasks = bulk_insert_tasks(db, tasks_json)
     except Exception:
         pass
 
-    return {"status": "ingested", "chunks_indexed": len(chunks), "detected_tasks": extracted_tasks}
+    return {
+        "status": "ingested",
+        "chunks_indexed": indexer.count,
+        "chunks_embedded": indexer.embedded,
+        "detected_tasks": extracted_tasks,
+    }
 
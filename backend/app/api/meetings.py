@@ -4,12 +4,17 @@ Handles live meeting mode and meeting summaries.
 """
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
+import asyncio
+import time
 
 from sqlalchemy.orm import Session
 
 from app.storage.db import get_db
-from app.models import MeetingModel, TaskModel
-from app.ai.llm_client import generate
+from app.models import MeetingModel
+from app.storage.task_store import bulk_insert_tasks
+from app.ai.summarizer import summarize_transcript
+from app.ai.task_extractor import extract_tasks
+from app.preprocessing.chunking import chunk_text
 
 router = APIRouter()
 
@@ -19,36 +24,6 @@ class TranscriptIn(BaseModel):
     transcript: str
 
 
-def _safe_extract_json_array(text: str) -> list[dict]:
-    """
-    Try to parse a JSON array from a model response.
-    Accepts the whole response being JSON, or JSON embedded inside markdown.
-    """
-    import json
-
-    text = text.strip()
-    # fast path
-    try:
-        data = json.loads(text)
-        if isinstance(data, list):
-            return [x for x in data if isinstance(x, dict)]
-    except Exception:
-        pass
-
-    # heuristic: locate first '[' and last ']'
-    start = text.find("[")
-    end = text.rfind("]")
-    if start != -1 and end != -1 and end > start:
-        snippet = text[start : end + 1]
-        try:
-            data = json.loads(snippet)
-            if isinstance(data, list):
-                return [x for x in data if isinstance(x, dict)]
-        except Exception:
-            return []
-    return []
-
-
 @router.post("/live/start")
 async def start_live_meeting():
     """
@@ -95,62 +70,54 @@ async def ingest_transcript(body: TranscriptIn, db: Session = Depends(get_db)):
     if not transcript:
         raise HTTPException(status_code=400, detail="transcript cannot be empty")
 
-    # 1) Summarize
-    summary = await generate(
-        prompt=(
-            "Summarize the following meeting transcript in concise bullet points.\n\n"
-            f"Transcript:\n{transcript}\n"
-        )
-    )
-
-    meeting = MeetingModel(title=body.title, transcript=transcript, summary=summary)
-    db.add(meeting)
-    db.commit()
-    db.refresh(meeting)
-
-    # 2) Extract tasks (best-effort)
-    task_resp = await generate(
-        prompt=(
-            "Extract actionable tasks from the meeting transcript.\n"
-            "Return ONLY a JSON array of objects with keys:\n"
-            '  - "title" (string)\n'
-            '  - "description" (string, optional)\n'
-            '  - "due_date" (string, optional)\n'
-            '  - "priority" (string, optional)\n\n'
-            f"Transcript:\n{transcript}\n"
-        )
-    )
-    tasks_json = _safe_extract_json_array(task_resp)
-
-    created_tasks = []
-    for t in tasks_json[:25]:
-        title = str(t.get("title", "")).strip()
-        if not title:
-            continue
-        model = TaskModel(
-            title=title,
-            description=(t.get("description") or None),
-            due_date=(t.get("due_date") or None),
-            priority=(t.get("priority") or None),
-            status="detected",
-        )
-        db.add(model)
+    started = time.perf_counter()
+    timings: dict[str, float] = {}
+
+    def _elapsed_ms(since: float) -> float:
+        return round((time.perf_counter() - since) * 1000, 1)
+
+    # Summary and task extraction don't depend on each other, so both LLM
+    # stages run concurrently (each under the shared LLM limiter).
+    async def _summarize_and_store() -> MeetingModel:
+        stage_start = time.perf_counter()
+        # Long transcripts are summarized segment by segment, then reduced
+        summary = await summarize_transcript(transcript)
+        timings["summary_ms"] = _elapsed_ms(stage_start)
+
+        # Commit the meeting as soon as its summary exists, before any tasks
+        stage_start = time.perf_counter()
+        meeting = MeetingModel(title=body.title, transcript=transcript, summary=summary)
+        db.add(meeting)
         db.commit()
-        db.refresh(model)
-        created_tasks.append(
-            {
-                "id": model.id,
-                "title": model.title,
-                "description": model.description,
-                "due_date": model.due_date,
-                "priority": model.priority,
-                "status": model.status,
-            }
-        )
+        db.refresh(meeting)
+        timings["store_meeting_ms"] = _elapsed_ms(stage_start)
+        return meeting
+
+    async def _extract() -> list[dict]:
+        stage_start = time.perf_counter()
+        tasks = await extract_tasks(chunk_text(transcript), label="Meeting transcript")
+        timings["extract_tasks_ms"] = _elapsed_ms(stage_start)
+        return tasks
+
+    # A failure in one stage cancels the other, so a failed request never
+    # leaves a meeting row committed behind it
+    try:
+        async with asyncio.TaskGroup() as group:
+            meeting_task = group.create_task(_summarize_and_store())
+            extract_task = group.create_task(_extract())
+    except BaseExceptionGroup as exc:
+        # Surface the stage's own error (e.g. LLM unavailable), not the group
+        raise exc.exceptions[0]
+    meeting, tasks_json = meeting_task.result(), extract_task.result()
+
+    stage_start = time.perf_counter()
+    created_tasks = bulk_insert_tasks(db, tasks_json)
+    timings["store_tasks_ms"] = _elapsed_ms(stage_start)
+    timings["total_ms"] = _elapsed_ms(started)
 
     return {
         "meeting_id": meeting.id,
-        "summary": summary,
+        "summary": meeting.summary,
         "detected_tasks": created_tasks,
+        "timings": timings,
     }
-
@@ -3,9 +3,13 @@ Research workspace endpoints.
 RAG-powered semantic search over local documents.
 """
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from typing import Any, Dict, Optional
+import json
 
-from app.ai.rag_engine import search_documents, answer_question
+from app.ai.rag_engine import search_documents, answer_question, stream_answer
+from app.storage.filters import normalize_filters
 
 router = APIRouter()
 
@@ -13,6 +17,8 @@ router = APIRouter()
 class ResearchQuery(BaseModel):
     query: str
     max_results: int = 5
+    # Metadata filter, e.g. {"source": "report.pdf", "chunk_index": {"$lt": 20}}
+    filters: Optional[Dict[str, Any]] = None
 
 
 @router.post("/query")
@@ -21,11 +27,18 @@ async def research_query(query: ResearchQuery):
     Perform semantic search over local documents using RAG.
 
     Returns only document chunks and metadata (no generated answer).
+    `filters` restricts results by `source`, `vault_path`, `chunk_index`,
+    `page`, `slide` or `sheet` (operators: $eq, $ne, $gt, $gte, $lt, $lte, $in, $nin).
     """
     if not query.query.strip():
         raise HTTPException(status_code=400, detail="Query cannot be empty")
 
-    results = await search_documents(query.query, limit=query.max_results)
+    try:
+        normalize_filters(query.filters)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    results = await search_documents(query.query, limit=query.max_results, where=query.filters)
     return {
         "query": query.query,
         "results": results,
@@ -45,6 +58,7 @@ async def research_question(body: QuestionRequest):
     Returns:
     - `answer`: model-generated answer
     - `citations`: list of document chunks used as context
+    - `usage`: prompt token counts (prompt, context, budget, chunks dropped)
     """
     if not body.query.strip():
         raise HTTPException(status_code=400, detail="Query cannot be empty")
@@ -52,3 +66,31 @@ async def research_question(body: QuestionRequest):
     result = await answer_question(body.query, context_limit=body.context_limit)
     return result
 
+
+
+@router.post("/question/stream")
+async def research_question_stream(body: QuestionRequest):
+    """
+    Answer a question using RAG, streamed as Server-Sent Events.
+
+    Events:
+    - `citations`: retrieved document chunks (sent right after retrieval)
+    - `token`: answer text fragments
+    - `done`: streaming metrics and prompt token `usage`
+    - `error`: generation failed (`detail` holds the message)
+    """
+    if not body.query.strip():
+        raise HTTPException(status_code=400, detail="Query cannot be empty")
+
+    async def _events():
+        try:
+            async for item in stream_answer(body.query, context_limit=body.context_limit):
+                yield f"event: {item['event']}\ndata: {json.dumps(item['data'])}\n\n"
+        except Exception as exc:
+            yield f"event: error\ndata: {json.dumps({'detail': str(exc)})}\n\n"
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
@@ -2,10 +2,14 @@
 Task management endpoints.
 Handles detected tasks, approvals, and task CRUD operations.
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Optional, List
 from pydantic import BaseModel
+from datetime import datetime
+import base64
+import json
 
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 
 from app.storage.db import get_db
@@ -13,6 +17,9 @@ from app.models import TaskModel
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
 class Task(BaseModel):
     id: Optional[int] = None
     title: str
@@ -25,16 +32,72 @@ class Task(BaseModel):
     class Config:
         from_attributes = True
 
+def _encode_cursor(created_at: datetime, task_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), task_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(task_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# Columns returned by the lightweight projection (same shape as `Task`)
+_TASK_COLUMNS = (
+    TaskModel.id,
+    TaskModel.title,
+    TaskModel.description,
+    TaskModel.status,
+    TaskModel.priority,
+    TaskModel.due_date,
+    TaskModel.scheduled_for,
+)
+
+
 @router.get("/")
-async def get_tasks(status: Optional[str] = None, db: Session = Depends(get_db)):
+async def get_tasks(
+    status: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    lite: bool = False,
+    db: Session = Depends(get_db),
+):
     """
-    Get all tasks, optionally filtered by status.
+    Get tasks newest first, optionally filtered by status.
+
+    Results are keyset-paginated: pass the returned `next_cursor` as `cursor`
+    to fetch the next page (`next_cursor` is null on the last page). With
+    `lite=true` rows are returned straight from the selected columns,
+    skipping ORM loading and Pydantic validation.
     """
-    q = db.query(TaskModel)
+    columns = _TASK_COLUMNS + (TaskModel.created_at,) if lite else (TaskModel,)
+    q = db.query(*columns)
     if status:
         q = q.filter(TaskModel.status == status)
-    tasks: List[TaskModel] = q.order_by(TaskModel.created_at.desc()).all()
-    return {"tasks": [Task.model_validate(t).model_dump() for t in tasks]}
+    if cursor:
+        created_at, task_id = _decode_cursor(cursor)
+        q = q.filter(tuple_(TaskModel.created_at, TaskModel.id) < (created_at, task_id))
+    # Fetch one extra row to know whether another page exists
+    rows = q.order_by(TaskModel.created_at.desc(), TaskModel.id.desc()).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if lite:
+        tasks = [dict(row._mapping) for row in rows]
+        for task in tasks:
+            task.pop("created_at")
+        last = rows[-1] if rows else None
+    else:
+        task_models: List[TaskModel] = rows
+        tasks = [Task.model_validate(t).model_dump() for t in task_models]
+        last = task_models[-1] if task_models else None
+
+    next_cursor = _encode_cursor(last.created_at, last.id) if has_more and last is not None else None
+    return {"tasks": tasks, "next_cursor": next_cursor}
 
 @router.post("/")
 async def create_task(task: Task, db: Session = Depends(get_db)):
@@ -1,13 +1,50 @@
 """
 File reader for various document formats.
 Supports PDF, DOCX, XLSX, PPTX, TXT.
+
+Besides the flat `read_*` functions, each format can be read as structured
+segments: `(text, provenance)` pairs such as `(page_text, {"page": 3})`,
+`{"slide": 2}` or `{"sheet": "Q1", "row_start": 2, "row_end": 51}`. The
+streaming chunker keeps that provenance on every chunk, so citations can
+point at exact pages and slides.
 """
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+# (text, provenance) – the same shape `app.preprocessing.chunking` consumes
+Segment = Tuple[str, Dict[str, Any]]
 
-def read_pdf(file_path: Path) -> str:
-    """Read PDF file and extract text."""
+# Spreadsheet rows per segment (each segment repeats the header row)
+XLSX_ROWS_PER_SEGMENT = 50
+# DOCX paragraphs per segment
+DOCX_PARAGRAPHS_PER_SEGMENT = 50
+# Characters read per block when streaming plain text
+TXT_BLOCK_CHARS = 1 << 18
+
+
+def count_pdf_pages(file_path: Path) -> int:
+    """Return the number of pages in a PDF file."""
+    try:
+        from PyPDF2 import PdfReader  # type: ignore
+    except Exception as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError(
+            "PyPDF2 is not installed. Install optional AI/doc dependencies with:\n"
+            "  pip install -r backend/requirements-ai.txt"
+        ) from exc
+
+    try:
+        return len(PdfReader(str(file_path)).pages)
+    except Exception as e:  # pragma: no cover - I/O heavy
+        raise Exception(f"Error reading PDF file {file_path}: {e}")
+
+
+def read_pdf_segments(file_path: Path, start: int = 0, end: Optional[int] = None) -> List[Segment]:
+    """
+    Extract one segment per page for pages `start` (inclusive) to `end` (exclusive).
+
+    Pages are numbered from 1 in the provenance. Used to split a large PDF
+    across several parser processes.
+    """
     try:
         from PyPDF2 import PdfReader  # type: ignore
     except Exception as exc:  # pragma: no cover - optional dependency
@@ -18,14 +55,28 @@ def read_pdf(file_path: Path) -> str:
 
     try:
         reader = PdfReader(str(file_path))
-        texts = []
-        for page in reader.pages:
-            texts.append(page.extract_text() or "")
-        return "\n".join(texts)
+        return [
+            (page.extract_text() or "", {"page": number})
+            for number, page in enumerate(reader.pages[start:end], start=start + 1)
+        ]
     except Exception as e:  # pragma: no cover - I/O heavy
         raise Exception(f"Error reading PDF file {file_path}: {e}")
 
 
+def read_pdf(file_path: Path) -> str:
+    """Read PDF file and extract text."""
+    return "\n".join(text for text, _ in read_pdf_segments(file_path))
+
+
+def read_docx_segments(file_path: Path) -> List[Segment]:
+    """Read a DOCX file as blocks of paragraphs (DOCX has no fixed pages)."""
+    paragraphs = read_docx(file_path).split("\n")
+    return [
+        ("\n\n".join(paragraphs[i : i + DOCX_PARAGRAPHS_PER_SEGMENT]), {})
+        for i in range(0, len(paragraphs), DOCX_PARAGRAPHS_PER_SEGMENT)
+    ]
+
+
 def read_docx(file_path: Path) -> str:
     """Read DOCX file and extract text."""
     try:
@@ -44,7 +95,20 @@ def read_docx(file_path: Path) -> str:
 
 
 def read_xlsx(file_path: Path) -> str:
-    """Read XLSX file and extract text."""
+    """Read XLSX file and extract text (one block per sheet)."""
+    return "\n\n".join(text for text, _ in read_xlsx_segments(file_path, rows_per_segment=None))
+
+
+def read_xlsx_segments(
+    file_path: Path, rows_per_segment: Optional[int] = XLSX_ROWS_PER_SEGMENT
+) -> List[Segment]:
+    """
+    Read an XLSX file as blocks of rows per sheet.
+
+    Each segment starts with the sheet name and the header row. Provenance
+    holds `sheet` and the spreadsheet row numbers `row_start`/`row_end`
+    (row 1 is the header).
+    """
     try:
         import pandas as pd  # type: ignore
     except Exception as exc:  # pragma: no cover - optional dependency
@@ -54,20 +118,40 @@ def read_xlsx(file_path: Path) -> str:
         ) from exc
 
     try:
-        # Read all sheets and concatenate as text
         xls = pd.ExcelFile(str(file_path))
-        parts = []
+        segments: List[Segment] = []
         for sheet_name in xls.sheet_names:
             df = xls.parse(sheet_name)
-            parts.append(f"=== Sheet: {sheet_name} ===")
-            parts.append(df.to_string(index=False))
-        return "\n\n".join(parts)
+            step = rows_per_segment or max(len(df), 1)
+            for start in range(0, max(len(df), 1), step):
+                block = df.iloc[start : start + step]
+                segments.append(
+                    (
+                        f"=== Sheet: {sheet_name} ===\n{block.to_string(index=False)}",
+                        {
+                            "sheet": str(sheet_name),
+                            "row_start": start + 2,
+                            "row_end": start + 1 + max(len(block), 1),
+                        },
+                    )
+                )
+        return segments
     except Exception as e:  # pragma: no cover - I/O heavy
         raise Exception(f"Error reading XLSX file {file_path}: {e}")
 
 
 def read_pptx(file_path: Path) -> str:
     """Read PPTX file and extract text."""
+    texts = []
+    for text, prov in read_pptx_segments(file_path):
+        texts.append(f"=== Slide {prov['slide']} ===")
+        if text:
+            texts.append(text)
+    return "\n\n".join(texts)
+
+
+def read_pptx_segments(file_path: Path) -> List[Segment]:
+    """Read a PPTX file as one segment per slide (`{"slide": n}`, from 1)."""
     try:
         from pptx import Presentation  # type: ignore
     except Exception as exc:  # pragma: no cover - optional dependency
@@ -78,13 +162,13 @@ def read_pptx(file_path: Path) -> str:
 
     try:
         prs = Presentation(str(file_path))
-        texts = []
+        segments: List[Segment] = []
         for slide_num, slide in enumerate(prs.slides, start=1):
-            texts.append(f"=== Slide {slide_num} ===")
-            for shape in slide.shapes:
-                if hasattr(shape, "text") and shape.text:
-                    texts.append(shape.text)
-        return "\n\n".join(texts)
+            texts = [
+                shape.text for shape in slide.shapes if hasattr(shape, "text") and shape.text
+            ]
+            segments.append(("\n\n".join(texts), {"slide": slide_num}))
+        return segments
     except Exception as e:  # pragma: no cover - I/O heavy
         raise Exception(f"Error reading PPTX file {file_path}: {e}")
 
@@ -98,6 +182,37 @@ def read_txt(file_path: Path) -> str:
         raise Exception(f"Error reading TXT file {file_path}: {e}")
 
 
+def iter_txt_segments(file_path: Path, block_chars: int = TXT_BLOCK_CHARS) -> Iterator[Segment]:
+    """Stream a TXT file in blocks of `block_chars` characters (constant memory)."""
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            while True:
+                block = f.read(block_chars)
+                if not block:
+                    return
+                yield block, {}
+    except Exception as e:  # pragma: no cover - I/O heavy
+        raise Exception(f"Error reading TXT file {file_path}: {e}")
+
+
+def read_file_segments(file_path: Path) -> List[Segment]:
+    """Read a file as structured segments based on extension."""
+    ext = file_path.suffix.lower()
+
+    if ext == ".pdf":
+        return read_pdf_segments(file_path)
+    if ext == ".docx":
+        return read_docx_segments(file_path)
+    if ext == ".xlsx":
+        return read_xlsx_segments(file_path)
+    if ext == ".pptx":
+        return read_pptx_segments(file_path)
+    if ext == ".txt":
+        return list(iter_txt_segments(file_path))
+
+    raise ValueError(f"Unsupported file type: {ext}")
+
+
 def read_file(file_path: Path) -> Optional[str]:
     """Read file based on extension."""
     ext = file_path.suffix.lower()
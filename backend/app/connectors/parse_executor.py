@@ -0,0 +1,205 @@
+"""
+Process-pool executor for document parsing.
+
+The readers in `file_reader` are CPU-bound pure Python, so running them in
+the threadpool serializes concurrent uploads on the GIL. Parsing is instead
+submitted to a process pool sized to the core count. Workers are started
+with the `spawn` method: forking the threaded server process could copy
+locks held by other threads into the child. A parse that times out may
+leave its worker stuck, so the pool is then replaced, and the old pool's
+workers are terminated after a grace period for the work still running
+on them.
+
+`parse_segments` streams structured segments (see `file_reader`): large
+PDFs are split into page ranges parsed in parallel, yielded in page order
+with only a few ranges in flight, and plain text is read in blocks.
+"""
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, List, Optional, Tuple
+import asyncio
+import multiprocessing
+import os
+import threading
+
+from app.core.config import settings
+from app.connectors.file_reader import (
+    Segment,
+    count_pdf_pages,
+    iter_txt_segments,
+    read_file_segments,
+    read_pdf_segments,
+)
+
+
+# Pages handed to a single worker when splitting a PDF
+PDF_PAGES_PER_TASK = 8
+# Page ranges parsed ahead of the consumer when streaming a PDF
+PDF_TASKS_IN_FLIGHT = 4
+# Seconds other work may keep running on a pool retired after a timeout
+RETIRED_POOL_GRACE_SECONDS = 30.0
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Get or lazily create the shared parser process pool."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            workers = settings.parse_workers or os.cpu_count() or 1
+            _executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def _discard_executor(broken: ProcessPoolExecutor) -> None:
+    """Drop a pool whose worker died so the next parse starts a fresh one."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _retire_executor(stuck: ProcessPoolExecutor) -> None:
+    """
+    Replace a pool after a parse timed out in it.
+
+    New parses go to a fresh pool right away. The old pool accepts no more
+    work; whatever it is still running after the grace period (at least
+    the timed-out parse) is terminated.
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is stuck:
+            _executor = None
+    # shutdown() drops the pool's process table, so take it first
+    processes = list((getattr(stuck, "_processes", None) or {}).values())
+    stuck.shutdown(wait=False)
+
+    def _terminate() -> None:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    timer = threading.Timer(RETIRED_POOL_GRACE_SECONDS, _terminate)
+    timer.daemon = True
+    timer.start()
+
+
+def shutdown_executor() -> None:
+    """Shut down the parser pool (called on FastAPI shutdown)."""
+    global _executor
+
+    with _executor_lock:
+        executor = _executor
+        _executor = None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def parse_segments(file_path: Path, timeout: Optional[float] = None) -> AsyncIterator[Segment]:
+    """
+    Parse a file into a stream of `(text, provenance)` segments.
+
+    Args:
+        file_path: File to read
+        timeout: Seconds the caller may spend waiting on the parser for the
+            whole file (defaults to settings); time spent consuming the
+            segments doesn't count
+
+    Yields:
+        Segments in document order (pages, slides, sheet row blocks, ...)
+
+    Raises:
+        RuntimeError: if the file times out or a parser worker crashes
+    """
+    if timeout is None:
+        timeout = settings.parse_timeout_seconds
+    loop = asyncio.get_running_loop()
+    waited = 0.0
+
+    def _timed_out() -> RuntimeError:
+        return RuntimeError(f"Timed out after {timeout:g}s while reading {file_path.name}")
+
+    async def _wait(awaitable: Awaitable[Any]) -> Any:
+        nonlocal waited
+        started = loop.time()
+        try:
+            return await asyncio.wait_for(awaitable, timeout=max(0.0, timeout - waited))
+        finally:
+            waited += loop.time() - started
+
+    async def _collect(executor: ProcessPoolExecutor, futures: List[Future]) -> List[Any]:
+        """Wait for pool futures and return their results in order."""
+        try:
+            return await _wait(asyncio.gather(*(asyncio.wrap_future(f) for f in futures)))
+        except asyncio.TimeoutError as exc:
+            if any(f.running() for f in futures):
+                # The worker may never come back; don't let it hold a slot
+                _retire_executor(executor)
+            raise _timed_out() from exc
+        except BrokenProcessPool as exc:
+            _discard_executor(executor)
+            raise RuntimeError(f"Parser worker crashed while reading {file_path.name}") from exc
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _submit(fn: Callable[..., Any], *args: Any) -> Tuple[ProcessPoolExecutor, Future]:
+        # Fetched per call: the pool may have been replaced meanwhile
+        executor = _get_executor()
+        try:
+            return executor, executor.submit(fn, *args)
+        except BrokenProcessPool as exc:
+            _discard_executor(executor)
+            raise RuntimeError(f"Parser worker crashed while reading {file_path.name}") from exc
+
+    async def _run(fn: Callable[..., Any], *args: Any) -> Any:
+        executor, future = _submit(fn, *args)
+        (result,) = await _collect(executor, [future])
+        return result
+
+    ext = file_path.suffix.lower()
+    if ext == ".txt":
+        # I/O bound; read block by block off the event loop
+        blocks = iter_txt_segments(file_path)
+        while True:
+            try:
+                segment = await _wait(loop.run_in_executor(None, next, blocks, None))
+            except asyncio.TimeoutError as exc:
+                raise _timed_out() from exc
+            if segment is None:
+                return
+            yield segment
+
+    if ext != ".pdf":
+        for segment in await _run(read_file_segments, file_path):
+            yield segment
+        return
+
+    page_count = await _run(count_pdf_pages, file_path)
+    ranges = deque(
+        (start, min(start + PDF_PAGES_PER_TASK, page_count))
+        for start in range(0, page_count, PDF_PAGES_PER_TASK)
+    )
+    in_flight: Deque[Tuple[ProcessPoolExecutor, Future]] = deque()
+    try:
+        while ranges or in_flight:
+            while ranges and len(in_flight) < PDF_TASKS_IN_FLIGHT:
+                in_flight.append(_submit(read_pdf_segments, file_path, *ranges.popleft()))
+            executor, future = in_flight.popleft()
+            for segment in (await _collect(executor, [future]))[0]:
+                yield segment
+    finally:
+        # On timeout/cancellation, don't leave queued page ranges behind
+        for _, future in in_flight:
+            future.cancel()
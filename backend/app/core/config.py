@@ -1,10 +1,14 @@
 """
 Application configuration management.
 Loads settings from config files and environment variables.
+
+YAML files are parsed once and cached; a file is re-parsed only when its
+mtime changes, and the new parsed config is swapped in atomically.
 """
 import os
+import threading
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 from pydantic_settings import BaseSettings
 from pydantic import Field
 import yaml
@@ -42,6 +46,20 @@ class Settings(BaseSettings):
         default="data/logs",
         description="Logs directory path"
     )
+
+    # SQLite performance profile (applied to every new connection)
+    sqlite_journal_mode: str = Field(default="wal", description="SQLite journal_mode pragma")
+    sqlite_synchronous: str = Field(default="normal", description="SQLite synchronous pragma")
+    sqlite_cache_size: int = Field(
+        default=-64000,
+        description="SQLite cache_size pragma (negative = KiB, positive = pages)"
+    )
+    sqlite_mmap_size: int = Field(default=268435456, description="SQLite mmap_size pragma in bytes")
+    sqlite_temp_store: str = Field(default="memory", description="SQLite temp_store pragma")
+    sqlite_busy_timeout_ms: int = Field(
+        default=5000,
+        description="How long a connection waits on a locked database before failing"
+    )
     
     # Security
     encryption_enabled: bool = Field(default=True, description="Enable encryption")
@@ -57,6 +75,24 @@ class Settings(BaseSettings):
     task_extraction: bool = Field(default=True, description="Enable task extraction")
     scheduler: bool = Field(default=True, description="Enable scheduler")
     knowledge_graph: bool = Field(default=True, description="Enable knowledge graph")
+
+    # Ingestion
+    ingest_workers: int = Field(
+        default=4,
+        description="Maximum files processed concurrently by background ingestion jobs"
+    )
+    ingest_jobs_retained: int = Field(
+        default=100,
+        description="Finished ingestion jobs kept in memory for progress lookups"
+    )
+    parse_workers: int = Field(
+        default=0,
+        description="Document parser processes (0 = one per CPU core)"
+    )
+    parse_timeout_seconds: float = Field(
+        default=300.0,
+        description="Maximum time to parse a single file"
+    )
     
     class Config:
         env_file = ".env"
@@ -64,18 +100,85 @@ class Settings(BaseSettings):
         case_sensitive = False
 
 
+class ConfigFile:
+    """A YAML config file that is parsed once and reloaded when its mtime changes."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        # (mtime_ns, parsed data) swapped as one object so readers never see
+        # a new mtime paired with old data
+        self._state: Tuple[Optional[int], Dict[str, Any]] = (None, {})
+        self._loaded = False
+
+    def _mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self) -> Dict[str, Any]:
+        """
+        Return the parsed config (an empty dict if the file is missing).
+
+        The returned dict is shared between callers and must not be mutated.
+        """
+        mtime = self._mtime()
+        cached_mtime, data = self._state
+        if self._loaded and mtime == cached_mtime:
+            return data
+
+        with self._lock:
+            cached_mtime, data = self._state
+            if self._loaded and mtime == cached_mtime:
+                return data
+            data = {}
+            if mtime is not None:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = yaml.safe_load(f) or {}
+            self._state = (mtime, data)
+            self._loaded = True
+            return data
+
+
+_config_files: Dict[Path, ConfigFile] = {}
+_config_files_lock = threading.Lock()
+
+
+def get_config_file(file_path: Path) -> ConfigFile:
+    """Get the shared cached handle for a YAML config file."""
+    config_file = _config_files.get(file_path)
+    if config_file is not None:
+        return config_file
+    with _config_files_lock:
+        config_file = _config_files.get(file_path)
+        if config_file is None:
+            config_file = ConfigFile(Path(file_path))
+            _config_files[file_path] = config_file
+        return config_file
+
+
 def load_yaml_config(file_path: Path) -> dict:
-    """Load YAML configuration file."""
-    if file_path.exists():
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f) or {}
-    return {}
+    """Load YAML configuration file (cached until the file changes)."""
+    return get_config_file(file_path).get()
+
+
+_settings_cache: Tuple[Optional[dict], Optional["Settings"]] = (None, None)
 
 
 def get_settings() -> Settings:
-    """Get application settings, loading from YAML config if available."""
+    """
+    Get application settings, loading from YAML config if available.
+
+    The Settings object is rebuilt only when app.yaml changes.
+    """
+    global _settings_cache
+
     # Load app.yaml
     app_config = load_yaml_config(CONFIG_DIR / "app.yaml")
+    cached_config, cached_settings = _settings_cache
+    if cached_settings is not None and cached_config is app_config:
+        return cached_settings
     
     # Override defaults with YAML values
     settings_dict = {}
@@ -92,6 +195,14 @@ def get_settings() -> Settings:
         settings_dict["vector_db_path"] = storage_config.get("vector_db_path", "data/embeddings")
         settings_dict["vault_path"] = storage_config.get("vault_path", "data/vault")
         settings_dict["logs_path"] = storage_config.get("logs_path", "data/logs")
+
+        sqlite_config = storage_config.get("sqlite") or {}
+        settings_dict["sqlite_journal_mode"] = sqlite_config.get("journal_mode", "wal")
+        settings_dict["sqlite_synchronous"] = sqlite_config.get("synchronous", "normal")
+        settings_dict["sqlite_cache_size"] = sqlite_config.get("cache_size", -64000)
+        settings_dict["sqlite_mmap_size"] = sqlite_config.get("mmap_size", 268435456)
+        settings_dict["sqlite_temp_store"] = sqlite_config.get("temp_store", "memory")
+        settings_dict["sqlite_busy_timeout_ms"] = sqlite_config.get("busy_timeout_ms", 5000)
     
     if "security" in app_config:
         security_config = app_config["security"]
@@ -107,8 +218,17 @@ def get_settings() -> Settings:
         settings_dict["scheduler"] = features_config.get("scheduler", True)
         settings_dict["knowledge_graph"] = features_config.get("knowledge_graph", True)
     
+    if "ingestion" in app_config:
+        ingestion_config = app_config["ingestion"]
+        settings_dict["ingest_workers"] = ingestion_config.get("workers", 4)
+        settings_dict["ingest_jobs_retained"] = ingestion_config.get("jobs_retained", 100)
+        settings_dict["parse_workers"] = ingestion_config.get("parse_workers", 0)
+        settings_dict["parse_timeout_seconds"] = ingestion_config.get("parse_timeout_seconds", 300)
+    
     # Create Settings instance, allowing environment variables to override
-    return Settings(**settings_dict)
+    new_settings = Settings(**settings_dict)
+    _settings_cache = (app_config, new_settings)
+    return new_settings
 
 
 # Global settings instance
@@ -0,0 +1,2 @@
+"""Ingestion job modules."""
+
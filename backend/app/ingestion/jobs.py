@@ -0,0 +1,259 @@
+"""
+Background ingestion jobs.
+
+Uploaded files are stored first and handed to a job; a bounded pool of
+workers (shared across all jobs) then reads, chunks, embeds and extracts
+tasks from each file. Progress is tracked per file so clients can poll or
+subscribe to Server-Sent Events instead of holding the upload request open.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import json
+import uuid
+
+from app.core.config import settings
+
+
+# Terminal states for files and jobs
+FINISHED_STATES = {"ingested", "error", "cancelled"}
+
+
+@dataclass
+class FileProgress:
+    """Progress of a single file inside an ingestion job."""
+
+    filename: str
+    vault_path: Optional[str] = None
+    status: str = "queued"  # queued | parsing | embedding | extracting | ingested | error | cancelled
+    bytes_total: int = 0
+    bytes_parsed: int = 0
+    chunks_total: int = 0
+    chunks_embedded: int = 0  # newly embedded; re-ingested files skip unchanged chunks
+    chunks_unchanged: int = 0
+    chunks_deleted: int = 0
+    tasks_extracted: int = 0
+    error: Optional[str] = None
+    _job: Optional["IngestJob"] = field(default=None, repr=False)
+
+    def update(self, **changes: Any) -> None:
+        """Apply progress changes and wake up any listeners on the job."""
+        for key, value in changes.items():
+            setattr(self, key, value)
+        if self._job is not None:
+            self._job.touch()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "filename": self.filename,
+            "status": self.status,
+            "bytes_total": self.bytes_total,
+            "bytes_parsed": self.bytes_parsed,
+            "chunks_total": self.chunks_total,
+            "chunks_embedded": self.chunks_embedded,
+            "chunks_unchanged": self.chunks_unchanged,
+            "chunks_deleted": self.chunks_deleted,
+            "tasks_extracted": self.tasks_extracted,
+            "error": self.error,
+        }
+
+
+@dataclass
+class IngestJob:
+    """A batch of uploaded files processed in the background."""
+
+    id: str
+    files: List[FileProgress]
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    cancelled: bool = False
+    detected_tasks: List[Dict[str, Any]] = field(default_factory=list)
+    version: int = 0
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    _workers: List["asyncio.Task[None]"] = field(default_factory=list, repr=False)
+
+    @property
+    def status(self) -> str:
+        if self.cancelled:
+            return "cancelled"
+        if all(f.status in FINISHED_STATES for f in self.files):
+            return "completed"
+        if any(f.status != "queued" for f in self.files):
+            return "running"
+        return "queued"
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "cancelled")
+
+    def touch(self) -> None:
+        """Bump the version and release everyone waiting on the current one."""
+        self.version += 1
+        if self.finished_at is None and self.done:
+            self.finished_at = datetime.utcnow()
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_for_change(self, seen_version: int, timeout: float) -> bool:
+        """Wait until `version` moves past `seen_version`. Returns False on timeout."""
+        if self.version != seen_version:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "files": [f.to_dict() for f in self.files],
+            "detected_tasks": self.detected_tasks,
+        }
+
+
+# Signature of the per-file processor: (vault path, original name, progress)
+# -> (chunk count, extracted tasks)
+FileProcessor = Callable[[Path, str, FileProgress], Awaitable[Tuple[int, List[Dict[str, Any]]]]]
+
+
+class IngestJobManager:
+    """Owns ingestion jobs and the bounded worker pool that runs them."""
+
+    def __init__(self, max_workers: int, jobs_retained: int):
+        self.max_workers = max(1, int(max_workers))
+        self.jobs_retained = max(1, int(jobs_retained))
+        self._jobs: Dict[str, IngestJob] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the server's event loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        return self._slots
+
+    def submit(self, files: List[FileProgress], processor: FileProcessor) -> IngestJob:
+        """
+        Create a job for already-stored files and start processing them.
+
+        Files that are already in a finished state (e.g. failed to save)
+        are reported as-is and not processed.
+        """
+        job = IngestJob(id=uuid.uuid4().hex, files=files)
+        for progress in files:
+            progress._job = job
+        self._jobs[job.id] = job
+        self._evict_finished()
+
+        for progress in files:
+            if progress.status in FINISHED_STATES:
+                continue
+            worker = asyncio.create_task(self._run_file(job, progress, processor))
+            job._workers.append(worker)
+
+        job.touch()
+        return job
+
+    async def _run_file(self, job: IngestJob, progress: FileProgress, processor: FileProcessor) -> None:
+        try:
+            async with self._get_slots():
+                if job.cancelled:
+                    progress.update(status="cancelled")
+                    return
+                progress.update(status="parsing")
+                chunk_count, tasks = await processor(
+                    Path(progress.vault_path or ""), progress.filename, progress
+                )
+                job.detected_tasks.extend(tasks)
+                progress.update(
+                    status="ingested",
+                    chunks_total=chunk_count,
+                    tasks_extracted=len(tasks),
+                )
+        except asyncio.CancelledError:
+            # Record the state, but let the cancellation reach the task
+            progress.update(status="cancelled")
+            raise
+        except Exception as exc:
+            progress.update(status="error", error=_friendly_error(exc))
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[IngestJob]:
+        """
+        Cancel a job. Files not yet finished are marked cancelled; work already
+        running in a threadpool finishes but its results are discarded.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return job
+        job.cancelled = True
+        for worker in job._workers:
+            worker.cancel()
+        for progress in job.files:
+            if progress.status not in FINISHED_STATES:
+                progress.status = "cancelled"
+        job.touch()
+        return job
+
+    async def events(
+        self, job: IngestJob, is_disconnected: Callable[[], Awaitable[bool]], heartbeat: float = 15.0
+    ) -> AsyncGenerator[str, None]:
+        """
+        Yield Server-Sent Events with the job snapshot each time it changes.
+
+        The stream ends when the job finishes or the client goes away.
+        """
+        seen = -1
+        while True:
+            if await is_disconnected():
+                return
+            if job.version != seen:
+                seen = job.version
+                yield f"event: progress\ndata: {json.dumps(job.to_dict())}\n\n"
+                if job.done:
+                    yield "event: done\ndata: {}\n\n"
+                    return
+            elif not await job.wait_for_change(seen, timeout=heartbeat):
+                # SSE comment line keeps proxies and clients from timing out
+                yield ": keep-alive\n\n"
+
+    def _evict_finished(self) -> None:
+        finished = [j for j in self._jobs.values() if j.done]
+        excess = len(finished) - self.jobs_retained
+        if excess <= 0:
+            return
+        finished.sort(key=lambda j: j.finished_at or j.created_at)
+        for job in finished[:excess]:
+            self._jobs.pop(job.id, None)
+
+    async def shutdown(self) -> None:
+        """Cancel every running job (called on FastAPI shutdown)."""
+        workers = []
+        for job in list(self._jobs.values()):
+            workers.extend(job._workers)
+            self.cancel(job.id)
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+
+
+def _friendly_error(exc: Exception) -> str:
+    """Map processing errors to the user-facing messages used by the upload API."""
+    error_msg = str(exc)
+    if "not installed" in error_msg.lower():
+        return "Required library not installed. Please install backend dependencies."
+    if "not found" in error_msg.lower():
+        return "File processing library not found. Please check backend setup."
+    return error_msg
+
+
+job_manager = IngestJobManager(
+    max_workers=settings.ingest_workers,
+    jobs_retained=settings.ingest_jobs_retained,
+)
@@ -6,6 +6,18 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import get_settings
 from app.storage.db import init_db
+from app.storage.vector_store import close_pool, get_pool_stats
+from app.storage.lexical_index import close_lexical_index
+from app.ai.embedding_cache import close_embedding_cache, get_cache_stats
+from app.ai.embeddings import get_embedding_engine_stats, preload_embedding_model
+from app.ai.summarizer import get_summary_cache_stats
+from app.ai.ollama_transport import close_transport
+from app.ai.llm_client import get_streaming_stats
+from app.ai.answer_cache import answer_cache
+from app.ai.query_executor import get_query_stats, shutdown_query_executor
+from app.ai.reranker import get_rerank_stats
+from app.ingestion.jobs import job_manager
+from app.connectors.parse_executor import shutdown_executor
 
 settings = get_settings()
 
@@ -19,6 +31,19 @@ app = FastAPI(
 @app.on_event("startup")
 async def _startup():
     init_db()
+    # Warm the embedding model without delaying startup
+    preload_embedding_model()
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    await job_manager.shutdown()
+    shutdown_executor()
+    shutdown_query_executor()
+    await close_transport()
+    close_pool()
+    close_lexical_index()
+    close_embedding_cache()
 
 # CORS middleware (only allow localhost)
 app.add_middleware(
@@ -48,6 +73,20 @@ async def api_health():
     """Health check endpoint accessible from frontend."""
     return {"status": "healthy", "version": "1.0.0"}
 
+@app.get("/api/health/stats")
+async def api_health_stats():
+    """Runtime counters for pooled resources (warm-path checks under load)."""
+    return {
+        "vector_store": get_pool_stats(),
+        "embedding_cache": get_cache_stats(),
+        "embedding_engine": get_embedding_engine_stats(),
+        "query_batching": get_query_stats(),
+        "summary_cache": get_summary_cache_stats(),
+        "llm_streaming": get_streaming_stats(),
+        "answer_cache": answer_cache.stats(),
+        "reranker": get_rerank_stats(),
+    }
+
 # Import and register routers
 from app.api import ingest, meetings, research, tasks, scheduler, analytics
 
@@ -8,7 +8,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import Integer, String, Text, DateTime
+from sqlalchemy import Integer, String, Text, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.storage.db import Base
@@ -34,6 +34,12 @@ class TaskModel(Base):
         DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
     )
 
+    # Cover the task list's keyset pagination, with and without a status filter
+    __table_args__ = (
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index("ix_tasks_status_created_at_id", "status", "created_at", "id"),
+    )
+
 
 class MeetingModel(Base):
     __tablename__ = "meetings"
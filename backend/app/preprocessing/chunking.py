@@ -1,33 +1,244 @@
 """
 Text chunking for RAG.
 Splits documents into manageable chunks for embedding.
+
+`StreamingChunker` (and its generator wrapper `iter_chunks`) consumes text
+segments (whole documents, file blocks, or reader segments tagged with
+page/slide/sheet provenance) and yields chunks as soon as they are
+complete, so memory use does not grow with document size. Chunks end on sentence or paragraph
+boundaries where possible and are sized in (estimated) model tokens.
 """
-from typing import List
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+import hashlib
+import re
+
+from app.preprocessing.tokens import CHARS_PER_SUBWORD, estimate_tokens
+
+
+DEFAULT_CHUNK_TOKENS = 128
+DEFAULT_OVERLAP_TOKENS = 16
+# A paragraph break ends the current chunk once it is at least this full
+PARAGRAPH_FLUSH_RATIO = 0.75
+# Text without any sentence boundary is cut at whitespace beyond this size
+MAX_PENDING_CHARS = 65536
+
+# Sentence end followed by whitespace, or a blank line (paragraph break)
+_BOUNDARY_RE = re.compile(r"(?<=[.!?])\s+|\n[ \t]*\n\s*")
+_PARAGRAPH_RE = re.compile(r"\n[ \t]*\n")
+_WORD_RE = re.compile(r"\S+\s*")
+
+# A segment is plain text, or (text, provenance) such as ("...", {"page": 3})
+Segment = Union[str, Tuple[str, Dict[str, Any]]]
+
+
+@dataclass
+class Chunk:
+    """A chunk of text and where it came from (`page`, `slide`, `sheet`, ...)."""
+
+    text: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def _split_oversized(unit: str, max_tokens: int) -> Iterator[Tuple[str, int]]:
+    """
+    Split a unit longer than `max_tokens` on word boundaries (hard cut for huge words).
+
+    Yields (piece, estimated tokens).
+    """
+    unit_tokens = estimate_tokens(unit)
+    if unit_tokens <= max_tokens:
+        yield unit, unit_tokens
+        return
+    piece = ""
+    piece_tokens = 0
+    for match in _WORD_RE.finditer(unit):
+        word = match.group()
+        tokens = estimate_tokens(word)
+        if tokens > max_tokens:
+            if piece:
+                yield piece, piece_tokens
+                piece, piece_tokens = "", 0
+            step = max_tokens * CHARS_PER_SUBWORD
+            for offset in range(0, len(word), step):
+                part = word[offset : offset + step]
+                yield part, estimate_tokens(part)
+            continue
+        if piece and piece_tokens + tokens > max_tokens:
+            yield piece, piece_tokens
+            piece, piece_tokens = "", 0
+        piece += word
+        piece_tokens += tokens
+    if piece:
+        yield piece, piece_tokens
+
+
+class StreamingChunker:
+    """
+    Incremental chunker: feed segments as they are read, collect finished chunks.
+
+    Chunks are built from whole sentences; a sentence is only split (on
+    word boundaries) when it is longer than a chunk. Consecutive chunks
+    share up to `overlap_tokens` tokens of whole trailing sentences. Text
+    after the last sentence boundary of a segment is held back until the
+    next segment, since the sentence may continue there. A change of
+    provenance (new page, slide, ...) always ends the current chunk.
+
+    Raises:
+        ValueError: If `chunk_tokens` is not positive or `overlap_tokens`
+            is not smaller than `chunk_tokens`
+    """
+
+    def __init__(self, chunk_tokens: int = DEFAULT_CHUNK_TOKENS, overlap_tokens: int = DEFAULT_OVERLAP_TOKENS):
+        if chunk_tokens <= 0:
+            raise ValueError("chunk_tokens must be positive")
+        if not 0 <= overlap_tokens < chunk_tokens:
+            raise ValueError("overlap_tokens must be >= 0 and smaller than chunk_tokens")
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self._pending = ""
+        self._pending_prov: Dict[str, Any] = {}
+        self._units: List[Tuple[str, int]] = []  # (text, tokens)
+        self._size = 0
+        self._first_new = 0  # units before this index are overlap from the previous chunk
+
+    def feed(self, segment: Segment) -> List[Chunk]:
+        """Add a segment; returns the chunks it completed."""
+        text, prov = (segment, {}) if isinstance(segment, str) else segment
+        prov = prov or {}
+        out: List[Chunk] = []
+        if prov != self._pending_prov and (self._pending or self._units):
+            # New page/slide/sheet block: chunks never span it, so edits to
+            # one page don't shift the chunks of the pages after it
+            if self._pending:
+                self._add_unit(self._pending, True, out)
+                self._pending = ""
+            self._emit(out, carry_overlap=False)
+        pending = self._pending + text
+        # Also the provenance of the chunk being built (chunks never span two)
+        self._pending_prov = prov
 
+        start = 0
+        for match in _BOUNDARY_RE.finditer(pending):
+            if match.end() == len(pending):
+                # The separator may continue in the next segment
+                break
+            ends_paragraph = bool(_PARAGRAPH_RE.search(match.group()))
+            self._add_unit(pending[start : match.end()], ends_paragraph, out)
+            start = match.end()
+        pending = pending[start:]
 
-def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
+        while len(pending) > MAX_PENDING_CHARS:
+            cut = pending.rfind(" ", 0, MAX_PENDING_CHARS) + 1 or MAX_PENDING_CHARS
+            self._add_unit(pending[:cut], False, out)
+            pending = pending[cut:]
+        self._pending = pending
+        return out
+
+    def finish(self) -> List[Chunk]:
+        """Flush held-back text; returns the final chunks."""
+        out: List[Chunk] = []
+        if self._pending:
+            self._add_unit(self._pending, True, out)
+            self._pending = ""
+        self._emit(out)
+        return out
+
+    def _add_unit(self, unit: str, ends_paragraph: bool, out: List[Chunk]) -> None:
+        for piece, tokens in _split_oversized(unit, self.chunk_tokens):
+            if self._size + tokens > self.chunk_tokens:
+                self._emit(out)
+                # Drop overlap that would leave no room for new text
+                while self._units and self._size + tokens > self.chunk_tokens:
+                    self._size -= self._units.pop(0)[1]
+                    self._first_new -= 1
+            self._units.append((piece, tokens))
+            self._size += tokens
+        if ends_paragraph and self._size >= self.chunk_tokens * PARAGRAPH_FLUSH_RATIO:
+            self._emit(out)
+
+    def _emit(self, out: List[Chunk], carry_overlap: bool = True) -> None:
+        units = self._units
+        if self._first_new < len(units):
+            text = "".join(u[0] for u in units).strip()
+            if text:
+                out.append(Chunk(text=text, metadata=dict(self._pending_prov)))
+        elif carry_overlap:
+            return
+        if not carry_overlap:
+            self._units, self._size, self._first_new = [], 0, 0
+            return
+        # Carry whole trailing sentences into the next chunk as overlap
+        tail: List[Tuple[str, int]] = []
+        tail_size = 0
+        for unit in reversed(units):
+            if tail_size + unit[1] > self.overlap_tokens:
+                break
+            tail.insert(0, unit)
+            tail_size += unit[1]
+        self._units, self._size, self._first_new = tail, tail_size, len(tail)
+
+
+def iter_chunks(
+    segments: Iterable[Segment],
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+) -> Iterator[Chunk]:
+    """
+    Stream chunks of at most `chunk_tokens` tokens from text segments.
+
+    Args:
+        segments: Text, or (text, provenance) pairs, in document order
+        chunk_tokens: Maximum estimated tokens per chunk
+        overlap_tokens: Maximum tokens repeated from the previous chunk
+
+    Yields:
+        `Chunk`s with provenance metadata from the segments they came from
+
+    Raises:
+        ValueError: If `overlap_tokens` is not smaller than `chunk_tokens`
+    """
+    chunker = StreamingChunker(chunk_tokens, overlap_tokens)
+    for segment in segments:
+        yield from chunker.feed(segment)
+    yield from chunker.finish()
+
+
+def chunk_text(
+    text: str, chunk_size: int = DEFAULT_CHUNK_TOKENS, overlap: int = DEFAULT_OVERLAP_TOKENS
+) -> List[str]:
     """
     Split text into chunks with overlap.
-    
+
+    List wrapper around `iter_chunks` for callers that hold the whole text.
+
     Args:
         text: Input text
-        chunk_size: Maximum characters per chunk
-        overlap: Number of characters to overlap between chunks
-    
+        chunk_size: Maximum tokens per chunk
+        overlap: Maximum tokens shared between consecutive chunks
+
     Returns:
         List of text chunks
     """
-    if len(text) <= chunk_size:
-        return [text]
-    
-    chunks = []
-    start = 0
-    
-    while start < len(text):
-        end = start + chunk_size
-        chunk = text[start:end]
-        chunks.append(chunk)
-        start = end - overlap
-    
-    return chunks
+    return [chunk.text for chunk in iter_chunks([text], chunk_size, overlap)]
+
+
+def chunk_id_factory(source: str) -> Callable[[str], str]:
+    """
+    Return a function deriving chunk ids from a document's chunks, in order.
+
+    The id depends on the source name and the chunk's content, so the same
+    chunk text in the same document always gets the same id and a
+    re-ingested revision only introduces ids for chunks that changed.
+    Repeated identical chunks within a document are numbered by occurrence.
+    """
+    doc_id = hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+    seen: Dict[str, int] = {}
+
+    def _next_id(chunk: str) -> str:
+        digest = hashlib.sha256(chunk.encode("utf-8")).hexdigest()[:32]
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        return f"{doc_id}-{digest}" + (f"-{occurrence}" if occurrence else "")
 
+    return _next_id
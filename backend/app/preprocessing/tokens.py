@@ -0,0 +1,21 @@
+"""
+Local token count approximation.
+
+No tokenizer model is loaded; counts approximate subword tokenizers
+(Llama / BERT style) closely enough for budgeting prompts and sizing chunks.
+"""
+import re
+
+# Words, numbers and individual punctuation marks
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+# Subword tokenizers split long words into pieces of roughly this many chars
+CHARS_PER_SUBWORD = 4
+# Each match is one extra subword of a long word: a word of n chars has
+# (n - 1) // 4 of them, so it counts as ceil(n / 4) tokens in total
+_EXTRA_SUBWORD_RE = re.compile(r"\B\w{%d}" % CHARS_PER_SUBWORD)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate how many model tokens `text` uses."""
+    return len(_PIECE_RE.findall(text)) + len(_EXTRA_SUBWORD_RE.findall(text))
@@ -1,8 +1,11 @@
 """
 Database configuration and session management.
 Uses SQLite locally. (SQLCipher integration is planned; kept offline-only.)
+
+Every new connection gets the performance profile from `storage.sqlite` in
+`config/app.yaml` (WAL, synchronous, cache/mmap sizes, busy timeout).
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings, PROJECT_ROOT
@@ -15,13 +18,60 @@ db_path.parent.mkdir(parents=True, exist_ok=True)
 # Database URL (plain SQLite for now)
 DATABASE_URL = f"sqlite:///{db_path.as_posix()}"
 
+_ALLOWED_PRAGMA_VALUES = {
+    "journal_mode": {"delete", "truncate", "persist", "memory", "wal", "off"},
+    "synchronous": {"off", "normal", "full", "extra"},
+    "temp_store": {"default", "file", "memory"},
+}
+
+
+def _pragma_choice(name: str, value: str) -> str:
+    """Validate a keyword pragma value (pragmas can't use bound parameters)."""
+    value = str(value).strip().lower()
+    if value not in _ALLOWED_PRAGMA_VALUES[name]:
+        raise ValueError(
+            f"Invalid SQLite {name} '{value}'. "
+            f"Allowed: {', '.join(sorted(_ALLOWED_PRAGMA_VALUES[name]))}"
+        )
+    return value
+
+
+SQLITE_PRAGMAS = {
+    "journal_mode": _pragma_choice("journal_mode", settings.sqlite_journal_mode),
+    "synchronous": _pragma_choice("synchronous", settings.sqlite_synchronous),
+    "cache_size": int(settings.sqlite_cache_size),
+    "mmap_size": int(settings.sqlite_mmap_size),
+    "temp_store": _pragma_choice("temp_store", settings.sqlite_temp_store),
+    "busy_timeout": int(settings.sqlite_busy_timeout_ms),
+}
+
 # Create engine
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False},
+    connect_args={
+        "check_same_thread": False,
+        # pysqlite's own lock wait, kept in line with busy_timeout
+        "timeout": SQLITE_PRAGMAS["busy_timeout"] / 1000,
+    },
     echo=False,  # Set to True for SQL debugging
 )
 
+
+@event.listens_for(engine, "connect")
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the configured performance profile to each new connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        # busy_timeout first so switching journal mode can wait on other writers
+        cursor.execute(f"PRAGMA busy_timeout = {SQLITE_PRAGMAS['busy_timeout']}")
+        cursor.execute(f"PRAGMA journal_mode = {SQLITE_PRAGMAS['journal_mode']}")
+        cursor.execute(f"PRAGMA synchronous = {SQLITE_PRAGMAS['synchronous']}")
+        cursor.execute(f"PRAGMA cache_size = {SQLITE_PRAGMAS['cache_size']}")
+        cursor.execute(f"PRAGMA mmap_size = {SQLITE_PRAGMAS['mmap_size']}")
+        cursor.execute(f"PRAGMA temp_store = {SQLITE_PRAGMAS['temp_store']}")
+    finally:
+        cursor.close()
+
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -41,4 +91,9 @@ def get_db():
 def init_db():
     """Initialize database tables."""
     Base.metadata.create_all(bind=engine)
+    # create_all only adds indexes alongside new tables; add any that
+    # existing databases are missing (no migrations in this app)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
@@ -0,0 +1,96 @@
+"""
+Metadata filters for chunk search.
+
+Filters are plain dicts over chunk metadata, e.g.
+`{"source": "report.pdf", "chunk_index": {"$gte": 10}}` or
+`{"source": {"$in": ["a.pdf", "b.docx"]}}`. A bare value means `$eq`, and
+several fields are ANDed. The same filter is pushed down to Chroma's
+`where` clause and applied to lexical (BM25) results.
+"""
+from typing import Any, Dict, List, Optional
+
+
+FILTER_FIELDS = ("source", "vault_path", "chunk_index", "page", "slide", "sheet")
+FILTER_OPERATORS = ("$eq", "$ne", "$gt", "$gte", "$lt", "$lte", "$in", "$nin")
+
+Filters = Dict[str, Dict[str, Any]]
+
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> Filters:
+    """
+    Validate a filter dict and expand bare values to `{"$eq": value}`.
+
+    Raises:
+        ValueError: On unknown fields/operators or malformed values
+    """
+    normalized: Filters = {}
+    for field, condition in (filters or {}).items():
+        if field not in FILTER_FIELDS:
+            raise ValueError(f"Cannot filter on '{field}' (allowed: {', '.join(FILTER_FIELDS)})")
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        if not condition:
+            raise ValueError(f"Empty condition for '{field}'")
+        for op, value in condition.items():
+            if op not in FILTER_OPERATORS:
+                raise ValueError(f"Unknown operator '{op}' (allowed: {', '.join(FILTER_OPERATORS)})")
+            if op in ("$in", "$nin"):
+                if not isinstance(value, list) or not value:
+                    raise ValueError(f"'{op}' on '{field}' needs a non-empty list")
+            elif isinstance(value, (dict, list)) or value is None:
+                raise ValueError(f"'{op}' on '{field}' needs a string or number")
+        normalized[field] = dict(condition)
+    return normalized
+
+
+def to_chroma_where(filters: Filters) -> Optional[Dict[str, Any]]:
+    """Translate normalized filters into a Chroma `where` clause."""
+    clauses = [{field: {op: value}} for field, cond in filters.items() for op, value in cond.items()]
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
+
+
+def _match(value: Any, op: str, expected: Any) -> bool:
+    if op == "$eq":
+        return value == expected
+    if op == "$ne":
+        return value != expected
+    if op == "$in":
+        return value in expected
+    if op == "$nin":
+        return value not in expected
+    if value is None:
+        return False
+    try:
+        if op == "$gt":
+            return value > expected
+        if op == "$gte":
+            return value >= expected
+        if op == "$lt":
+            return value < expected
+        return value <= expected
+    except TypeError:
+        return False
+
+
+def matches(metadata: Optional[Dict[str, Any]], filters: Filters) -> bool:
+    """Whether a chunk's metadata satisfies every condition."""
+    metadata = metadata or {}
+    return all(
+        _match(metadata.get(field), op, expected)
+        for field, cond in filters.items()
+        for op, expected in cond.items()
+    )
+
+
+def scoped_sources(filters: Filters) -> Optional[List[str]]:
+    """The sources a filter restricts search to, or None if it isn't source-scoped."""
+    cond = filters.get("source") or {}
+    if "$eq" in cond:
+        return [str(cond["$eq"])]
+    if "$in" in cond:
+        return [str(s) for s in cond["$in"]]
+    return None
@@ -0,0 +1,277 @@
+"""
+Persistent lexical (BM25) index over document chunks.
+
+Dense retrieval tends to miss exact identifiers such as ticket numbers,
+invoice IDs and names. This index keeps every chunk in a SQLite FTS5
+inverted index (BM25-ranked) next to the Chroma data under
+`settings.vector_db_path`, and is updated incrementally whenever
+`VectorStore` adds or deletes chunks.
+
+Natural-language questions are reduced to their informative terms before
+matching: stopwords and terms present in a large share of chunks are
+dropped, and chunks containing all remaining terms are matched before the
+rarest terms alone, so a query scores a bounded number of postings
+instead of most of the corpus.
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import re
+import sqlite3
+import threading
+
+from app.core.config import settings
+
+
+INDEX_FILENAME = "lexical_index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    rowid INTEGER PRIMARY KEY,
+    chunk_id TEXT NOT NULL UNIQUE,
+    source TEXT,
+    metadata TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_chunks_source ON chunks (source);
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+    text,
+    content='chunks',
+    content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
+    INSERT INTO chunks_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN
+    INSERT INTO chunks_fts (chunks_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+END;
+"""
+
+# Cap on query terms so pathological queries stay fast
+MAX_QUERY_TERMS = 32
+# Terms found in more than this share of chunks are dropped from queries:
+# scoring their posting lists costs far more than they add to the ranking
+MAX_TERM_DOC_RATIO = 0.02
+# ...but terms in at most this many chunks are always kept (small corpora)
+MIN_PRUNE_DOCS = 1000
+# After chunks containing every kept term, the rarest kept terms are ORed
+# in, as many as fit in this many postings (bm25 costs ~µs per posting)
+MATCH_DOC_BUDGET = 2000
+# Dropped from queries before anything else (they match nearly every chunk)
+STOPWORDS = frozenset(
+    """
+    a about above after again against all am an and any are as at be because been before being
+    below between both but by can could did do does doing down during each few for from further
+    had has have having he her here hers him his how i if in into is it its itself just me more
+    most my no nor not now of off on once only or other our ours out over own same she should so
+    some such than that the their theirs them then there these they this those through to too
+    under until up very was we were what when where which while who whom why will with would you
+    your yours
+    """.split()
+)
+
+
+def _query_terms(query: str) -> List[str]:
+    """Distinct lowercase terms of `query`, without stopwords unless that leaves none."""
+    terms = list(dict.fromkeys(re.findall(r"\w+", query.lower())))
+    return ([t for t in terms if t not in STOPWORDS] or terms)[:MAX_QUERY_TERMS]
+
+
+def _fts_query(terms: List[str], operator: str = "OR") -> str:
+    """Join terms into an FTS5 query of quoted terms (no FTS syntax leaks through)."""
+    return f" {operator} ".join(f'"{term}"' for term in terms)
+
+
+class LexicalIndex:
+    """Thread-safe BM25 index backed by SQLite FTS5."""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        if db_path is None:
+            base_path = Path(settings.vector_db_path)
+            base_path.mkdir(parents=True, exist_ok=True)
+            db_path = base_path / INDEX_FILENAME
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = wal")
+        self._conn.execute("PRAGMA synchronous = normal")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        # Running chunk count for document-frequency pruning (COUNT(*) is a scan)
+        self._rows = self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def add(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """Index chunks, replacing any existing chunks with the same ids."""
+        if not ids:
+            return
+        rows = [
+            (chunk_id, (meta or {}).get("source"), json.dumps(meta or {}), text)
+            for chunk_id, text, meta in zip(ids, texts, metadatas)
+        ]
+        with self._lock, self._conn:
+            deleted = self._conn.executemany(
+                "DELETE FROM chunks WHERE chunk_id = ?", [(r[0],) for r in rows]
+            ).rowcount
+            self._conn.executemany(
+                "INSERT INTO chunks (chunk_id, source, metadata, text) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._rows += len(rows) - deleted
+
+    def update_metadata(self, ids: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """Replace the stored metadata of indexed chunks (the text is unchanged)."""
+        if not ids:
+            return
+        rows = [((meta or {}).get("source"), json.dumps(meta or {}), chunk_id) for chunk_id, meta in zip(ids, metadatas)]
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE chunks SET source = ?, metadata = ? WHERE chunk_id = ?", rows)
+
+    def delete(self, ids: List[str]) -> None:
+        """Remove chunks from the index."""
+        if not ids:
+            return
+        with self._lock, self._conn:
+            self._rows -= self._conn.executemany(
+                "DELETE FROM chunks WHERE chunk_id = ?", [(i,) for i in ids]
+            ).rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def count_by_source(self, sources: List[str]) -> Dict[str, int]:
+        """Number of indexed chunks per source."""
+        if not sources:
+            return {}
+        placeholders = ", ".join("?" for _ in sources)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT source, COUNT(*) FROM chunks WHERE source IN ({placeholders}) GROUP BY source",
+                list(sources),
+            ).fetchall()
+        counts = {source: 0 for source in sources}
+        counts.update(dict(rows))
+        return counts
+
+    def _doc_counts(self, terms: List[str], cap: int) -> Dict[str, int]:
+        """
+        Number of chunks containing each term, counted up to `cap + 1`.
+
+        Counting stops early, so a very common term costs no more than a
+        rare one. Must be called with `_lock` held.
+        """
+        return {
+            term: self._conn.execute(
+                "SELECT COUNT(*) FROM (SELECT rowid FROM chunks_fts WHERE chunks_fts MATCH ? LIMIT ?)",
+                [_fts_query([term]), cap + 1],
+            ).fetchone()[0]
+            for term in terms
+        }
+
+    def _match_plan(self, terms: List[str]) -> List[Tuple[str, bool]]:
+        """
+        MATCH expressions to run in order, each with whether it only runs
+        when nothing has matched yet.
+
+        Terms in more than `MAX_TERM_DOC_RATIO` of all chunks are dropped.
+        Chunks containing every remaining term come first, then chunks
+        matching the rarest terms within `MATCH_DOC_BUDGET` postings. A
+        query made only of common terms has no lexical signal and gets an
+        empty plan (dense retrieval still answers it). Must be called with
+        `_lock` held.
+        """
+        max_docs = max(MIN_PRUNE_DOCS, int(self._rows * MAX_TERM_DOC_RATIO))
+        doc_counts = self._doc_counts(terms, max_docs)
+        present = sorted((t for t in terms if doc_counts[t]), key=doc_counts.__getitem__)
+        kept = [t for t in present if doc_counts[t] <= max_docs]
+        if not kept:
+            return []
+
+        plan: List[Tuple[str, bool]] = []
+        if len(kept) > 1:
+            plan.append((_fts_query(kept, "AND"), False))
+        cheap, postings = [], 0
+        for term in kept:
+            postings += doc_counts[term]
+            if postings > MATCH_DOC_BUDGET:
+                break
+            cheap.append(term)
+        if cheap:
+            plan.append((_fts_query(cheap), False))
+        else:
+            plan.append((_fts_query(kept[:1]), True))
+        return plan
+
+    def search(self, query: str, limit: int = 5, sources: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        BM25 search, optionally restricted to some sources.
+
+        Chunks containing every informative query term rank first (see
+        `_match_plan`), then the best matches of the rarest terms.
+
+        Returns a list of dicts with `id`, `text`, `metadata` and `score`
+        (the BM25 score; higher is more relevant).
+        """
+        terms = _query_terms(query)
+        if not terms:
+            return []
+
+        # Rank on the FTS table alone, then load only the top rows
+        sql = "SELECT rowid, bm25(chunks_fts) AS rank FROM chunks_fts WHERE chunks_fts MATCH ?"
+        params: List[Any] = []
+        if sources is not None:
+            sql += f" AND rowid IN (SELECT rowid FROM chunks WHERE source IN ({', '.join('?' for _ in sources)}))"
+            params.extend(sources)
+        sql = (
+            "SELECT c.chunk_id, c.text, c.metadata, r.rank "
+            f"FROM ({sql} ORDER BY rank LIMIT ?) r JOIN chunks c ON c.rowid = r.rowid "
+            "ORDER BY r.rank"
+        )
+        params.append(int(limit))
+
+        found: Dict[str, Tuple[str, str, float]] = {}
+        with self._lock:
+            for match, only_if_empty in self._match_plan(terms):
+                if len(found) >= limit or (only_if_empty and found):
+                    break
+                for chunk_id, text, metadata, rank in self._conn.execute(sql, [match, *params]):
+                    found.setdefault(chunk_id, (text, metadata, rank))
+        return [
+            {
+                "id": chunk_id,
+                "text": text,
+                "metadata": json.loads(metadata),
+                # FTS5's bm25() is negated so that ORDER BY ascending works
+                "score": -float(rank),
+            }
+            for chunk_id, (text, metadata, rank) in list(found.items())[:limit]
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_index: Optional[LexicalIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_lexical_index() -> LexicalIndex:
+    """Get or lazily open the process-wide lexical index."""
+    global _index
+
+    with _index_lock:
+        if _index is None:
+            _index = LexicalIndex()
+        return _index
+
+
+def close_lexical_index() -> None:
+    """Close the process-wide lexical index (called on FastAPI shutdown)."""
+    global _index
+
+    with _index_lock:
+        index, _index = _index, None
+    if index is not None:
+        index.close()
@@ -0,0 +1,69 @@
+"""
+Bulk task persistence.
+
+Detected tasks from ingestion and meeting transcripts are written in a single
+transaction with one multi-row INSERT ... RETURNING, instead of a commit and
+refresh per task.
+"""
+from typing import Dict, Iterable, List, Any
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models import TaskModel
+
+
+_RETURNED_COLUMNS = (
+    TaskModel.id,
+    TaskModel.title,
+    TaskModel.description,
+    TaskModel.due_date,
+    TaskModel.priority,
+    TaskModel.status,
+)
+
+
+def bulk_insert_tasks(
+    db: Session, tasks: Iterable[Dict[str, Any]], status: str = "detected", limit: int = 25
+) -> List[Dict[str, Any]]:
+    """
+    Insert tasks in one transaction and return them with their new ids.
+
+    Args:
+        db: Database session
+        tasks: Task dicts with `title` and optional `description`,
+            `due_date` and `priority` (e.g. LLM extraction output)
+        status: Status given to every inserted task
+        limit: Maximum number of tasks inserted
+
+    Returns:
+        List of task dicts (`id`, `title`, `description`, `due_date`,
+        `priority`, `status`) in input order
+    """
+    rows = []
+    for t in tasks:
+        if len(rows) >= limit:
+            break
+        title = str(t.get("title", "")).strip()
+        if not title:
+            continue
+        rows.append(
+            {
+                "title": title,
+                "description": (t.get("description") or None),
+                "due_date": (t.get("due_date") or None),
+                "priority": (t.get("priority") or None),
+                "status": status,
+            }
+        )
+
+    if not rows:
+        return []
+
+    result = db.execute(
+        insert(TaskModel).returning(*_RETURNED_COLUMNS, sort_by_parameter_order=True),
+        rows,
+    )
+    created = [dict(row._mapping) for row in result]
+    db.commit()
+    return created
@@ -3,13 +3,27 @@ Vector store wrapper around Chroma.
 
 This provides a minimal persistence-backed vector store used by the RAG engine.
 All data stays on disk under `settings.vector_db_path`.
+
+Chroma clients are pooled per process: the first `VectorStore` opens the
+persistent client and each collection handle once, later instances reuse them.
+Every chunk is also kept in the BM25 lexical index (`app.storage.lexical_index`).
+
+Searches accept metadata filters (`app.storage.filters`). Searches scoped
+to a few sources are answered exactly from a per-source embedding matrix
+instead of filtering the global HNSW graph.
 """
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, List, Dict, Optional, Set, Tuple
 
 from pathlib import Path
+import threading
+
+import numpy as np
 
 from app.core.config import settings
 from app.ai.embeddings import embed_texts
+from app.storage.filters import matches, normalize_filters, scoped_sources, to_chroma_where
+from app.storage.lexical_index import get_lexical_index
 
 try:
     import chromadb  # type: ignore
@@ -17,22 +31,235 @@ except Exception:  # pragma: no cover - optional dependency
     chromadb = None
 
 
-class VectorStore:
-    """Chroma vector store wrapper."""
+# Process-wide client registry. `run_in_threadpool` callers may construct
+# stores concurrently, so every access goes through `_pool_lock`.
+_pool_lock = threading.Lock()
+_client: Optional[Any] = None
+_collections: Dict[str, Any] = {}
+_pool_stats: Dict[str, int] = {
+    "client_opens": 0,
+    "collection_opens": 0,
+    "collection_hits": 0,
+}
 
-    def __init__(self, collection_name: str = "cortexdesk_documents"):
-        if chromadb is None:
-            raise RuntimeError(
-                "chromadb is not installed. "
-                "Install optional AI dependencies with:\n"
-                "  pip install -r backend/requirements-ai.txt"
-            )
 
+def _get_client() -> Any:
+    """Return the shared Chroma client, opening it on first use.
+
+    Must be called with `_pool_lock` held.
+    """
+    global _client
+
+    if _client is None:
         base_path = Path(settings.vector_db_path)
         base_path.mkdir(parents=True, exist_ok=True)
+        _client = chromadb.PersistentClient(path=str(base_path))
+        _pool_stats["client_opens"] += 1
+    return _client
+
+
+def get_collection(collection_name: str) -> Any:
+    """
+    Get a pooled collection handle, creating it on first use.
+
+    Args:
+        collection_name: Chroma collection name
+
+    Returns:
+        The shared Chroma collection for this process
+    """
+    if chromadb is None:
+        raise RuntimeError(
+            "chromadb is not installed. "
+            "Install optional AI dependencies with:\n"
+            "  pip install -r backend/requirements-ai.txt"
+        )
+
+    with _pool_lock:
+        collection = _collections.get(collection_name)
+        if collection is not None:
+            _pool_stats["collection_hits"] += 1
+            return collection
+
+        collection = _get_client().get_or_create_collection(collection_name)
+        _collections[collection_name] = collection
+        _pool_stats["collection_opens"] += 1
+        return collection
+
+
+def get_pool_stats() -> Dict[str, int]:
+    """Return open/hit counters for the pooled Chroma client."""
+    with _pool_lock:
+        stats = dict(_pool_stats)
+        stats["open_collections"] = len(_collections)
+    stats["source_index_hits"] = _source_index.hits
+    stats["source_index_loads"] = _source_index.loads
+    stats["source_index_bytes"] = _source_index.size_bytes
+    return stats
+
+
+def close_pool() -> None:
+    """
+    Drop the pooled client and collection handles.
+
+    Called on FastAPI shutdown. Chroma persists on write, so this only
+    releases the handles (and stops the client system where supported).
+    """
+    global _client
+
+    with _pool_lock:
+        client = _client
+        _client = None
+        _collections.clear()
+
+    if client is None:
+        return
+
+    close = getattr(client, "close", None)
+    try:
+        if callable(close):
+            close()
+        elif hasattr(client, "clear_system_cache"):
+            client.clear_system_cache()
+    except Exception:  # pragma: no cover - best-effort shutdown
+        pass
+
+
+# Callbacks notified with (sources, ids) whenever chunks are added or deleted,
+# so derived caches (e.g. the RAG answer cache) can drop stale entries.
+ChangeListener = Callable[[Set[str], Set[str]], None]
+_change_listeners: List[ChangeListener] = []
+
+
+def add_change_listener(listener: ChangeListener) -> None:
+    """Register a callback for chunk additions/deletions."""
+    if listener not in _change_listeners:
+        _change_listeners.append(listener)
+
+
+def _notify_change(metadatas: Iterable[Optional[Dict]], ids: Iterable[str]) -> None:
+    sources = {str(m["source"]) for m in metadatas if m and m.get("source") is not None}
+    changed_ids = set(ids)
+    for listener in list(_change_listeners):
+        listener(sources, changed_ids)
+
+
+# Scoped searches over at most this many chunks use the exact per-source
+# index; larger scopes fall back to Chroma's filtered HNSW query
+EXACT_SEARCH_MAX_CHUNKS = 20000
+# Budget for all cached per-source matrices together (embedding bytes)
+SOURCE_INDEX_MAX_BYTES = 256 * 1024 * 1024
+LEXICAL_FILTER_OVERFETCH = 4
+
+
+class _SourceIndex:
+    """
+    LRU of per-source chunk embedding matrices, keyed by (collection, source).
+
+    Entries are dropped whenever chunks of their source change. Every source
+    has a generation counter bumped on change; a matrix loaded while its
+    source changed is returned to the caller but not cached. The LRU is
+    bounded by the total size of the cached matrices, not their number.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.loads = 0
+
+    def get(self, collection: Any, source: str) -> Dict[str, Any]:
+        key = (collection.name, source)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            generation = self._generations.get(source, 0)
+
+        data = collection.get(where={"source": source}, include=["embeddings", "documents", "metadatas"])
+        embeddings = data.get("embeddings")
+        entry = {
+            "ids": list(data.get("ids") or []),
+            "documents": list(data.get("documents") or []),
+            "metadatas": [m or {} for m in (data.get("metadatas") or [])],
+            "matrix": np.asarray(embeddings if embeddings is not None else [], dtype="float32"),
+        }
+        size = entry["matrix"].nbytes
+        with self._lock:
+            self.loads += 1
+            if self._generations.get(source, 0) != generation or size > self.max_bytes:
+                return entry
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous["matrix"].nbytes
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted["matrix"].nbytes
+        return entry
 
-        self._client = chromadb.PersistentClient(path=str(base_path))
-        self._collection = self._client.get_or_create_collection(collection_name)
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._bytes
+
+    def invalidate(self, sources: Set[str], chunk_ids: Set[str]) -> None:
+        if not sources:
+            return
+        with self._lock:
+            for source in sources:
+                self._generations[source] = self._generations.get(source, 0) + 1
+            for key in [k for k in self._entries if k[1] in sources]:
+                self._bytes -= self._entries.pop(key)["matrix"].nbytes
+
+
+_source_index = _SourceIndex(SOURCE_INDEX_MAX_BYTES)
+add_change_listener(_source_index.invalidate)
+
+
+_backfilled: Set[str] = set()
+_backfill_lock = threading.Lock()
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _ensure_lexical_backfill(collection: Any, lexical: Any) -> None:
+    """
+    Index chunks that were stored in Chroma before the lexical index existed.
+
+    Runs at most once per collection per process, and only when the lexical
+    index is empty.
+    """
+    with _backfill_lock:
+        if collection.name in _backfilled:
+            return
+        _backfilled.add(collection.name)
+        if lexical.count() > 0:
+            return
+        offset = 0
+        while True:
+            batch = collection.get(
+                include=["documents", "metadatas"], limit=BACKFILL_BATCH_SIZE, offset=offset
+            )
+            ids = batch.get("ids") or []
+            if not ids:
+                break
+            lexical.add(ids, batch.get("documents") or [], batch.get("metadatas") or [])
+            offset += len(ids)
+
+
+class VectorStore:
+    """Chroma vector store wrapper backed by the process-wide client pool."""
+
+    def __init__(self, collection_name: str = "cortexdesk_documents"):
+        self._collection = get_collection(collection_name)
+        self._lexical = get_lexical_index()
+        _ensure_lexical_backfill(self._collection, self._lexical)
 
     def add_documents(self, texts: List[str], metadatas: List[Dict], ids: List[str]):
         """
@@ -54,30 +281,96 @@ class VectorStore:
             documents=texts,
             embeddings=embeddings.tolist(),
         )
+        self._lexical.add(ids, texts, metadatas)
+        _notify_change(metadatas, ids)
 
-    def search(self, query: str, limit: int = 5) -> List[Dict]:
+    def get_source_metadatas(self, source: str) -> Dict[str, Dict]:
+        """Map chunk id -> metadata for every chunk stored for `source`."""
+        existing = self._collection.get(where={"source": source}, include=["metadatas"])
+        return {
+            chunk_id: meta or {}
+            for chunk_id, meta in zip(existing.get("ids") or [], existing.get("metadatas") or [])
+        }
+
+    def update_metadatas(self, metadatas: List[Dict], ids: List[str]) -> None:
+        """Replace the metadata of existing chunks without re-embedding them."""
+        if not ids:
+            return
+        self._collection.update(ids=ids, metadatas=metadatas)
+        self._lexical.update_metadata(ids, metadatas)
+        _notify_change(metadatas, ids)
+
+    def delete_documents(self, ids: Optional[List[str]] = None, where: Optional[Dict] = None) -> int:
+        """
+        Delete chunks by id and/or metadata filter (e.g. `{"source": name}`).
+
+        Returns the number of chunks deleted.
+        """
+        if not ids and not where:
+            return 0
+
+        existing = self._collection.get(ids=ids, where=where, include=["metadatas"])
+        existing_ids = existing.get("ids") or []
+        if not existing_ids:
+            return 0
+
+        self._collection.delete(ids=existing_ids)
+        self._lexical.delete(existing_ids)
+        _notify_change(existing.get("metadatas") or [], existing_ids)
+        return len(existing_ids)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[np.ndarray] = None,
+    ) -> List[Dict]:
         """
         Search for documents similar to the query string.
 
-        Returns a list of dicts with `text`, `score`, and `metadata`.
+        Args:
+            query: Search query
+            limit: Maximum number of results
+            where: Metadata filter (see `app.storage.filters`)
+            query_embedding: Precomputed embedding of `query` (skips embedding)
+
+        Returns a list of dicts with `id`, `text`, `score`, and `metadata`.
+
+        Raises:
+            ValueError: If the filter is malformed
         """
+        filters = normalize_filters(where)
         if not query:
             return []
 
-        query_emb = embed_texts([query])
+        if query_embedding is not None:
+            query_emb = np.asarray(query_embedding, dtype="float32").reshape(1, -1)
+        else:
+            query_emb = embed_texts([query])
+
+        sources = scoped_sources(filters)
+        if sources is not None:
+            counts = self._lexical.count_by_source(sources)
+            if sum(counts.values()) <= EXACT_SEARCH_MAX_CHUNKS:
+                return self._exact_search(query_emb[0], [s for s in sources if counts.get(s)], filters, limit)
+
         results = self._collection.query(
             query_embeddings=query_emb.tolist(),
             n_results=limit,
+            where=to_chroma_where(filters),
         )
 
+        chunk_ids = results.get("ids", [[]])[0]
         documents = results.get("documents", [[]])[0]
         metadatas = results.get("metadatas", [[]])[0]
         distances = results.get("distances", [[]])[0]
 
         out: List[Dict] = []
-        for text, meta, dist in zip(documents, metadatas, distances):
+        for chunk_id, text, meta, dist in zip(chunk_ids, documents, metadatas, distances):
             out.append(
                 {
+                    "id": chunk_id,
                     "text": text,
                     "metadata": meta or {},
                     "score": float(dist),
@@ -85,3 +378,50 @@ class VectorStore:
             )
         return out
 
+    def _exact_search(
+        self, query_emb: np.ndarray, sources: List[str], filters: Dict[str, Any], limit: int
+    ) -> List[Dict]:
+        """Brute-force search over the per-source index (same squared-L2 score as Chroma)."""
+        candidates: List[Tuple[float, str, str, Dict]] = []
+        for source in sources:
+            entry = _source_index.get(self._collection, source)
+            if not entry["ids"]:
+                continue
+            distances = np.sum((entry["matrix"] - query_emb) ** 2, axis=1)
+            found = 0
+            for i in np.argsort(distances):
+                meta = entry["metadatas"][i]
+                if not matches(meta, filters):
+                    continue
+                candidates.append((float(distances[i]), entry["ids"][i], entry["documents"][i], meta))
+                found += 1
+                if found >= limit:
+                    break
+        candidates.sort(key=lambda c: c[0])
+        return [
+            {"id": chunk_id, "text": text, "metadata": meta, "score": dist}
+            for dist, chunk_id, text, meta in candidates[:limit]
+        ]
+
+    def lexical_search(self, query: str, limit: int = 5, where: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """
+        BM25 keyword search over the same chunks (exact identifiers, names).
+
+        Args:
+            query: Search query
+            limit: Maximum number of results
+            where: Metadata filter (see `app.storage.filters`)
+
+        Returns a list of dicts with `id`, `text`, `score` (BM25, higher is
+        better), and `metadata`.
+        """
+        filters = normalize_filters(where)
+        if not query:
+            return []
+        sources = scoped_sources(filters)
+        if not filters or set(filters) == {"source"} and sources is not None:
+            # Pure source scoping is handled by the index itself
+            return self._lexical.search(query, limit=limit, sources=sources)
+        # Other conditions are checked on over-fetched results
+        results = self._lexical.search(query, limit=limit * LEXICAL_FILTER_OVERFETCH, sources=sources)
+        return [r for r in results if matches(r["metadata"], filters)][:limit]
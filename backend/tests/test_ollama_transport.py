@@ -0,0 +1,221 @@
+"""
+Tests for the pooled Ollama transport and the llm_client API on top of it.
+
+A small fake Ollama server (asyncio streams, HTTP/1.1 keep-alive, NDJSON
+streaming over chunked encoding) stands in for the daemon, so connection
+reuse, concurrency caps, streaming order, disconnects and deadlines are
+exercised over real sockets.
+"""
+from typing import List, Sequence
+import asyncio
+import json
+
+import pytest
+
+from app.ai import llm_client
+from app.ai.ollama_transport import close_transport
+
+pytest.importorskip("httpx")
+
+TOKENS = ["Local", " models", " answer", " offline", "."]
+
+
+class FakeOllama:
+    """Minimal `/api/chat` server that records connections and concurrency."""
+
+    def __init__(self, tokens: Sequence[str] = TOKENS, delay: float = 0.0, token_delay: float = 0.0):
+        self.tokens = list(tokens)
+        self.delay = delay
+        self.token_delay = token_delay
+        self.connections = 0
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+        self.disconnects = 0
+        self._server = None
+
+    async def __aenter__(self) -> "FakeOllama":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b""):
+                        break
+                    name, value = line.decode().split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+                payload = json.loads(await reader.readexactly(int(headers.get("content-length", 0))))
+                self.requests += 1
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+                try:
+                    await asyncio.sleep(self.delay)
+                    if payload.get("stream"):
+                        await self._stream(writer)
+                    else:
+                        body = json.dumps(
+                            {"message": {"content": "".join(self.tokens)}, "done": True}
+                        ).encode()
+                        writer.write(
+                            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                            b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+                        )
+                        await writer.drain()
+                finally:
+                    self.active -= 1
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self.disconnects += 1
+        finally:
+            writer.close()
+
+    async def _stream(self, writer: asyncio.StreamWriter) -> None:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        chunks = [{"message": {"content": t}, "done": False} for t in self.tokens]
+        chunks.append({"message": {"content": ""}, "done": True})
+        for chunk in chunks:
+            line = json.dumps(chunk).encode() + b"\n"
+            writer.write(b"%x\r\n%s\r\n" % (len(line), line))
+            await writer.drain()
+            await asyncio.sleep(self.token_delay)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+@pytest.fixture
+def llm_config(monkeypatch):
+    """Point llm_client at a fake server; returns a setter for its config."""
+    cfg = {"model": "fake", "max_tokens": 64}
+
+    def _configure(server: FakeOllama, **overrides) -> None:
+        cfg.update(base_url=server.base_url, **overrides)
+
+    monkeypatch.setattr(llm_client, "load_model_config", lambda: cfg)
+    return _configure
+
+
+def run(coro):
+    async def _with_cleanup():
+        try:
+            return await coro
+        finally:
+            await close_transport()
+
+    return asyncio.run(_with_cleanup())
+
+
+def test_pool_reuses_connections_and_caps_concurrency(llm_config):
+    async def scenario():
+        async with FakeOllama(delay=0.05) as server:
+            llm_config(server, connection_pool_size=3)
+            first = await asyncio.gather(*(llm_client.generate(f"q{i}") for i in range(10)))
+            second = await asyncio.gather(*(llm_client.generate(f"q{i}") for i in range(10)))
+            return server, first + second
+
+    server, answers = run(scenario())
+    assert answers == ["".join(TOKENS)] * 20
+    assert server.requests == 20
+    assert server.max_active == 3
+    # Keep-alive: 20 requests over at most pool_size connections
+    assert server.connections <= 3
+
+
+def test_streaming_yields_tokens_in_order_with_metrics(llm_config):
+    tokens = [f" t{i}" for i in range(40)]
+
+    async def scenario():
+        async with FakeOllama(tokens=tokens, delay=0.02) as server:
+            llm_config(server)
+            metrics = {}
+            received = [t async for t in llm_client.generate_streaming("q", metrics=metrics)]
+            return received, metrics
+
+    before = llm_client.get_streaming_stats()["completed"]
+    received, metrics = run(scenario())
+    assert received == tokens
+    assert metrics["tokens"] == len(tokens)
+    assert metrics["ttft_ms"] >= 20
+    assert metrics["tokens_per_second"] > 0
+    assert llm_client.get_streaming_stats()["completed"] == before + 1
+
+
+def test_client_disconnect_cancels_upstream_and_frees_the_slot(llm_config):
+    async def scenario():
+        async with FakeOllama(tokens=[f" t{i}" for i in range(200)], token_delay=0.01) as server:
+            llm_config(server, connection_pool_size=1)
+            stream = llm_client.generate_streaming("q")
+            received: List[str] = [await stream.__anext__(), await stream.__anext__()]
+            await stream.aclose()
+            for _ in range(100):
+                if server.disconnects:
+                    break
+                await asyncio.sleep(0.01)
+            # The only connection slot must be free again
+            answer = await asyncio.wait_for(llm_client.generate("next"), timeout=2)
+            return server, received, answer
+
+    before = llm_client.get_streaming_stats()["disconnected"]
+    server, received, answer = run(scenario())
+    assert received == [" t0", " t1"]
+    assert server.disconnects == 1
+    assert answer
+    assert llm_client.get_streaming_stats()["disconnected"] == before + 1
+
+
+def test_timeout_is_a_total_deadline(llm_config):
+    async def scenario():
+        # Each fragment arrives well within any per-read timeout, but the
+        # whole stream takes ~2s
+        async with FakeOllama(tokens=["x"] * 20, token_delay=0.1) as server:
+            llm_config(server)
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            with pytest.raises(RuntimeError, match="timed out"):
+                async for _ in llm_client.generate_streaming("q", timeout=0.5):
+                    pass
+            stream_elapsed = loop.time() - started
+
+        async with FakeOllama(delay=1.0) as server:
+            llm_config(server)
+            started = loop.time()
+            with pytest.raises(RuntimeError, match="timed out"):
+                await llm_client.generate("q", timeout=0.3)
+            return stream_elapsed, loop.time() - started
+
+    stream_elapsed, chat_elapsed = run(scenario())
+    assert stream_elapsed < 1.0
+    assert chat_elapsed < 0.8
+
+
+def test_stream_deadline_covers_waiting_for_headers(llm_config):
+    async def scenario():
+        # The server sits on the request before sending any response headers
+        async with FakeOllama(delay=2.0) as server:
+            llm_config(server)
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            with pytest.raises(RuntimeError, match="timed out"):
+                async for _ in llm_client.generate_streaming("q", timeout=0.3):
+                    pass
+            return loop.time() - started
+
+    assert run(scenario()) < 0.8
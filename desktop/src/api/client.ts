@@ -112,9 +112,22 @@ export type Task = {
   scheduled_for?: string | null;
 };
 
+// Largest page the backend serves (MAX_PAGE_SIZE in backend/app/api/tasks.py)
+const TASK_PAGE_SIZE = 500;
+
 export async function getTasks(status?: string) {
-  const res = await apiClient.get('/tasks', { params: status ? { status } : undefined });
-  return res.data as { tasks: Task[] };
+  // /tasks is keyset-paginated; follow next_cursor until the last page
+  const tasks: Task[] = [];
+  let cursor: string | null = null;
+  do {
+    const res = await apiClient.get('/tasks', {
+      params: { limit: TASK_PAGE_SIZE, ...(status ? { status } : {}), ...(cursor ? { cursor } : {}) },
+    });
+    const page = res.data as { tasks: Task[]; next_cursor: string | null };
+    tasks.push(...page.tasks);
+    cursor = page.next_cursor;
+  } while (cursor);
+  return { tasks };
 }
 
 export async function createTask(task: Omit<Task, 'id'>) {
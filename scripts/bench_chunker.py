@@ -0,0 +1,112 @@
+"""
+Throughput and memory benchmark for the streaming chunker (app.preprocessing.chunking).
+
+Generates plain-text files of the given sizes (sentences and paragraphs of
+random words) in a temporary directory and chunks each one two ways:
+
+  streaming  - iter_txt_segments -> iter_chunks, chunks consumed one at a time
+               (the ingestion path)
+  in-memory  - read_txt -> chunk_text, whole text and chunk list held at once
+
+For each it reports MB/s, chunks produced and the peak Python heap
+(tracemalloc) while chunking. The streaming peak should stay flat as the
+file grows; the in-memory peak grows with it (so it is only run up to
+--in-memory-max-mb). Throughput is measured without tracemalloc, in a
+separate pass.
+
+Usage:
+    python scripts/bench_chunker.py [--sizes-mb 5 20 100] [--in-memory-max-mb 20]
+"""
+from pathlib import Path
+import argparse
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from app.connectors.file_reader import iter_txt_segments, read_txt  # noqa: E402
+from app.preprocessing.chunking import chunk_text, iter_chunks  # noqa: E402
+
+WORDS = (
+    "invoice ticket meeting budget review deadline report customer vendor "
+    "release design contract payment schedule agenda action owner status "
+    "quarter forecast hiring roadmap incident followup approval draft "
+    "the a of to and for with on by from"
+).split()
+MB = 1024 * 1024
+
+
+def write_corpus(path: Path, size_mb: float, seed: int = 23) -> int:
+    """Write about `size_mb` MB of prose; returns the size in bytes."""
+    rng = random.Random(seed)
+    # A pool of paragraphs is reused so generation doesn't dominate
+    paragraphs = []
+    for _ in range(200):
+        sentences = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 30))).capitalize() + rng.choice(".!?")
+            for _ in range(rng.randint(2, 10))
+        ]
+        paragraphs.append(" ".join(sentences) + "\n\n")
+    target = int(size_mb * MB)
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < target:
+            paragraph = rng.choice(paragraphs)
+            f.write(paragraph)
+            written += len(paragraph)
+    return path.stat().st_size
+
+
+def streaming(path: Path) -> int:
+    return sum(1 for _ in iter_chunks(iter_txt_segments(path)))
+
+
+def in_memory(path: Path) -> int:
+    return len(chunk_text(read_txt(path)))
+
+
+def measure(fn, path: Path):
+    """(seconds, chunks) without tracing, then peak traced heap in bytes."""
+    start = time.perf_counter()
+    chunks = fn(path)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        fn(path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, chunks, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[5, 20, 100])
+    parser.add_argument(
+        "--in-memory-max-mb", type=float, default=20, help="largest file also chunked in memory (0 to skip)"
+    )
+    args = parser.parse_args()
+
+    print(f"{'size MB':>8} {'mode':<10} {'seconds':>8} {'MB/s':>7} {'chunks':>9} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in args.sizes_mb:
+            path = Path(tmp) / f"corpus_{size_mb:g}mb.txt"
+            size = write_corpus(path, size_mb)
+            modes = [("streaming", streaming)]
+            if size_mb <= args.in_memory_max_mb:
+                modes.append(("in-memory", in_memory))
+            for name, fn in modes:
+                seconds, chunks, peak = measure(fn, path)
+                print(
+                    f"{size / MB:>8.1f} {name:<10} {seconds:>8.2f} {size / MB / seconds:>7.2f} "
+                    f"{chunks:>9} {peak / MB:>8.1f}"
+                )
+            path.unlink()
+
+
+if __name__ == "__main__":
+    main()
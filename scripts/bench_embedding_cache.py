@@ -0,0 +1,94 @@
+"""
+Before/after benchmark for the embedding cache (app.ai.embedding_cache).
+
+Embeds a synthetic re-ingestion workload (unique chunks plus repeated
+boilerplate) four ways:
+
+  no cache     - every text goes through the model (the old embed_texts)
+  cold cache   - first ingest through the cache: only distinct texts are encoded
+  warm memory  - re-ingest with the in-memory LRU populated
+  warm disk    - re-ingest after a restart (fresh process cache, disk store only)
+
+Needs the optional AI dependencies (pip install -r backend/requirements-ai.txt).
+The cache is created in a temporary directory, not under data/.
+
+Usage:
+    python scripts/bench_embedding_cache.py [--chunks 2000] [--boilerplate 0.3]
+"""
+from pathlib import Path
+import argparse
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from app.ai import embedding_cache  # noqa: E402
+from app.ai.embedding_cache import EmbeddingCache  # noqa: E402
+from app.ai.embeddings import _encode, _get_model, embed_texts  # noqa: E402
+
+WORDS = (
+    "invoice ticket meeting budget review deadline report customer vendor "
+    "release design contract payment schedule agenda action owner status "
+    "quarter forecast hiring roadmap incident followup approval draft"
+).split()
+BOILERPLATE = [
+    "Confidential - internal use only. Do not forward.",
+    "Best regards, The Finance Team",
+    "Slide footer: CortexDesk quarterly review",
+    "This message was sent from a monitored mailbox.",
+]
+
+
+def make_workload(chunks: int, boilerplate_ratio: float, seed: int = 7):
+    rng = random.Random(seed)
+    texts = []
+    for i in range(chunks):
+        if rng.random() < boilerplate_ratio:
+            texts.append(rng.choice(BOILERPLATE))
+        else:
+            words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 80)))
+            texts.append(f"Chunk {i}: {words}.")
+    return texts
+
+
+def timed(fn, texts):
+    start = time.perf_counter()
+    fn(texts)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--boilerplate", type=float, default=0.3, help="share of repeated boilerplate chunks")
+    args = parser.parse_args()
+
+    texts = make_workload(args.chunks, args.boilerplate)
+    print(f"{len(texts)} chunks, {len(set(texts))} distinct")
+    _get_model()  # load outside the timings
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "embedding_cache.sqlite3"
+        rows = [("no cache", timed(_encode, texts))]
+
+        embedding_cache._cache = EmbeddingCache(db_path=db_path)
+        rows.append(("cold cache", timed(embed_texts, texts)))
+        rows.append(("warm memory", timed(embed_texts, texts)))
+
+        embedding_cache._cache.close()
+        embedding_cache._cache = EmbeddingCache(db_path=db_path)
+        rows.append(("warm disk", timed(embed_texts, texts)))
+        stats = embedding_cache._cache.stats()
+        embedding_cache.close_embedding_cache()
+
+    baseline = rows[0][1]
+    print(f"{'mode':<12} {'seconds':>9} {'chunks/s':>10} {'speedup':>8}")
+    for name, seconds in rows:
+        print(f"{name:<12} {seconds:>9.3f} {len(texts) / seconds:>10.0f} {baseline / seconds:>7.1f}x")
+    print(f"cache stats after warm disk run: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Throughput benchmark for the embedding engine (app.ai.embeddings).
+
+Encodes a fixed mix of short (query-like) and long (chunk-like) texts on
+CPU with each quantization mode, first at fixed encode batch sizes and
+then with the length-adaptive batching `embed_texts` uses
+(`embeddings.batch_tokens`), and reports sentences/sec for each. The
+embedding cache is bypassed, so every text goes through the model.
+
+Needs the optional AI dependencies (pip install -r backend/requirements-ai.txt).
+
+Usage:
+    python scripts/bench_embeddings.py [--texts 1000] [--batch-sizes 8 32 128]
+        [--batch-tokens 2048 8192] [--modes none int8]
+"""
+from pathlib import Path
+import argparse
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from app.ai import embeddings  # noqa: E402
+from app.ai.embeddings import DEFAULT_BATCH_TOKENS, QUANTIZATION_MODES, _encode, _get_model  # noqa: E402
+
+WORDS = (
+    "invoice ticket meeting budget review deadline report customer vendor "
+    "release design contract payment schedule agenda action owner status "
+    "quarter forecast hiring roadmap incident followup approval draft"
+).split()
+
+
+def make_texts(count: int, seed: int = 21):
+    """A quarter short questions (5-15 words), the rest chunk-sized (40-250 words)."""
+    rng = random.Random(seed)
+    texts = []
+    for i in range(count):
+        length = rng.randint(5, 15) if i % 4 == 0 else rng.randint(40, 250)
+        texts.append(f"{i}: " + " ".join(rng.choice(WORDS) for _ in range(length)))
+    rng.shuffle(texts)
+    return texts
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--batch-tokens", type=int, nargs="+", default=None, help="adaptive budgets (default: config)")
+    parser.add_argument("--modes", nargs="+", choices=QUANTIZATION_MODES, default=list(QUANTIZATION_MODES))
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts)
+    base_cfg = dict(embeddings.load_embedding_config())
+    batch_tokens = args.batch_tokens or [int(base_cfg.get("batch_tokens", DEFAULT_BATCH_TOKENS))]
+    print(f"{len(texts)} texts, model {base_cfg.get('model', embeddings.MODEL_NAME)}, device cpu")
+    print(f"{'mode':<6} {'batching':<20} {'seconds':>9} {'sentences/s':>12}")
+
+    for mode in args.modes:
+        cfg = {**base_cfg, "device": "cpu", "quantization": mode}
+        embeddings.load_embedding_config = lambda: cfg
+        model = _get_model()  # load (and quantize) outside the timings
+        load_seconds = embeddings.get_embedding_engine_stats()["load_seconds"]
+        model.encode(texts[:8], convert_to_numpy=True, normalize_embeddings=True)
+
+        for batch_size in args.batch_sizes:
+            seconds = timed(
+                lambda: model.encode(
+                    texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True
+                )
+            )
+            print(f"{mode:<6} {f'fixed {batch_size}':<20} {seconds:>9.2f} {len(texts) / seconds:>12.0f}")
+        for budget in batch_tokens:
+            cfg["batch_tokens"] = budget
+            seconds = timed(lambda: _encode(texts))
+            print(f"{mode:<6} {f'adaptive {budget} tok':<20} {seconds:>9.2f} {len(texts) / seconds:>12.0f}")
+        print(f"{mode:<6} model load: {load_seconds}s")
+
+
+if __name__ == "__main__":
+    main()
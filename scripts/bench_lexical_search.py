@@ -0,0 +1,177 @@
+"""
+Latency benchmark for BM25 lexical search (app.storage.lexical_index).
+
+Builds a synthetic index (default 1M chunks: English stopwords plus a
+Zipf-distributed content vocabulary, with a unique ticket number in 1% of
+chunks) and runs three kinds of queries against it:
+
+  natural     - questions such as "what is the status of the <w> <w> for <w>?";
+                one chunk is planted with all three content words
+  common      - questions made only of frequent words (no planted answer;
+                pruned search finds no lexical signal and returns nothing)
+  identifier  - exact ticket lookups ("where is ticket TCK0001234?")
+
+once through `LexicalIndex.search` (stopwords and terms in more than
+MAX_TERM_DOC_RATIO of chunks dropped, chunks with all remaining terms
+first) and once as the index did before: every term ORed together and
+every match joined and scored. Reports p50/p95/max latency per kind and hit@5, the share
+of queries whose planted chunk or ticket is in the top 5.
+
+Building 1M chunks takes a few minutes; pass --db to keep the index and
+reuse it on the next run (with the same --chunks and --queries).
+
+Usage:
+    python scripts/bench_lexical_search.py [--chunks 1000000] [--queries 50] [--db PATH]
+"""
+from pathlib import Path
+import argparse
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from app.storage.lexical_index import MAX_QUERY_TERMS, STOPWORDS, LexicalIndex  # noqa: E402
+
+VOCABULARY = 30000
+WORDS_PER_CHUNK = 50
+STOPWORD_SHARE = 0.4
+TICKET_SHARE = 0.01
+BATCH = 10000
+SYLLABLES = "ka lo mi nu pe ra si to vu be da fe gi ho ju ne po re su ti".split()
+
+
+def make_vocabulary(seed: int = 16) -> list:
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < VOCABULARY:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def zipf_weights(n: int) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** 1.1
+    return weights / weights.sum()
+
+
+def make_queries(count: int, vocab: list, chunks: int, seed: int = 17):
+    """
+    Returns ({kind: [(query, target chunk id or None)]}, plants), where
+    plants maps chunk numbers to text appended to them.
+    """
+    rng = random.Random(seed)
+    frequent, middle = vocab[:50], vocab[50:5000]
+    plants = {}
+    natural = []
+    for _ in range(count):
+        a, b, c = rng.choice(middle), rng.choice(frequent), rng.choice(middle)
+        n = rng.randrange(chunks)
+        plants[n] = f" {a} {b} {c}."
+        natural.append((f"what is the status of the {a} {b} for {c}?", f"chunk-{n}"))
+    common = [
+        (f"what did we decide about the {rng.choice(frequent)} and {rng.choice(frequent)} at the {rng.choice(frequent)}?", None)
+        for _ in range(count)
+    ]
+    identifier = []
+    for _ in range(count):
+        n = rng.choice(range(0, chunks, int(1 / TICKET_SHARE)))
+        identifier.append((f"where is ticket TCK{n:07d}?", f"chunk-{n}"))
+    return {"natural": natural, "common": common, "identifier": identifier}, plants
+
+
+def build_index(index: LexicalIndex, chunks: int, vocab: list, plants: dict, seed: int = 16) -> None:
+    rng = np.random.default_rng(seed)
+    stopwords = np.array(sorted(STOPWORDS))
+    words = np.array(vocab)
+    weights = zipf_weights(len(words))
+    n_stop = int(WORDS_PER_CHUNK * STOPWORD_SHARE)
+    started = time.perf_counter()
+    for offset in range(0, chunks, BATCH):
+        size = min(BATCH, chunks - offset)
+        stop = stopwords[rng.integers(0, len(stopwords), size=(size, n_stop))]
+        content = rng.choice(words, size=(size, WORDS_PER_CHUNK - n_stop), p=weights)
+        rows = rng.permuted(np.concatenate([stop, content], axis=1), axis=1)
+        texts = []
+        for i, row in enumerate(rows):
+            n = offset + i
+            text = " ".join(row) + "." + plants.get(n, "")
+            if n % int(1 / TICKET_SHARE) == 0:
+                text += f" See ticket TCK{n:07d}."
+            texts.append(text)
+        ids = [f"chunk-{offset + i}" for i in range(size)]
+        index.add(ids, texts, [{"source": f"doc{(offset + i) // 100}.txt"} for i in range(size)])
+        done = offset + size
+        if done % (BATCH * 20) == 0 or done == chunks:
+            print(f"  indexed {done:,} chunks ({time.perf_counter() - started:.0f}s)", flush=True)
+
+
+def search_all_terms(index: LexicalIndex, query: str, limit: int) -> list:
+    """The search before term pruning: every term ORed, every match joined."""
+    terms = list(dict.fromkeys(re.findall(r"\w+", query.lower())))[:MAX_QUERY_TERMS]
+    rows = index._conn.execute(
+        "SELECT c.chunk_id, bm25(chunks_fts) AS rank "
+        "FROM chunks_fts JOIN chunks c ON c.rowid = chunks_fts.rowid "
+        "WHERE chunks_fts MATCH ? ORDER BY rank LIMIT ?",
+        [" OR ".join(f'"{term}"' for term in terms), limit],
+    ).fetchall()
+    return [{"id": chunk_id} for chunk_id, _ in rows]
+
+
+def run(search, queries: list):
+    """(sorted latencies in ms, hit@5 or None)"""
+    latencies, hits = [], 0
+    for query, target in queries:
+        start = time.perf_counter()
+        results = search(query, 5)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += target in [r["id"] for r in results]
+    has_targets = any(target for _, target in queries)
+    return sorted(latencies), hits / len(queries) if has_targets else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=50, help="queries per kind")
+    parser.add_argument("--db", type=Path, default=None, help="index file to build once and reuse")
+    args = parser.parse_args()
+
+    vocab = make_vocabulary()
+    queries, plants = make_queries(args.queries, vocab, args.chunks)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or Path(tmp) / "lexical_bench.sqlite3"
+        index = LexicalIndex(db_path)
+        if index.count() != args.chunks:
+            if index.count():
+                sys.exit(f"{db_path} holds {index.count():,} chunks, not {args.chunks:,}")
+            print(f"building {args.chunks:,} chunks in {db_path}")
+            build_index(index, args.chunks, vocab, plants)
+
+        searches = {
+            "pruned": lambda query, limit: index.search(query, limit=limit),
+            "all": lambda query, limit: search_all_terms(index, query, limit),
+        }
+        print(f"{index.count():,} chunks, {args.queries} queries per kind")
+        print(f"{'kind':<11} {'terms':<7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'hit@5':>6}")
+        for kind, kind_queries in queries.items():
+            rows = []
+            for name, search in searches.items():
+                run(search, kind_queries[:5])  # warm the page cache
+                rows.append((name, run(search, kind_queries)))
+            for name, (latencies, hit_rate) in rows:
+                p95 = latencies[int(0.95 * (len(latencies) - 1))]
+                hits = "-" if hit_rate is None else f"{hit_rate:.2f}"
+                print(
+                    f"{kind:<11} {name:<7} {statistics.median(latencies):>8.2f} {p95:>8.2f} "
+                    f"{latencies[-1]:>8.2f} {hits:>6}"
+                )
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Concurrency benchmark for query micro-batching (app.ai.query_executor).
+
+Fires queries from N concurrent clients (each sends its next query as
+soon as the previous one returns) through `embed_query`, or with
+--search through the whole `search_documents` path against a small
+temporary vector store, twice:
+
+  batched    - the configured `embeddings.query_batch_window_ms`/`query_max_batch`
+  unbatched  - query_max_batch = 1: every query is its own encode call
+
+and reports queries/sec, p50/p95 latency and the `get_query_stats()`
+counters for each concurrency level. Every query text is unique, so the
+embedding cache never answers one.
+
+Needs the optional AI dependencies (pip install -r backend/requirements-ai.txt;
+--search also needs chromadb). Everything is written to a temporary
+directory, not under data/.
+
+Usage:
+    python scripts/bench_query_batching.py [--concurrency 1 4 16 64] [--queries 256] [--search]
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from app.core.config import settings  # noqa: E402
+from app.ai import query_executor  # noqa: E402
+from app.ai.embedding_cache import close_embedding_cache  # noqa: E402
+from app.ai.embeddings import _get_model  # noqa: E402
+from app.ai.query_executor import embed_query, get_query_stats, shutdown_query_executor  # noqa: E402
+from app.ai.rag_engine import search_documents  # noqa: E402
+from app.storage.lexical_index import close_lexical_index  # noqa: E402
+from app.storage.vector_store import VectorStore, close_pool  # noqa: E402
+
+TOPICS = ["invoice", "roadmap", "hiring plan", "incident review", "vendor contract", "budget", "release"]
+CORPUS_CHUNKS = 500
+
+
+def index_corpus() -> None:
+    texts = [
+        f"Note {i}: the {TOPICS[i % len(TOPICS)]} for team {i % 13} was discussed on day {i % 28 + 1}."
+        for i in range(CORPUS_CHUNKS)
+    ]
+    VectorStore().add_documents(
+        texts,
+        [{"source": f"notes_{i // 50}.txt", "chunk_index": i % 50} for i in range(CORPUS_CHUNKS)],
+        [f"note-{i}" for i in range(CORPUS_CHUNKS)],
+    )
+
+
+async def run_level(mode: str, concurrency: int, total: int, search: bool) -> dict:
+    issued = 0
+    latencies = []
+
+    async def client() -> None:
+        nonlocal issued
+        while issued < total:
+            n = issued
+            issued += 1
+            query = f"{mode} c{concurrency} q{n}: what is the status of the {TOPICS[n % len(TOPICS)]}?"
+            start = time.perf_counter()
+            if search:
+                await search_documents(query, limit=5)
+            else:
+                await embed_query(query)
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    # Read while the loop (and so its batcher) is alive
+    stats = get_query_stats()
+    latencies.sort()
+    return {
+        "qps": total / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+        **stats,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--queries", type=int, default=256, help="queries per concurrency level and mode")
+    parser.add_argument("--search", action="store_true", help="run search_documents instead of embed_query")
+    args = parser.parse_args()
+
+    base_cfg = dict(query_executor.load_embedding_config())
+    modes = {"batched": base_cfg, "unbatched": {**base_cfg, "query_max_batch": 1}}
+    print(
+        f"{'clients':>7} {'mode':<10} {'qps':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'batches':>8} {'mean batch':>10} {'largest':>8}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.vector_db_path = tmp
+        try:
+            _get_model()  # load outside the timings
+            if args.search:
+                index_corpus()
+            for concurrency in args.concurrency:
+                for mode, cfg in modes.items():
+                    query_executor.load_embedding_config = lambda cfg=cfg: cfg
+                    # A fresh event loop gets a fresh batcher with this config
+                    result = asyncio.run(run_level(mode, concurrency, args.queries, args.search))
+                    print(
+                        f"{concurrency:>7} {mode:<10} {result['qps']:>8.1f} {result['p50']:>8.1f} "
+                        f"{result['p95']:>8.1f} {result['batches']:>8} {result['mean_batch']:>10} "
+                        f"{result['largest_batch']:>8}"
+                    )
+        finally:
+            shutdown_query_executor()
+            close_pool()
+            close_lexical_index()
+            close_embedding_cache()
+
+
+if __name__ == "__main__":
+    main()
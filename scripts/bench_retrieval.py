@@ -0,0 +1,177 @@
+"""
+Recall@k and latency harness for hybrid retrieval (app.ai.rag_engine).
+
+Indexes a small fixed synthetic corpus (vendor facts plus meeting notes
+that mention the same vendors, products and people, so templated chunks
+are easy to confuse) into a temporary vector store, then runs one query
+per fact through `search_documents` twice:
+
+  hybrid         - dense + BM25 fused with reciprocal-rank fusion
+  hybrid+rerank  - the same candidates rescored by the local cross-encoder
+
+Each query has exactly one relevant chunk; recall@k is the share of
+queries whose chunk is in the top k. Query embeddings are warmed up
+first, so latencies cover retrieval (and reranking) only.
+
+Needs the optional AI dependencies (pip install -r backend/requirements-ai.txt).
+Everything is written to a temporary directory, not under data/.
+
+Usage:
+    python scripts/bench_retrieval.py [--k 1 3 5] [--budget-ms 300]
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from app.core.config import settings  # noqa: E402
+from app.ai import rag_engine, reranker  # noqa: E402
+from app.ai.embedding_cache import close_embedding_cache  # noqa: E402
+from app.ai.embeddings import embed_texts  # noqa: E402
+from app.ai.query_executor import shutdown_query_executor  # noqa: E402
+from app.storage.lexical_index import close_lexical_index  # noqa: E402
+from app.storage.vector_store import VectorStore, close_pool  # noqa: E402
+
+VENDORS = [
+    "Acme Supplies", "Northwind Traders", "Globex Logistics", "Initech Software",
+    "Umbrella Facilities", "Stark Hardware", "Wayne Printing", "Contoso Catering",
+    "Fabrikam Furniture", "Tailspin Travel", "Litware Security", "Proseware Cloud",
+    "Adatum Legal", "Woodgrove Payroll", "Lucerne Publishing", "Wingtip Couriers",
+]
+PRODUCTS = ["toner", "laptops", "office chairs", "coffee beans", "printer paper", "monitors", "badges", "lunch boxes"]
+PEOPLE = ["Priya Nair", "Tom Becker", "Ana Souza", "Kenji Mori", "Laura Novak", "Omar Haddad", "Eva Lindqvist", "Sam Okafor"]
+CITIES = ["Berlin", "Austin", "Chennai", "Lisbon", "Osaka", "Toronto"]
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+MONTHS = ["January", "March", "May", "July", "September", "November"]
+NOTES_PER_VENDOR = 6
+
+
+def make_corpus(seed: int = 18):
+    """
+    Build the fixed corpus.
+
+    Returns (chunks, queries): chunks are (id, source, text) and queries
+    are (question, relevant chunk id).
+    """
+    rng = random.Random(seed)
+    chunks, queries = [], []
+    for v, vendor in enumerate(VENDORS):
+        source = f"vendor_{v:02d}.txt"
+        invoice = f"INV-{rng.randint(10000, 99999)}"
+        product, person = rng.choice(PRODUCTS), rng.choice(PEOPLE)
+        city, weekday, month = rng.choice(CITIES), rng.choice(WEEKDAYS), rng.choice(MONTHS)
+        facts = [
+            (
+                f"Invoice {invoice} from {vendor} totals {rng.randint(500, 9000)} USD "
+                f"and is due on {rng.randint(1, 28)} {month}.",
+                f"When is invoice {invoice} due?",
+            ),
+            (
+                f"{vendor} delivers {product} to the {city} office every {weekday} morning.",
+                f"Which day does {vendor} bring the {product}?",
+            ),
+            (
+                f"The account manager at {vendor} is {person}, reachable at extension {rng.randint(100, 999)}.",
+                f"Who is our contact person at {vendor}?",
+            ),
+            (
+                f"Our contract with {vendor} renews in {month} with a {rng.randint(2, 9)}% price increase.",
+                f"How much more will {vendor} charge after the renewal?",
+            ),
+        ]
+        for i, (text, question) in enumerate(facts):
+            chunk_id = f"{source}:{i}"
+            chunks.append((chunk_id, source, text))
+            queries.append((question, chunk_id))
+
+    for n in range(len(VENDORS) * NOTES_PER_VENDOR):
+        vendor, product, person = rng.choice(VENDORS), rng.choice(PRODUCTS), rng.choice(PEOPLE)
+        text = (
+            f"Weekly sync: {person} raised the {vendor} {product} backlog; "
+            f"the {rng.choice(CITIES)} team will follow up on {rng.choice(WEEKDAYS)}."
+        )
+        chunks.append((f"notes.txt:{n}", "notes.txt", text))
+    return chunks, queries
+
+
+def index_corpus(chunks) -> None:
+    VectorStore().add_documents(
+        [text for _, _, text in chunks],
+        [{"source": source, "chunk_index": int(chunk_id.rsplit(":", 1)[1])} for chunk_id, source, _ in chunks],
+        [chunk_id for chunk_id, _, _ in chunks],
+    )
+
+
+async def run_mode(queries, limit: int, ks, rerank_cfg: dict) -> dict:
+    config = lambda: rerank_cfg  # noqa: E731
+    rag_engine.load_rerank_config = config
+    reranker.load_rerank_config = config
+    # Load models outside the timings
+    await rag_engine.search_documents("warm up", limit=limit)
+
+    hits = {k: 0 for k in ks}
+    latencies = []
+    for question, relevant in queries:
+        start = time.perf_counter()
+        results = await rag_engine.search_documents(question, limit=limit)
+        latencies.append(time.perf_counter() - start)
+        ids = [r["id"] for r in results]
+        for k in ks:
+            hits[k] += relevant in ids[:k]
+    latencies.sort()
+    return {
+        "recall": {k: hits[k] / len(queries) for k in ks},
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+    }
+
+
+async def run_all(queries, ks, base_cfg: dict):
+    return [
+        (name, await run_mode(queries, max(ks), ks, {**base_cfg, "enabled": enabled}))
+        for name, enabled in (("hybrid", False), ("hybrid+rerank", True))
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--budget-ms", type=float, default=None, help="override rag.rerank.latency_budget_ms")
+    args = parser.parse_args()
+
+    ks = sorted(set(args.k))
+    chunks, queries = make_corpus()
+    base_cfg = dict(reranker.load_rerank_config())
+    if args.budget_ms is not None:
+        base_cfg["latency_budget_ms"] = args.budget_ms
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.vector_db_path = tmp
+        try:
+            index_corpus(chunks)
+            embed_texts([question for question, _ in queries])
+            rows = asyncio.run(run_all(queries, ks, base_cfg))
+            rerank_stats = reranker.get_rerank_stats()
+        finally:
+            shutdown_query_executor()
+            close_pool()
+            close_lexical_index()
+            close_embedding_cache()
+
+    print(f"{len(chunks)} chunks, {len(queries)} queries")
+    header = " ".join(f"{f'recall@{k}':>9}" for k in ks)
+    print(f"{'mode':<14} {header} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, result in rows:
+        recalls = " ".join(f"{result['recall'][k]:>9.2f}" for k in ks)
+        print(f"{name:<14} {recalls} {result['p50']:>8.1f} {result['p95']:>8.1f}")
+    print(f"rerank stats: {rerank_stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Micro-benchmark for bulk task persistence (app.storage.task_store).
+
+Compares the old per-task path (db.add + commit + refresh for every task)
+with `bulk_insert_tasks` (one INSERT ... RETURNING in one transaction) at
+25, 250 and 2,500 tasks. Each run uses a fresh SQLite database in a
+temporary directory with the configured performance profile applied.
+
+Usage:
+    python scripts/bench_task_insert.py [--sizes 25 250 2500] [--repeat 3]
+"""
+from pathlib import Path
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.storage.db import Base, _apply_sqlite_pragmas  # noqa: E402
+from app.models import TaskModel  # noqa: E402
+from app.storage.task_store import bulk_insert_tasks  # noqa: E402
+
+
+def make_tasks(count: int):
+    return [
+        {
+            "title": f"Follow up on invoice INV-{i:05d}",
+            "description": "Detected in quarterly vendor review",
+            "due_date": "2026-11-30",
+            "priority": ("low", "medium", "high")[i % 3],
+        }
+        for i in range(count)
+    ]
+
+
+def per_task(db, tasks) -> None:
+    """The pre-bulk path: one commit and refresh per task."""
+    for t in tasks:
+        model = TaskModel(
+            title=t["title"],
+            description=t.get("description"),
+            due_date=t.get("due_date"),
+            priority=t.get("priority"),
+            status="detected",
+        )
+        db.add(model)
+        db.commit()
+        db.refresh(model)
+
+
+def bulk(db, tasks) -> None:
+    bulk_insert_tasks(db, tasks, limit=len(tasks))
+
+
+def run_once(fn, count: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        tasks = make_tasks(count)
+        try:
+            start = time.perf_counter()
+            fn(db, tasks)
+            elapsed = time.perf_counter() - start
+            assert db.query(TaskModel).count() == count
+        finally:
+            db.close()
+            engine.dispose()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 250, 2500])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (median is reported)")
+    args = parser.parse_args()
+
+    print(f"{'tasks':>6} {'per-task ms':>12} {'bulk ms':>9} {'speedup':>8}")
+    for count in args.sizes:
+        before = statistics.median(run_once(per_task, count) for _ in range(args.repeat))
+        after = statistics.median(run_once(bulk, count) for _ in range(args.repeat))
+        print(f"{count:>6} {before * 1000:>12.1f} {after * 1000:>9.1f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
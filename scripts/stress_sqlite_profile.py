@@ -0,0 +1,160 @@
+"""
+Concurrency stress test for the SQLite performance profile (app.storage.db).
+
+Runs ingest-style writers (bulk task inserts, one transaction per
+document, each in its own process so reader timings measure lock waits
+rather than GIL contention) in parallel with reader threads running the
+task list query
+(GET /api/tasks: newest first, keyset page) against a temporary database,
+once with SQLite's defaults (rollback journal, synchronous=FULL, as the
+engine was created before) and once with the configured profile from
+`storage.sqlite` in config/app.yaml. Reports reader latency percentiles,
+throughput and "database is locked" failures for each.
+
+Usage:
+    python scripts/stress_sqlite_profile.py [--seconds 5] [--writers 2] [--readers 4]
+"""
+from pathlib import Path
+import argparse
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.storage.db import Base, SQLITE_PRAGMAS, _apply_sqlite_pragmas  # noqa: E402
+from app.models import TaskModel  # noqa: E402
+from app.storage.task_store import bulk_insert_tasks  # noqa: E402
+
+TASKS_PER_DOCUMENT = 25
+PAGE_SIZE = 50
+
+
+def make_engine(db_file: Path, profile: bool):
+    if not profile:
+        return create_engine(f"sqlite:///{db_file}", connect_args={"check_same_thread": False})
+    engine = create_engine(
+        f"sqlite:///{db_file}",
+        connect_args={"check_same_thread": False, "timeout": SQLITE_PRAGMAS["busy_timeout"] / 1000},
+    )
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
+
+def writer(db_file: Path, profile: bool, stop, documents, write_errors, worker: int) -> None:
+    engine = make_engine(db_file, profile)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    doc = 0
+    while not stop.is_set():
+        tasks = [
+            {"title": f"w{worker} doc {doc} task {i}", "description": "x" * 200, "priority": "medium"}
+            for i in range(TASKS_PER_DOCUMENT)
+        ]
+        db = Session()
+        try:
+            bulk_insert_tasks(db, tasks, limit=TASKS_PER_DOCUMENT)
+            with documents.get_lock():
+                documents.value += 1
+        except OperationalError:
+            db.rollback()
+            with write_errors.get_lock():
+                write_errors.value += 1
+        finally:
+            db.close()
+        doc += 1
+    engine.dispose()
+
+
+def reader(Session, stop: threading.Event, stats: dict, lock: threading.Lock) -> None:
+    latencies = []
+    errors = 0
+    while not stop.is_set():
+        db = Session()
+        start = time.perf_counter()
+        try:
+            db.query(TaskModel.id, TaskModel.title, TaskModel.status).order_by(
+                TaskModel.created_at.desc(), TaskModel.id.desc()
+            ).limit(PAGE_SIZE + 1).all()
+            latencies.append(time.perf_counter() - start)
+        except OperationalError:
+            errors += 1
+        finally:
+            db.close()
+    with lock:
+        stats["latencies"].extend(latencies)
+        stats["read_errors"] += errors
+
+
+def run(profile: bool, seconds: float, writers: int, readers: int) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = Path(tmp) / "stress.db"
+        engine = make_engine(db_file, profile)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        stats = {"read_errors": 0, "latencies": []}
+        lock = threading.Lock()
+        stop_writers = ctx.Event()
+        stop_readers = threading.Event()
+        documents, write_errors = ctx.Value("i", 0), ctx.Value("i", 0)
+        processes = [
+            ctx.Process(target=writer, args=(db_file, profile, stop_writers, documents, write_errors, i))
+            for i in range(writers)
+        ]
+        threads = [threading.Thread(target=reader, args=(Session, stop_readers, stats, lock)) for _ in range(readers)]
+        for process in processes:
+            process.start()
+        # Let the writers get going before timing reads
+        time.sleep(1.0)
+        start_documents = documents.value
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop_readers.set()
+        for thread in threads:
+            thread.join()
+        stats["documents"] = documents.value - start_documents
+        stop_writers.set()
+        for process in processes:
+            process.join()
+        stats["write_errors"] = write_errors.value
+        engine.dispose()
+    return stats
+
+
+def report(name: str, stats: dict, seconds: float) -> None:
+    latencies = sorted(stats["latencies"])
+    if latencies:
+        p50 = statistics.median(latencies) * 1000
+        p95 = latencies[int(0.95 * (len(latencies) - 1))] * 1000
+        worst = latencies[-1] * 1000
+    else:
+        p50 = p95 = worst = float("nan")
+    print(
+        f"{name:<9} {len(latencies) / seconds:>8.0f} {stats['documents'] / seconds:>8.1f} "
+        f"{p50:>8.2f} {p95:>8.2f} {worst:>9.2f} {stats['read_errors']:>7} {stats['write_errors']:>7}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers ({TASKS_PER_DOCUMENT} tasks/document), {args.readers} readers, {args.seconds:g}s each")
+    print(f"{'profile':<9} {'reads/s':>8} {'docs/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>9} {'r.errs':>7} {'w.errs':>7}")
+    for name, profile in (("default", False), ("profile", True)):
+        report(name, run(profile, args.seconds, args.writers, args.readers), args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -150,7 +150,7 @@ async def upload_file(file: UploadFile = File(...), authorization: Optional[str]
 async def search(query: SearchQuery):
     try:
         # Check if vector DB has data
-        if not assistant.vector_db.vectors:
+        if len(assistant.vector_db) == 0:
             return {
                 "query": query.query,
                 "results": [],
@@ -4,51 +4,131 @@ import pickle
 import os
 
 class SimpleVectorDB:
+    """
+    Vectors live in one contiguous float32 matrix, L2-normalized on insert,
+    so a search is a single matrix-vector product. The matrix is persisted
+    as a `.npy` file next to the metadata pickle and memory-mapped on load.
+    """
+
+    INITIAL_CAPACITY = 64
+    FORMAT_VERSION = 2
+
     def __init__(self, db_path: str, dimension: int = 384):
         self.db_path = db_path
+        self.matrix_path = os.path.splitext(db_path)[0] + ".npy"
         self.dimension = dimension
-        self.vectors = []
         self.metadata = []
+        # Rows past self._count are spare capacity
+        self._matrix = np.zeros((0, dimension), dtype=np.float32)
+        self._count = 0
         self.load()
-    
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _grow(self, min_capacity: int):
+        capacity = max(self.INITIAL_CAPACITY, len(self._matrix))
+        while capacity < min_capacity:
+            capacity *= 2
+        matrix = np.empty((capacity, self.dimension), dtype=np.float32)
+        matrix[: self._count] = self._matrix[: self._count]
+        # Drops the reference to a memory-mapped file, if any
+        self._matrix = matrix
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
     def add(self, vector: np.ndarray, metadata: Dict[str, Any]):
-        self.vectors.append(vector)
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if vector.shape[0] != self.dimension:
+            raise ValueError(f"Expected a vector of dimension {self.dimension}, got {vector.shape[0]}")
+        if self._count == len(self._matrix) or not self._matrix.flags.writeable:
+            # Doubling keeps appends amortized O(1)
+            self._grow(self._count + 1)
+        self._matrix[self._count] = self._normalize(vector)
+        self._count += 1
         self.metadata.append(metadata)
-    
+
     def search(self, query_vector: np.ndarray, top_k: int = 5) -> List[Dict[str, Any]]:
-        if not self.vectors:
+        if not self._count or top_k <= 0:
             return []
-        
-        vectors_array = np.array(self.vectors)
-        similarities = np.dot(vectors_array, query_vector) / (
-            np.linalg.norm(vectors_array, axis=1) * np.linalg.norm(query_vector)
-        )
-        
-        top_indices = np.argsort(similarities)[-top_k:][::-1]
-        
+
+        query = self._normalize(np.asarray(query_vector, dtype=np.float32).reshape(-1))
+        # A view of the filled rows: no copy of the corpus
+        similarities = self._matrix[: self._count] @ query
+
+        k = min(top_k, self._count)
+        top_indices = np.argpartition(-similarities, k - 1)[:k]
+        top_indices = top_indices[np.argsort(-similarities[top_indices])]
+
         results = []
         for idx in top_indices:
             results.append({
                 "metadata": self.metadata[idx],
                 "similarity": float(similarities[idx])
             })
-        
+
         return results
-    
+
     def save(self):
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        with open(self.db_path, 'wb') as f:
+        if isinstance(self._matrix, np.memmap):
+            # Still the mapped file: appends were written in place
+            if self._matrix.flags.writeable:
+                self._matrix.flush()
+        else:
+            # Write to a temp file first so a crash never leaves a torn matrix
+            tmp_path = self.matrix_path + ".tmp"
+            out = np.lib.format.open_memmap(
+                tmp_path, mode="w+", dtype=np.float32, shape=self._matrix.shape
+            )
+            out[: self._count] = self._matrix[: self._count]
+            out.flush()
+            del out
+            os.replace(tmp_path, self.matrix_path)
+            self._matrix = np.load(self.matrix_path, mmap_mode="r+")
+        # Metadata is written last; its count says how many matrix rows are valid
+        tmp_path = self.db_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
             pickle.dump({
-                "vectors": self.vectors,
+                "version": self.FORMAT_VERSION,
+                "count": self._count,
+                "dimension": self.dimension,
                 "metadata": self.metadata
             }, f)
-    
+        os.replace(tmp_path, self.db_path)
+
     def load(self):
-        if os.path.exists(self.db_path):
-            with open(self.db_path, 'rb') as f:
-                data = pickle.load(f)
-                self.vectors = data["vectors"]
-                self.metadata = data["metadata"]
+        if not os.path.exists(self.db_path):
+            return
+        with open(self.db_path, 'rb') as f:
+            data = pickle.load(f)
+
+        if "vectors" in data:
+            # Old format: a pickled list of raw vectors; migrate to the matrix file
+            vectors = data["vectors"]
+            self.metadata = data["metadata"]
+            if vectors:
+                self.dimension = len(vectors[0])
+            self._matrix = np.zeros((0, self.dimension), dtype=np.float32)
+            self._grow(len(vectors))
+            if vectors:
+                self._matrix[: len(vectors)] = self._normalize(np.asarray(vectors, dtype=np.float32))
+            self._count = len(vectors)
+            self.save()
+            return
+
+        self.metadata = data["metadata"]
+        self._count = data["count"]
+        self.dimension = data.get("dimension", self.dimension)
+        if os.path.exists(self.matrix_path):
+            try:
+                self._matrix = np.load(self.matrix_path, mmap_mode="r+")
+            except PermissionError:
+                self._matrix = np.load(self.matrix_path, mmap_mode="r")
+            self.dimension = self._matrix.shape[1]
 
 class SimpleEmbedding:
     def __init__(self):